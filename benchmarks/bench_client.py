@@ -0,0 +1,114 @@
+import time
+from copy import deepcopy
+from json import dumps
+from typing import Any, Callable, Dict, Iterator, List
+
+import pytest
+import requests
+
+from starmap_client import StarmapClient
+from starmap_client.client import WriteOperation
+from starmap_client.models import Policy, QueryResponseContainer
+from starmap_client.providers import InMemoryMapProviderV2
+from starmap_client.resolver import PolicyResolver
+from starmap_client.server import StarmapStandInServer
+from starmap_client.session import StarmapBaseSession
+
+QUERIES = 100
+LATENCY = 0.005
+
+
+@pytest.fixture
+def server(
+    size: int,
+    query_responses_factory: Callable[[int], List[Dict[str, Any]]],
+    policies_factory: Callable[[int], List[Dict[str, Any]]],
+) -> Iterator[StarmapStandInServer]:
+    qrc = QueryResponseContainer.from_json(deepcopy(query_responses_factory(size)))
+    policies = [Policy.from_json(p) for p in deepcopy(policies_factory(size))]
+    with StarmapStandInServer(InMemoryMapProviderV2(qrc), policies, latency=LATENCY) as server:
+        yield server
+
+
+@pytest.mark.parametrize("max_workers", [1, 10])
+def test_client_query_images(
+    benchmark: Any, size: int, max_workers: int, server: StarmapStandInServer
+) -> None:
+    client = StarmapClient(server.url, session_params={"pool_maxsize": max_workers})
+    names = [f"product-{i}" for i in range(0, size, max(1, size // QUERIES))]
+
+    res = benchmark.pedantic(
+        client.query_images_by_name, args=(names,), kwargs={"max_workers": max_workers}, rounds=3
+    )
+
+    assert all(res.values())
+
+
+@pytest.mark.parametrize("prefetch", [0, 4])
+def test_client_list_policies(
+    benchmark: Any, size: int, prefetch: int, server: StarmapStandInServer
+) -> None:
+    def list_policies() -> List[Policy]:
+        client = StarmapClient(server.url)
+        client.POLICIES_PREFETCH_PAGES = prefetch
+        return client.list_policies()
+
+    res = benchmark.pedantic(list_policies, rounds=3)
+
+    assert len(res) == size
+
+
+def test_client_query_images_resolved(
+    benchmark: Any, size: int, server: StarmapStandInServer
+) -> None:
+    # Pre-warmed client answering all the queries from the listed policies
+    client = StarmapClient(server.url)
+    offline = StarmapClient(session=client.session, provider=PolicyResolver.from_client(client))
+    names = [f"product-{i}" for i in range(0, size, max(1, size // QUERIES))]
+    requests = server.requests
+
+    res = benchmark.pedantic(
+        offline.query_images_by_name, args=(names,), kwargs={"version": "1.0"}, rounds=3
+    )
+
+    assert all(res.values())
+    assert server.requests == requests
+
+
+class EchoSession(StarmapBaseSession):
+    """Session replying to the write requests with their own JSON after a fixed latency."""
+
+    def _echo(self, json: Dict[str, Any]) -> requests.Response:
+        time.sleep(LATENCY)
+        rsp = requests.Response()
+        rsp.status_code = 201
+        rsp._content = dumps(json).encode()
+        return rsp
+
+    def get(self, path: str, **kwargs: Any) -> requests.Response:
+        raise NotImplementedError()
+
+    def post(self, path: str, json: Dict[str, Any], **kwargs: Any) -> requests.Response:
+        return self._echo(json)
+
+    def put(self, path: str, json: Dict[str, Any], **kwargs: Any) -> requests.Response:
+        return self._echo(json)
+
+
+@pytest.mark.parametrize("max_workers", [1, 10])
+def test_client_bulk_write(
+    benchmark: Any,
+    size: int,
+    max_workers: int,
+    policies_factory: Callable[[int], List[Dict[str, Any]]],
+) -> None:
+    client = StarmapClient(session=EchoSession())
+    count = min(size, QUERIES)
+    policies = [Policy.from_json(p) for p in deepcopy(policies_factory(count))]
+    operations = [WriteOperation(p, update=True) for p in policies]
+
+    res = benchmark.pedantic(
+        client.bulk_write, args=(operations,), kwargs={"max_workers": max_workers}, rounds=3
+    )
+
+    assert all(r.ok for r in res)
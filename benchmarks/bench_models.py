@@ -0,0 +1,264 @@
+from copy import deepcopy
+from typing import Any, Callable, Dict, List
+
+import pytest
+from attrs import asdict
+
+from starmap_client.catalogue import PolicyCatalogue
+from starmap_client.models import Mapping, Policy, QueryResponseContainer, Workflow
+from starmap_client.versions import VersionMatcher
+
+
+def test_query_response_container_from_json(
+    benchmark: Any,
+    size: int,
+    query_responses_factory: Callable[[int], List[Dict[str, Any]]],
+    copies: Callable[[Any], Callable[[], Any]],
+    memory: Callable[..., Any],
+    rounds: Callable[[int], int],
+) -> None:
+    data = query_responses_factory(size)
+    memory(benchmark, QueryResponseContainer.from_json, deepcopy(data))
+
+    res = benchmark.pedantic(
+        QueryResponseContainer.from_json, setup=copies(data), rounds=rounds(size)
+    )
+
+    assert len(res.responses) == size
+
+
+def test_policy_from_json(
+    benchmark: Any,
+    size: int,
+    policies_factory: Callable[[int], List[Dict[str, Any]]],
+    copies: Callable[[Any], Callable[[], Any]],
+    memory: Callable[..., Any],
+    rounds: Callable[[int], int],
+) -> None:
+    def decode(policies: List[Dict[str, Any]]) -> List[Policy]:
+        return [Policy.from_json(p) for p in policies]
+
+    data = policies_factory(size)
+    memory(benchmark, decode, deepcopy(data))
+
+    res = benchmark.pedantic(decode, setup=copies(data), rounds=rounds(size))
+
+    assert len(res) == size
+
+
+def test_query_response_container_from_json_trusted(
+    benchmark: Any,
+    size: int,
+    query_responses_factory: Callable[[int], List[Dict[str, Any]]],
+    copies: Callable[[Any], Callable[[], Any]],
+    memory: Callable[..., Any],
+    rounds: Callable[[int], int],
+) -> None:
+    def decode(data: List[Dict[str, Any]]) -> QueryResponseContainer:
+        return QueryResponseContainer.from_json(data, trusted=True)
+
+    data = query_responses_factory(size)
+    memory(benchmark, decode, deepcopy(data))
+
+    res = benchmark.pedantic(decode, setup=copies(data), rounds=rounds(size))
+
+    assert len(res.responses) == size
+
+
+def test_policy_from_json_trusted(
+    benchmark: Any,
+    size: int,
+    policies_factory: Callable[[int], List[Dict[str, Any]]],
+    copies: Callable[[Any], Callable[[], Any]],
+    memory: Callable[..., Any],
+    rounds: Callable[[int], int],
+) -> None:
+    def decode(policies: List[Dict[str, Any]]) -> List[Policy]:
+        return [Policy.from_json(p, trusted=True) for p in policies]
+
+    data = policies_factory(size)
+    memory(benchmark, decode, deepcopy(data))
+
+    res = benchmark.pedantic(decode, setup=copies(data), rounds=rounds(size))
+
+    assert len(res) == size
+
+
+def test_query_response_container_filter_by(
+    benchmark: Any,
+    size: int,
+    query_responses_factory: Callable[[int], List[Dict[str, Any]]],
+) -> None:
+    qrc = QueryResponseContainer.from_json(deepcopy(query_responses_factory(size)))
+    names = [f"product-{i}" for i in range(0, size, max(1, size // 100))]
+
+    def filter_all() -> int:
+        found = 0
+        for name in names:
+            found += len(qrc.filter_by(name=name, workflow=Workflow.stratosphere))
+        return found
+
+    benchmark(filter_all)
+
+
+@pytest.mark.parametrize("intern", [False, True])
+def test_query_response_container_from_json_intern(
+    benchmark: Any,
+    size: int,
+    intern: bool,
+    query_responses_factory: Callable[[int], List[Dict[str, Any]]],
+    copies: Callable[[Any], Callable[[], Any]],
+    memory: Callable[..., Any],
+    rounds: Callable[[int], int],
+) -> None:
+    def decode(data: List[Dict[str, Any]]) -> QueryResponseContainer:
+        return QueryResponseContainer.from_json(data, intern=intern)
+
+    data = query_responses_factory(size)
+    memory(benchmark, decode, deepcopy(data))
+
+    res = benchmark.pedantic(decode, setup=copies(data), rounds=rounds(size))
+
+    assert len(res.responses) == size
+
+
+@pytest.mark.parametrize("intern", [False, True])
+def test_query_response_container_from_json_inherited_meta(
+    benchmark: Any,
+    size: int,
+    intern: bool,
+    query_responses_factory: Callable[[int], List[Dict[str, Any]]],
+    copies: Callable[[Any], Callable[[], Any]],
+    memory: Callable[..., Any],
+    rounds: Callable[[int], int],
+) -> None:
+    def decode(data: List[Dict[str, Any]]) -> QueryResponseContainer:
+        return QueryResponseContainer.from_json(data, intern=intern)
+
+    # Large meta only set on the responses, thus inherited by all their mappings and destinations
+    data = deepcopy(query_responses_factory(size))
+    for qr in data:
+        qr["meta"]["extra"] = {f"key-{k}": {"value": k} for k in range(20)}
+        for mapping in qr["mappings"].values():
+            del mapping["meta"]
+            for d in mapping["destinations"]:
+                del d["meta"]
+    memory(benchmark, decode, deepcopy(data))
+
+    res = benchmark.pedantic(decode, setup=copies(data), rounds=rounds(size))
+
+    assert len(res.responses) == size
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_query_response_container_from_json_lazy(
+    benchmark: Any,
+    size: int,
+    lazy: bool,
+    query_responses_factory: Callable[[int], List[Dict[str, Any]]],
+    copies: Callable[[Any], Callable[[], Any]],
+    memory: Callable[..., Any],
+    rounds: Callable[[int], int],
+) -> None:
+    def decode_and_read(data: List[Dict[str, Any]]) -> QueryResponseContainer:
+        # The common usage: read a single account mapping from each response
+        qrc = QueryResponseContainer.from_json(data, lazy=lazy)
+        for rsp in qrc.responses:
+            rsp.get_mapping_for_account("account-0")
+        return qrc
+
+    data = query_responses_factory(size)
+    memory(benchmark, decode_and_read, deepcopy(data))
+
+    res = benchmark.pedantic(decode_and_read, setup=copies(data), rounds=rounds(size))
+
+    assert len(res.responses) == size
+
+
+@pytest.mark.parametrize("encoder", ["asdict", "to_json", "to_json_bytes"])
+def test_query_response_container_to_json(
+    benchmark: Any,
+    size: int,
+    encoder: str,
+    query_responses_factory: Callable[[int], List[Dict[str, Any]]],
+) -> None:
+    qrc = QueryResponseContainer.from_json(deepcopy(query_responses_factory(size)))
+    encoders: Dict[str, Callable[[], Any]] = {
+        "asdict": lambda: [asdict(r) for r in qrc.responses],
+        "to_json": qrc.to_json,
+        "to_json_bytes": qrc.to_json_bytes,
+    }
+
+    res = benchmark(encoders[encoder])
+
+    assert len(res) >= size
+
+
+@pytest.mark.parametrize("grouped", [False, True])
+def test_version_matcher(benchmark: Any, size: int, grouped: bool) -> None:
+    # Distinct patterns, the worst case for the matcher
+    def make_mapping(i: int) -> Mapping:
+        patterns = [
+            {"version_fnmatch": f"{i}.*"},
+            {"version_regexmatch": f"{i}\\.[0-9]+"},
+            {},
+        ]
+        return Mapping.from_json(
+            {
+                "marketplace_account": f"account-{i}",
+                "destinations": [
+                    {
+                        "destination": f"destination-{i}",
+                        "overwrite": False,
+                        "restrict_version": False,
+                    }
+                ],
+                **patterns[i % 3],
+            }
+        )
+
+    mappings = [make_mapping(i) for i in range(size)]
+    versions = [f"{v}.{v}" for v in range(100)]
+    matcher = VersionMatcher(mappings)
+
+    def match_all() -> int:
+        found = 0
+        for version in versions:
+            if grouped:
+                found += len(matcher.match(version))
+            else:
+                found += len([m for m in mappings if m.matches_version(version)])
+        return found
+
+    res = benchmark(match_all)
+
+    assert res > 0
+
+
+@pytest.mark.parametrize("indexed", [False, True])
+def test_policy_catalogue_lookups(
+    benchmark: Any,
+    size: int,
+    indexed: bool,
+    policies_factory: Callable[[int], List[Dict[str, Any]]],
+) -> None:
+    policies = [Policy.from_json(p) for p in deepcopy(policies_factory(size))]
+    catalogue = PolicyCatalogue(policies)
+    ids = [f"destination-id-{i}-0-0" for i in range(0, size, max(1, size // 100))]
+
+    def nested_loops() -> int:
+        found = [m for p in policies for m in p.mappings if m.marketplace_account == "account-0"]
+        destinations = [
+            next(d for p in policies for m in p.mappings for d in m.destinations if d.id == i)
+            for i in ids
+        ]
+        return len(found) + len(destinations)
+
+    def indexes() -> int:
+        found = catalogue.mappings_by_account("account-0")
+        destinations = [catalogue.get_destination(i) for i in ids]
+        return len(found) + len(destinations)
+
+    res = benchmark(indexes if indexed else nested_loops)
+
+    assert res == size + len(ids)
@@ -0,0 +1,58 @@
+from copy import deepcopy
+from typing import Any, Callable, Dict, List
+
+from starmap_client.models import QueryResponseContainer
+from starmap_client.providers import InMemoryMapProviderV2
+from starmap_client.providers.utils import ParsedNVR, parse_nvr, parse_nvr_cached
+
+
+def test_in_memory_provider_query(
+    benchmark: Any,
+    size: int,
+    query_responses_factory: Callable[[int], List[Dict[str, Any]]],
+    nvrs_factory: Callable[[int], List[str]],
+) -> None:
+    qrc = QueryResponseContainer.from_json(deepcopy(query_responses_factory(size)))
+    provider = InMemoryMapProviderV2(qrc)
+    queries = [{"image": nvr} for nvr in nvrs_factory(size)[:: max(1, size // 100)]]
+
+    def query_all() -> int:
+        return sum(provider.query(q) is not None for q in queries)
+
+    res = benchmark(query_all)
+
+    assert res == len(queries)
+
+
+def test_parse_nvr(
+    benchmark: Any,
+    size: int,
+    nvrs_factory: Callable[[int], List[str]],
+    memory: Callable[..., Any],
+    rounds: Callable[[int], int],
+) -> None:
+    def parse_all(nvrs: List[str]) -> List[Dict[str, str]]:
+        return [parse_nvr(nvr) for nvr in nvrs]
+
+    nvrs = nvrs_factory(size)
+    memory(benchmark, parse_all, nvrs)
+
+    res = benchmark.pedantic(parse_all, args=(nvrs,), rounds=rounds(size))
+
+    assert len(res) == size
+
+
+def test_parse_nvr_cached(
+    benchmark: Any,
+    size: int,
+    nvrs_factory: Callable[[int], List[str]],
+    rounds: Callable[[int], int],
+) -> None:
+    def parse_all(nvrs: List[str]) -> List[ParsedNVR]:
+        return [parse_nvr_cached(nvr) for nvr in nvrs]
+
+    nvrs = nvrs_factory(size)
+
+    res = benchmark.pedantic(parse_all, args=(nvrs,), rounds=rounds(size))
+
+    assert len(res) == size
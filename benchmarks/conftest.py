@@ -0,0 +1,162 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+import tracemalloc
+from copy import deepcopy
+from typing import Any, Callable, Dict, List
+
+import pytest
+from _pytest.config.argparsing import Parser
+from _pytest.python import Metafunc
+
+DEFAULT_SIZES = "100,1000,10000,100000"
+WORKFLOWS = ["stratosphere", "community"]
+
+
+def pytest_addoption(parser: Parser) -> None:
+    """Add the option to select the payload sizes."""
+    parser.addoption(
+        "--bench-sizes",
+        default=DEFAULT_SIZES,
+        help=f"Comma separated number of entities for the synthetic payloads ({DEFAULT_SIZES})",
+    )
+
+
+def pytest_generate_tests(metafunc: Metafunc) -> None:
+    """Parametrize the benchmarks requesting ``size`` with the selected payload sizes."""
+    if "size" in metafunc.fixturenames:
+        sizes = [int(s) for s in metafunc.config.getoption("bench_sizes").split(",")]
+        metafunc.parametrize("size", sizes)
+
+
+def make_destination(i: int) -> Dict[str, Any]:
+    """Return a destination with all the common attributes set."""
+    return {
+        "architecture": "x86_64",
+        "destination": f"destination-{i}",
+        "overwrite": False,
+        "restrict_version": i % 2 == 0,
+        "meta": {"description": f"Destination {i}"},
+        "tags": {"key": "value", "index": str(i)},
+    }
+
+
+def make_query_response(i: int, accounts: int = 2) -> Dict[str, Any]:
+    """Return an APIv2 query response with mappings for multiple marketplace accounts."""
+    return {
+        "name": f"product-{i}",
+        "cloud": f"cloud-{i % 5}",
+        "workflow": WORKFLOWS[i % 2],
+        "meta": {"product": f"product-{i}", "release": {"type": "GA"}},
+        "mappings": {
+            f"account-{a}": {
+                "destinations": [make_destination(i), make_destination(i + 1)],
+                "meta": {"description": f"Account {a}", "release": {"arch": "x86_64"}},
+                "provider": None,
+            }
+            for a in range(accounts)
+        },
+    }
+
+
+def make_policy(i: int, mappings: int = 2) -> Dict[str, Any]:
+    """Return a policy with the given number of mappings."""
+    return {
+        "id": f"policy-id-{i}",
+        "name": f"product-{i}",
+        "workflow": WORKFLOWS[i % 2],
+        "meta": {"product": f"product-{i}"},
+        "mappings": [
+            {
+                "id": f"mapping-id-{i}-{m}",
+                "marketplace_account": f"account-{m}",
+                "version_fnmatch": f"{m}.*",
+                "meta": {"description": f"Mapping {m}"},
+                "destinations": [
+                    dict(make_destination(i), id=f"destination-id-{i}-{m}-{d}") for d in range(2)
+                ],
+            }
+            for m in range(mappings)
+        ],
+    }
+
+
+def make_nvr(i: int) -> str:
+    """Return the NVR of an image for the product generated with the same index."""
+    if i % 3 == 0:
+        return f"product-{i}-{i % 10}.{i % 7}-{i}:{i % 4}"
+    return f"product-{i}-{i % 10}.{i % 7}-{i}.raw.xz"
+
+
+@pytest.fixture(scope="session")
+def query_responses_factory() -> Callable[[int], List[Dict[str, Any]]]:
+    """Return a function generating a list of APIv2 query responses."""
+    cache: Dict[int, List[Dict[str, Any]]] = {}
+
+    def factory(size: int) -> List[Dict[str, Any]]:
+        if size not in cache:
+            cache[size] = [make_query_response(i) for i in range(size)]
+        return cache[size]
+
+    return factory
+
+
+@pytest.fixture(scope="session")
+def policies_factory() -> Callable[[int], List[Dict[str, Any]]]:
+    """Return a function generating a list of policies."""
+    cache: Dict[int, List[Dict[str, Any]]] = {}
+
+    def factory(size: int) -> List[Dict[str, Any]]:
+        if size not in cache:
+            cache[size] = [make_policy(i) for i in range(size)]
+        return cache[size]
+
+    return factory
+
+
+@pytest.fixture(scope="session")
+def nvrs_factory() -> Callable[[int], List[str]]:
+    """Return a function generating a list of NVRs."""
+    return lambda size: [make_nvr(i) for i in range(size)]
+
+
+def rounds_for(size: int) -> int:
+    """Return the number of rounds to run a benchmark for the given size."""
+    return max(3, min(50, 100_000 // size))
+
+
+def fresh_copy(data: Any) -> Callable[[], Any]:
+    """Return a setup function for ``benchmark.pedantic`` passing a copy of the data.
+
+    The models' ``from_json`` pop the values from the given JSON, so each round needs its own.
+    """
+    return lambda: ((deepcopy(data),), {})
+
+
+def record_memory(benchmark: Any, func: Callable[..., Any], *args: Any) -> Any:
+    """Run the function once under tracemalloc and store the memory usage in the results."""
+    tracemalloc.start()
+    try:
+        res = func(*args)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    benchmark.extra_info["retained_kib"] = round(current / 1024, 1)
+    benchmark.extra_info["peak_kib"] = round(peak / 1024, 1)
+    return res
+
+
+@pytest.fixture
+def memory() -> Callable[..., Any]:
+    """Return the :func:`record_memory` helper."""
+    return record_memory
+
+
+@pytest.fixture
+def copies() -> Callable[[Any], Callable[[], Any]]:
+    """Return the :func:`fresh_copy` helper."""
+    return fresh_copy
+
+
+@pytest.fixture
+def rounds() -> Callable[[int], int]:
+    """Return the :func:`rounds_for` helper."""
+    return rounds_for
@@ -26,5 +26,9 @@ setup(
         'requests_mock',
         'urllib3',
     ],
+    extras_require={
+        'async': ['httpx'],
+        'orjson': ['orjson'],
+    },
     zip_safe=False,
 )
@@ -0,0 +1,214 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from types import TracebackType
+from typing import Any, Dict, Optional, Tuple, Type, Union
+
+import httpx
+from urllib3.exceptions import InvalidHeader
+from urllib3.util import Retry
+
+log = logging.getLogger(__name__)
+
+
+class RetryError(httpx.HTTPStatusError):
+    """Raised when the request still fails with a retried status once the retries are exhausted.
+
+    It's the asynchronous counterpart of the ``requests.exceptions.RetryError`` raised by
+    :class:`~starmap_client.session.StarmapSession`.
+    """
+
+
+class AsyncStarmapBaseSession(ABC):
+    """Define the interface for the Starmap's asynchronous session objects."""
+
+    @abstractmethod
+    async def get(self, path: str, **kwargs: Any) -> httpx.Response:
+        """Perform a GET request on StArMap."""
+
+    @abstractmethod
+    async def post(self, path: str, json: Dict[str, Any], **kwargs: Any) -> httpx.Response:
+        """Perform a POST request on StArMap."""
+
+    @abstractmethod
+    async def put(self, path: str, json: Dict[str, Any], **kwargs: Any) -> httpx.Response:
+        """Perform a PUT request on StArMap."""
+
+    async def aclose(self) -> None:
+        """Release the resources held by the session."""
+
+    async def __aenter__(self) -> "AsyncStarmapBaseSession":
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        await self.aclose()
+
+
+class AsyncStarmapSession(AsyncStarmapBaseSession):
+    """Implement an asynchronous HTTP(S) session with StArMap.
+
+    The requests are retried like the :class:`~starmap_client.session.StarmapSession` ones: the
+    responses with a ``5xx`` status are retried, as well as the ``413``, ``429`` and ``503`` ones
+    with a ``Retry-After`` header while there are retries left. When the retries are exhausted
+    on a ``5xx`` status a :class:`RetryError` is raised instead of returning the response.
+    """
+
+    RETRY_STATUSES = frozenset(range(500, 512))
+    """The response status codes which are retried."""
+
+    RETRY_AFTER_STATUSES = Retry.RETRY_AFTER_STATUS_CODES
+    """The response status codes whose ``Retry-After`` header is honored, like ``urllib3``."""
+
+    IDEMPOTENT_METHODS = frozenset(["DELETE", "GET", "HEAD", "OPTIONS", "PUT", "TRACE"])
+    """The methods which are retried on any transport error and bad status codes."""
+
+    BACKOFF_MAX = 120.0
+    """The maximum time in seconds to wait between attempts."""
+
+    def __init__(
+        self,
+        url: str,
+        api_version: str,
+        retries: int = 3,
+        backoff_factor: float = 2.0,
+        timeout: Union[float, Tuple[float, float]] = 10.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        verify: bool = True,
+    ):
+        """
+        Create the AsyncStarmapSession object.
+
+        Args:
+            url (str)
+                The StArMap server endpoint base URL
+            api_version
+                The StArMap server API version to call
+            retries (int, optional)
+                The number of request retries on failure
+            backoff_factor (float, optional)
+                The backoff factor to apply between attempts after the second try
+            timeout (float | tuple[float, float], optional)
+                The timeout in seconds for the request. If a tuple is provided, the first value
+                is the connection timeout, and the second is the read timeout. Defaults to
+                10 seconds for both connection and read.
+            max_connections (int, optional)
+                The maximum number of concurrent connections in the pool.
+            max_keepalive_connections (int, optional)
+                The maximum number of idle connections kept alive in the pool.
+            verify (bool, optional)
+                Whether to verify the server's TLS certificate.
+        """
+        super(AsyncStarmapSession, self).__init__()
+        self.url = url
+        self.api_version = api_version
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_keepalive_connections
+        )
+        self.session = httpx.AsyncClient(limits=limits, verify=verify)
+
+    def _get_timeout(self, timeout: Union[float, Tuple[float, float]]) -> httpx.Timeout:
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            return httpx.Timeout(read, connect=connect)
+        return httpx.Timeout(timeout)
+
+    def _get_backoff_time(self, attempt: int) -> float:
+        """Return the time to wait before the given retry attempt, like ``urllib3.Retry``."""
+        if attempt <= 1:
+            return 0.0
+        return float(min(self.BACKOFF_MAX, self.backoff_factor * (2 ** (attempt - 1))))
+
+    def _get_retry_after(self, rsp: httpx.Response) -> Optional[float]:
+        """Return the seconds to wait from the ``Retry-After`` header of the response, if any."""
+        value = rsp.headers.get("Retry-After")
+        if rsp.status_code not in self.RETRY_AFTER_STATUSES or value is None:
+            return None
+        try:
+            return Retry(0).parse_retry_after(value)
+        except InvalidHeader:
+            return None
+
+    def _is_retry(self, rsp: httpx.Response, idempotent: bool, attempt: int) -> bool:
+        """Return whether the response should be retried, like ``urllib3.Retry.is_retry``."""
+        if not idempotent:
+            return False
+        if rsp.status_code in self.RETRY_STATUSES:
+            return True
+        has_retry_after = bool(rsp.headers.get("Retry-After"))
+        retry_after_status = rsp.status_code in self.RETRY_AFTER_STATUSES
+        return attempt < self.retries and has_retry_after and retry_after_status
+
+    async def _request(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        """Perform a generic request on StArMap retrying it on failures."""
+        headers = {
+            "Accept": "application/json",
+        }
+
+        log.info(f"Sending a {method} request to {path}")
+        url_elements = [self.url, f"/api/{self.api_version}", path]
+        url = "/".join(arg.strip("/") for arg in url_elements)
+
+        # If timeout is not provided, use the default timeout
+        timeout = self._get_timeout(kwargs.pop("timeout", self.timeout))
+        idempotent = method.upper() in self.IDEMPOTENT_METHODS
+
+        attempt = 0
+        while True:
+            retry_after = None
+            try:
+                rsp = await self.session.request(
+                    method, url=url, headers=headers, timeout=timeout, **kwargs
+                )
+            except httpx.UnsupportedProtocol:
+                raise
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout):
+                # The request wasn't sent, thus it's safe to send it again
+                if attempt >= self.retries:
+                    raise
+            except httpx.TransportError:
+                if not idempotent or attempt >= self.retries:
+                    raise
+            else:
+                if not self._is_retry(rsp, idempotent, attempt):
+                    return rsp
+                retry_after = self._get_retry_after(rsp)
+                await rsp.aclose()
+                if attempt >= self.retries:
+                    raise RetryError(
+                        f"Max retries exceeded with url: {url} "
+                        f"(too many {rsp.status_code} error responses)",
+                        request=rsp.request,
+                        response=rsp,
+                    )
+            attempt += 1
+            delay = self._get_backoff_time(attempt)
+            if retry_after is not None:
+                delay = min(self.BACKOFF_MAX, max(delay, retry_after))
+            log.debug(f"Retrying the {method} request to {path} (attempt {attempt})")
+            await asyncio.sleep(delay)
+
+    async def get(self, path: str, **kwargs: Any) -> httpx.Response:
+        """Perform a GET request on StArMap."""
+        return await self._request("get", path, **kwargs)
+
+    async def post(self, path: str, json: Dict[str, Any], **kwargs: Any) -> httpx.Response:
+        """Perform a POST request on StArMap."""
+        return await self._request("post", path, json=json, **kwargs)
+
+    async def put(self, path: str, json: Dict[str, Any], **kwargs: Any) -> httpx.Response:
+        """Perform a PUT request on StArMap."""
+        return await self._request("put", path, json=json, **kwargs)
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool."""
+        await self.session.aclose()
@@ -0,0 +1,162 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Dict, Optional, Tuple
+
+from starmap_client.models import QueryResponseContainer
+from starmap_client.providers.utils import parse_nvr_cached
+
+CacheKey = Tuple[Tuple[str, str], ...]
+
+
+def _normalize_image(image: Any) -> str:
+    try:
+        return str(parse_nvr_cached(image))
+    except (RuntimeError, TypeError):
+        return str(image)
+
+
+def make_cache_key(params: Dict[str, Any]) -> CacheKey:
+    """Return a normalized and hashable key for the given query params.
+
+    The ``image`` is converted into its canonical NVR form, thus equivalent NVRs, like the ones
+    with a path or a different epoch placement, share the same key.
+
+    Args:
+        params (dict):
+            The request params of the query.
+    Returns:
+        tuple: The sorted params with their values converted to string.
+    """
+    items = []
+    for k, v in params.items():
+        if v is None:
+            continue
+        if k == "image":
+            items.append((k, _normalize_image(v)))
+        else:
+            items.append((k, v.value if isinstance(v, Enum) else str(v)))
+    return tuple(sorted(items))
+
+
+class StarmapQueryCache(ABC):
+    """Define the interface for caching the query responses."""
+
+    @abstractmethod
+    def get(self, key: CacheKey) -> Optional[QueryResponseContainer]:
+        """Return a cached query response.
+
+        Args:
+            key (tuple):
+                The normalized query key from :func:`make_cache_key`.
+        Returns:
+            The cached response, which is ``None`` for a cached "not found" response.
+        Raises:
+            KeyError: When there's no valid entry for the given key.
+        """
+
+    @abstractmethod
+    def set(self, key: CacheKey, value: Optional[QueryResponseContainer]) -> None:
+        """Store a query response.
+
+        Args:
+            key (tuple):
+                The normalized query key from :func:`make_cache_key`.
+            value (QueryResponseContainer):
+                The response to store or ``None`` when the server returned "not found".
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all cached entries."""
+
+
+class InMemoryQueryCache(StarmapQueryCache):
+    """Thread-safe in memory cache with TTL and LRU eviction."""
+
+    def __init__(
+        self, max_entries: int = 1024, ttl: Optional[float] = 300.0, cache_not_found: bool = False
+    ) -> None:
+        """Create a new InMemoryQueryCache object.
+
+        Args:
+            max_entries (int, optional)
+                The maximum number of cached entries. The least recently used entry is
+                evicted when the limit is reached.
+            ttl (float, optional)
+                The time in seconds for an entry to expire. When ``None`` the entries never expire.
+            cache_not_found (bool, optional)
+                Whether to also cache the "not found" responses. Defaults to ``False``.
+        """
+        if max_entries < 1:
+            raise ValueError(f"The max_entries must be a positive number, got: {max_entries}")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.cache_not_found = cache_not_found
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[CacheKey, Tuple[float, Optional[QueryResponseContainer]]]
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Return the number of hits, misses, evictions and the current size of the cache."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self),
+        }
+
+    def get(self, key: CacheKey) -> Optional[QueryResponseContainer]:
+        """Return a cached query response.
+
+        Args:
+            key (tuple):
+                The normalized query key from :func:`make_cache_key`.
+        Returns:
+            The cached response, which is ``None`` for a cached "not found" response.
+        Raises:
+            KeyError: When there's no valid entry for the given key.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._data.pop(key, None)
+                self.misses += 1
+                raise KeyError(key)
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: CacheKey, value: Optional[QueryResponseContainer]) -> None:
+        """Store a query response.
+
+        Args:
+            key (tuple):
+                The normalized query key from :func:`make_cache_key`.
+            value (QueryResponseContainer):
+                The response to store or ``None`` when the server returned "not found".
+        """
+        if value is None and not self.cache_not_found:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all cached entries."""
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,206 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from typing import Dict, Hashable, Iterable, List, Optional, TypeVar
+
+from starmap_client.client import StarmapClient
+from starmap_client.models import Destination, Mapping, Policy, Workflow
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+
+def _add(index: Dict[K, List[T]], key: Optional[K], obj: T) -> None:
+    if key is not None:
+        index.setdefault(key, []).append(obj)
+
+
+class PolicyCatalogue:
+    """Read-only catalogue of policies with inverted indexes on their attributes.
+
+    All the indexes are built once when the catalogue is created, thus every lookup is a single
+    dictionary access instead of a loop over the policies, mappings and destinations. The
+    objects are returned as they're stored in the policies, which must not change afterwards.
+    """
+
+    def __init__(self, policies: Iterable[Policy]) -> None:
+        """Create a new PolicyCatalogue object.
+
+        Args:
+            policies (list)
+                The policies to index, e.g. from
+                :meth:`~starmap_client.StarmapClient.list_policies`.
+        """
+        self.policies = list(policies)
+        self._policies: Dict[str, Policy] = {}
+        self._mappings: Dict[str, Mapping] = {}
+        self._destinations: Dict[str, Destination] = {}
+        self._by_name: Dict[str, List[Policy]] = {}
+        self._by_workflow: Dict[Workflow, List[Policy]] = {}
+        self._by_account: Dict[str, List[Mapping]] = {}
+        self._policies_by_account: Dict[str, List[Policy]] = {}
+        self._by_destination: Dict[str, List[Destination]] = {}
+        self._by_architecture: Dict[str, List[Destination]] = {}
+
+        for policy in self.policies:
+            if policy.id is not None:
+                self._policies[policy.id] = policy
+            _add(self._by_name, policy.name, policy)
+            _add(self._by_workflow, policy.workflow, policy)
+            for mapping in policy.mappings:
+                if mapping.id is not None:
+                    self._mappings[mapping.id] = mapping
+                _add(self._by_account, mapping.marketplace_account, mapping)
+                account_policies = self._policies_by_account.get(mapping.marketplace_account)
+                # A policy may have multiple mappings for the same account
+                if not account_policies or account_policies[-1] is not policy:
+                    _add(self._policies_by_account, mapping.marketplace_account, policy)
+                for destination in mapping.destinations:
+                    if destination.id is not None:
+                        self._destinations[destination.id] = destination
+                    _add(self._by_destination, destination.destination, destination)
+                    _add(self._by_architecture, destination.architecture, destination)
+
+    @classmethod
+    def from_client(cls, client: StarmapClient) -> "PolicyCatalogue":
+        """Create a new PolicyCatalogue object with the policies cached by the client.
+
+        The policies are retrieved from the server only when the client didn't list them yet.
+
+        Args:
+            client (StarmapClient)
+                The client to get the policies from.
+        Returns:
+            The catalogue of all the policies registered in StArMap.
+        """
+        return cls(client.list_policies())
+
+    def get_policy(self, policy_id: str) -> Optional[Policy]:
+        """
+        Retrieve a single policy by its ID.
+
+        Args:
+            policy_id (str): The Policy ID to retrieve.
+
+        Returns:
+            Policy: The requested Policy when found.
+        """
+        return self._policies.get(policy_id)
+
+    def list_mappings(self, policy_id: str) -> List[Mapping]:
+        """
+        List all mappings for a given Policy ID.
+
+        Args:
+            policy_id (str)
+                Policy ID to list the mappings.
+
+        Returns:
+            List with the Mappings for the requested Policy.
+        """
+        policy = self.get_policy(policy_id)
+        return list(policy.mappings) if policy else []
+
+    def get_mapping(self, mapping_id: str) -> Optional[Mapping]:
+        """
+        Retrieve a single Marketplace Mapping by its ID.
+
+        Args:
+            mapping_id (str)
+                The Markeplace Mapping ID to retrieve.
+
+        Returns:
+            The requested Marketplace Mapping when found.
+        """
+        return self._mappings.get(mapping_id)
+
+    def list_destinations(self, mapping_id: str) -> List[Destination]:
+        """
+        List all destinations for a given Marketplace Mapping ID.
+
+        Args:
+            mapping_id (str)
+                Marketplace Mapping ID to list the destinations.
+
+        Returns:
+            List with the Destinations for the requested Mapping.
+        """
+        mapping = self.get_mapping(mapping_id)
+        return list(mapping.destinations) if mapping else []
+
+    def get_destination(self, destination_id: str) -> Optional[Destination]:
+        """
+        Retrieve a single Destination by its ID.
+
+        Args:
+            destination_id (str)
+                The Destination ID to retrieve.
+
+        Returns:
+            The requested Destination when found.
+        """
+        return self._destinations.get(destination_id)
+
+    def find_policies(
+        self, name: Optional[str] = None, workflow: Optional[Workflow] = None
+    ) -> List[Policy]:
+        """Return the policies with the given name and/or workflow.
+
+        Args:
+            name (str, optional):
+                The policy name.
+            workflow (Workflow, optional):
+                The policy workflow.
+        Returns:
+            list: The matched policies, all of them when no filter is set.
+        """
+        if name is None:
+            if workflow is None:
+                return list(self.policies)
+            return list(self._by_workflow.get(workflow, []))
+        res = self._by_name.get(name, [])
+        if workflow is not None:
+            return [p for p in res if p.workflow == workflow]
+        return list(res)
+
+    def mappings_by_account(self, marketplace_account: str) -> List[Mapping]:
+        """Return the mappings of all the policies for the given marketplace account.
+
+        Args:
+            marketplace_account (str):
+                The marketplace account name.
+        Returns:
+            list: The mappings for the marketplace account.
+        """
+        return list(self._by_account.get(marketplace_account, []))
+
+    def policies_by_account(self, marketplace_account: str) -> List[Policy]:
+        """Return the policies with any mapping for the given marketplace account.
+
+        Args:
+            marketplace_account (str):
+                The marketplace account name.
+        Returns:
+            list: The policies targeting the marketplace account, each one once.
+        """
+        return list(self._policies_by_account.get(marketplace_account, []))
+
+    def destinations_by_destination(self, destination: str) -> List[Destination]:
+        """Return the destinations of all the mappings with the given destination string.
+
+        Args:
+            destination (str):
+                The product listing destination in the cloud marketplace.
+        Returns:
+            list: The destinations with the destination string.
+        """
+        return list(self._by_destination.get(destination, []))
+
+    def destinations_by_architecture(self, architecture: str) -> List[Destination]:
+        """Return the destinations of all the mappings with the given architecture.
+
+        Args:
+            architecture (str):
+                The architecture of the VM images, e.g. ``x86_64``.
+        Returns:
+            list: The destinations with the architecture.
+        """
+        return list(self._by_architecture.get(architecture, []))
@@ -1,27 +1,226 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 import logging
-from typing import Any, Dict, Iterator, List, Optional
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from time import perf_counter, sleep
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
+from weakref import WeakKeyDictionary
+
+import requests
+from attrs import frozen
+from urllib3.exceptions import InvalidHeader, MaxRetryError, NewConnectionError
+from urllib3.util import Retry
 
+from starmap_client.cache import CacheKey, StarmapQueryCache, make_cache_key
+from starmap_client.metrics import StarmapMetrics, response_retries
 from starmap_client.models import (
     Destination,
     Mapping,
     PaginatedRawData,
+    PaginationMetadata,
     Policy,
     QueryResponseContainer,
     QueryResponseEntity,
 )
 from starmap_client.providers import StarmapProvider
 from starmap_client.session import StarmapBaseSession, StarmapSession
+from starmap_client.utils import SingleFlight, iter_json_array
 
 log = logging.getLogger(__name__)
 
+D = TypeVar("D")
+PoliciesPage = Tuple[PaginationMetadata, List[Policy]]
+WritableModel = Union[Policy, Mapping, Destination]
+
+_WRITE_PATHS: Dict[type, Tuple[str, Optional[str]]] = {
+    Policy: ("policy", None),
+    Mapping: ("mapping", "policy"),
+    Destination: ("destination", "mapping"),
+}
+
+
+def model_to_json(obj: WritableModel) -> Dict[str, Any]:
+    """Convert a policy, mapping or destination into the JSON for the write requests.
+
+    The unset attributes, like the ``id`` of new objects, are left out.
+    """
+    return obj.to_json(exclude_none=True)
+
+
+def _is_connect_error(exc: Exception) -> bool:
+    """Return whether the request failed while connecting, before anything was sent."""
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    if isinstance(exc, requests.ConnectionError) and exc.args:
+        return isinstance(getattr(exc.args[0], "reason", None), NewConnectionError)
+    return False
+
+
+def _is_session_gave_up(exc: Exception) -> bool:
+    """Return whether the request failed once the session retries were exhausted."""
+    if isinstance(exc, requests.exceptions.RetryError):
+        return True
+    if isinstance(exc, requests.ConnectionError) and exc.args:
+        return isinstance(exc.args[0], MaxRetryError)
+    return False
+
+
+def _is_retryable(operation: "WriteOperation", exc: Exception, session_retries: int) -> bool:
+    """Return whether a failed write may succeed when sent again.
+
+    The creations aren't idempotent, since the server may have created the object before failing
+    to reply, thus they're only sent again when the connection couldn't be established. When the
+    session retries the requests itself, the errors it raised after exhausting its retries,
+    like a ``RetryError`` or a connection error, aren't retryable either.
+    """
+    if session_retries and _is_session_gave_up(exc):
+        return False
+    if _is_connect_error(exc):
+        return True
+    if not operation.update:
+        return False
+    if isinstance(exc, requests.HTTPError):
+        status = exc.response.status_code if exc.response is not None else 0
+        return status >= 500 or status == 429
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+
+def _retry_after(exc: Optional[Exception]) -> Optional[float]:
+    """Return the seconds to wait from the ``Retry-After`` of a 429 or 503 error, if any."""
+    if not isinstance(exc, requests.HTTPError) or exc.response is None:
+        return None
+    if exc.response.status_code not in (429, 503):
+        return None
+    value = exc.response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return Retry(0).parse_retry_after(value)
+    except InvalidHeader:
+        return None
+
+
+@frozen
+class WriteOperation:
+    """Represent the creation or update of a single object on the server."""
+
+    obj: WritableModel
+    """The policy, mapping or destination to write."""
+
+    update: bool = False
+    """Whether to update the existing object with the same ``id`` instead of creating it."""
+
+    parent_id: Optional[str] = None
+    """The ID of the policy to create a mapping in or of the mapping to create a destination in."""
+
+    def __attrs_post_init__(self) -> None:
+        kind, parent = _WRITE_PATHS[type(self.obj)]
+        if self.update and self.obj.id is None:
+            raise ValueError(f"Cannot update a {kind} without ID")
+        if not self.update and parent and self.parent_id is None:
+            raise ValueError(f"The {parent} ID is required to create a {kind}")
+
+    def request(self) -> Tuple[str, str, str]:
+        """Return the HTTP method, path and endpoint template for the operation."""
+        kind, parent = _WRITE_PATHS[type(self.obj)]
+        if self.update:
+            return "put", f"/{kind}/{self.obj.id}", f"{kind}/{{id}}"
+        if parent is None:
+            return "post", f"/{kind}", kind
+        return "post", f"/{parent}/{self.parent_id}/{kind}", f"{parent}/{{id}}/{kind}"
+
+
+@frozen
+class WriteResult:
+    """Represent the outcome of a single operation from :meth:`StarmapClient.bulk_write`."""
+
+    operation: WriteOperation
+    """The requested operation."""
+
+    result: Optional[WritableModel]
+    """The object returned by the server when the operation succeeded."""
+
+    error: Optional[Exception]
+    """The error of the last attempt when the operation failed."""
+
+    attempts: int
+    """Number of times the operation was sent."""
+
+    @property
+    def ok(self) -> bool:
+        """Return whether the operation succeeded."""
+        return self.error is None
+
+
+class BatchQueryError(Exception):
+    """Raised by the batch queries of :class:`StarmapClient` when any of the queries failed.
+
+    The remaining queries are still completed, thus their results aren't lost.
+    """
+
+    def __init__(
+        self,
+        results: Dict[str, Optional[QueryResponseContainer]],
+        errors: Dict[str, Exception],
+    ) -> None:
+        """Create a new BatchQueryError object.
+
+        Args:
+            results (dict):
+                The query result (or None when not found) for each input which succeeded.
+            errors (dict):
+                The error for each input which failed.
+        """
+        self.results = results
+        self.errors = errors
+        key, exc = next(iter(errors.items()))
+        super().__init__(
+            f"{len(errors)} of {len(results) + len(errors)} queries failed, e.g. {key}: {exc}"
+        )
+
 
 class StarmapClient(object):
-    """Implement the StArMap client."""
+    """Implement the StArMap client.
+
+    The client is safe to share across threads. In that case the session connection pool should be
+    sized accordingly through the ``session_params``, e.g. ``{"pool_maxsize": 20}``.
+    """
 
     POLICIES_PER_PAGE = 100
     """Number of policies to retrieve per call."""
 
+    POLICIES_PREFETCH_PAGES = 0
+    """Number of policies pages to fetch concurrently ahead of the current one (0 disables it)."""
+
+    MAX_WORKERS = 10
+    """Maximum number of concurrent requests sent by the batch queries."""
+
+    STREAM_CHUNK_SIZE = 64 * 1024
+    """Number of bytes read at once from the server by the streaming queries."""
+
+    WRITE_RETRIES = 2
+    """Number of times the failed operations of :meth:`bulk_write` are sent again."""
+
+    WRITE_BACKOFF_FACTOR = 2.0
+    """Backoff factor of the :meth:`bulk_write` retries when the session doesn't define one."""
+
+    WRITE_BACKOFF_MAX = 120.0
+    """Maximum time in seconds to wait before sending the failed operations again."""
+
     def __init__(
         self,
         url: Optional[str] = None,
@@ -29,6 +228,9 @@ class StarmapClient(object):
         session: Optional[StarmapBaseSession] = None,
         session_params: Optional[Dict[str, Any]] = None,
         provider: Optional[StarmapProvider[QueryResponseContainer, QueryResponseEntity]] = None,
+        cache: Optional[StarmapQueryCache] = None,
+        decode_params: Optional[Dict[str, Any]] = None,
+        metrics: Optional[StarmapMetrics] = None,
     ):
         """
         Create a new StArMapClient.
@@ -46,6 +248,15 @@ class StarmapClient(object):
             provider (StarmapProvider, optional):
                 Object responsible to provide mappings locally. When set the client will be query it
                 first and if no mapping is found the subsequent request will be made to the server.
+            cache (StarmapQueryCache, optional):
+                Object responsible to cache the query responses from the server. When set the client
+                will look up the cache before sending a query request to the server.
+            decode_params (dict, optional):
+                Additional keyword arguments for the models ``from_json``, e.g. ``trusted=True``
+                to skip the validation of the server responses.
+            metrics (StarmapMetrics, optional):
+                Object receiving the requests latency, retries, received bytes, decoding time
+                and the local provider and cache hits. Nothing is measured when not set.
         """
         if url is None and session is None:
             raise ValueError(
@@ -60,23 +271,154 @@ class StarmapClient(object):
         self.session = session or StarmapSession(url, api_version, **session_params)
         self.api_version = api_version
         self._provider = provider
+        self._cache = cache
+        self._decode_params = decode_params or {}
+        self._metrics = metrics
         self._policies: List[Policy] = []
-
-    def _query(self, params: Dict[str, Any]) -> Optional[QueryResponseContainer]:
-        qr = None
-        if self._provider:
-            qr = self._provider.query(params)
-        rsp = qr or self.session.get("/query", params=params)
-        if isinstance(rsp, QueryResponseContainer):
+        self._policies_lock = threading.Lock()
+        self._decoded: WeakKeyDictionary[requests.Response, Any] = WeakKeyDictionary()
+        self._decoded_lock = threading.Lock()
+        self._flights = SingleFlight()
+
+    def _send(
+        self, endpoint: str, path: str, method: str = "get", **kwargs: Any
+    ) -> requests.Response:
+        """Send a request to the server, recording its metrics when enabled."""
+        send = getattr(self.session, method)
+        if self._metrics is None:
+            return cast(requests.Response, send(path, **kwargs))
+        start = perf_counter()
+        try:
+            rsp = send(path, **kwargs)
+        except Exception as exc:
+            # The session used up all its retries before giving up
+            retries = getattr(self.session, "retries", 0) if _is_session_gave_up(exc) else 0
+            self._metrics.request(endpoint, method.upper(), 0, perf_counter() - start, 0, retries)
+            raise
+        seconds = perf_counter() - start
+        if kwargs.get("stream"):
+            # Recorded once the body is consumed, see _iter_query
+            return cast(requests.Response, rsp)
+        self._record_request(endpoint, rsp, seconds, len(rsp.content), method)
+        return cast(requests.Response, rsp)
+
+    def _record_request(
+        self,
+        endpoint: str,
+        rsp: requests.Response,
+        seconds: float,
+        bytes_received: int,
+        method: str = "get",
+    ) -> None:
+        if getattr(rsp, "from_cache", None) is True:
+            status, bytes_received = 304, 0
+        else:
+            status = rsp.status_code
+        self._metrics.request(  # type: ignore[union-attr]
+            endpoint, method.upper(), status, seconds, bytes_received, response_retries(rsp)
+        )
+
+    def _decode(self, rsp: requests.Response, decoder: Callable[..., D], endpoint: str) -> D:
+        """Convert the response JSON into models using the given decoder.
+
+        The models built from a response stored by the session for conditional requests are
+        kept, so they're returned again instead of decoding the response once the server
+        replies that the content was not modified (``from_cache``), with a copy of the stored
+        response (``stored_response``).
+        """
+        from_cache = getattr(rsp, "from_cache", None)
+        if from_cache is True:
+            rsp = getattr(rsp, "stored_response", rsp)
+            with self._decoded_lock:
+                if rsp in self._decoded:
+                    log.debug("Returning the models previously built from the response")
+                    return cast(D, self._decoded[rsp])
+        if self._metrics is None:
+            obj = decoder(rsp.json(), **self._decode_params)
+        else:
+            start = perf_counter()
+            obj = decoder(rsp.json(), **self._decode_params)
+            self._metrics.decode(endpoint, perf_counter() - start)
+        if isinstance(from_cache, bool):
+            with self._decoded_lock:
+                self._decoded[rsp] = obj
+        return obj
+
+    def _query_provider(self, params: Dict[str, Any]) -> Optional[QueryResponseContainer]:
+        if not self._provider:
+            return None
+        qr = self._provider.query(params)
+        if qr:
             log.debug(
                 "Returning response from the local provider %s", self._provider.__class__.__name__
             )
-            return rsp
+        if self._metrics is not None:
+            self._metrics.lookup("provider", bool(qr))
+        return qr
+
+    def _query(self, params: Dict[str, Any]) -> Optional[QueryResponseContainer]:
+        return self._query_provider(params) or self._query_cached(params)
+
+    def _query_cached(self, params: Dict[str, Any]) -> Optional[QueryResponseContainer]:
+        key = make_cache_key(params)
+        if self._cache is not None:
+            try:
+                qr = self._cache_get(key)
+                log.debug("Returning cached response for %s", params)
+                return qr
+            except KeyError:
+                pass
+        return self._flights.do(("/query", key), self._fetch_query, key, params)
+
+    def _cache_get(self, key: CacheKey) -> Optional[QueryResponseContainer]:
+        try:
+            qr = self._cache.get(key)  # type: ignore[union-attr]
+        except KeyError:
+            if self._metrics is not None:
+                self._metrics.lookup("cache", False)
+            raise
+        if self._metrics is not None:
+            self._metrics.lookup("cache", True)
+        return qr
+
+    def _fetch_query(
+        self, key: CacheKey, params: Dict[str, Any]
+    ) -> Optional[QueryResponseContainer]:
+        qr = self._query_server(params)
+        if self._cache is not None:
+            self._cache.set(key, qr)
+        return qr
+
+    def _query_server(self, params: Dict[str, Any]) -> Optional[QueryResponseContainer]:
+        rsp = self._send("query", "/query", params=params)
         if rsp.status_code == 404:
             log.error(f"Marketplace mappings not defined for {params}")
             return None
         rsp.raise_for_status()
-        return QueryResponseContainer.from_json(json=rsp.json())
+        return self._decode(rsp, QueryResponseContainer.from_json, "query")
+
+    def _get(
+        self, endpoint: str, path: str, decoder: Callable[..., D], not_found: str
+    ) -> Optional[D]:
+        """Retrieve a single object from the server, sharing the concurrent identical requests."""
+        return self._flights.do(path, self._fetch, endpoint, path, decoder, not_found)
+
+    def _fetch(
+        self, endpoint: str, path: str, decoder: Callable[..., D], not_found: str
+    ) -> Optional[D]:
+        rsp = self._send(endpoint, path)
+        if rsp.status_code == 404:
+            log.error(not_found)
+            return None
+        rsp.raise_for_status()
+        return self._decode(rsp, decoder, endpoint)
+
+    @staticmethod
+    def _name_params(name: str, version: Optional[str], **kwargs: Any) -> Dict[str, Any]:
+        params = {"name": name, **kwargs}
+        if version:
+            params.update({"version": version})
+        return params
 
     def query_image(self, nvr: str, **kwargs: Any) -> Optional[QueryResponseContainer]:
         """
@@ -107,37 +449,284 @@ class StarmapClient(object):
         Returns:
             QueryResponseContainer: The query result when found or None.
         """
-        params = {"name": name, **kwargs}
-        if version:
-            params.update({"version": version})
-        return self._query(params=params)
+        return self._query(params=self._name_params(name, version, **kwargs))
+
+    def _iter_query(self, params: Dict[str, Any]) -> Iterator[QueryResponseEntity]:
+        qr = self._query_provider(params)
+        if qr is None and self._cache is not None:
+            try:
+                qr = self._cache_get(make_cache_key(params))
+            except KeyError:
+                pass  # Streamed without being stored, which would load the whole response
+            else:
+                log.debug("Returning cached response for %s", params)
+                if qr is None:
+                    return
+        if qr is not None:
+            yield from qr.responses
+            return
+
+        start = perf_counter()
+        with self._send("query", "/query", params=params, stream=True) as rsp:
+            if self._metrics is None:
+                if rsp.status_code == 404:
+                    log.error(f"Marketplace mappings not defined for {params}")
+                    return
+                rsp.raise_for_status()
+                for item in iter_json_array(rsp.iter_content(self.STREAM_CHUNK_SIZE)):
+                    yield QueryResponseEntity.from_json(item, **self._decode_params)
+                return
+            yield from self._iter_query_measured(rsp, params, perf_counter() - start)
+
+    def _iter_query_measured(
+        self, rsp: requests.Response, params: Dict[str, Any], seconds: float
+    ) -> Iterator[QueryResponseEntity]:
+        """Stream the query responses recording the metrics once the body is consumed."""
+        received = 0
+        decoding = 0.0
+
+        def chunks() -> Iterator[bytes]:
+            nonlocal received
+            for chunk in rsp.iter_content(self.STREAM_CHUNK_SIZE):
+                received += len(chunk)
+                yield chunk
+
+        try:
+            if rsp.status_code == 404:
+                log.error(f"Marketplace mappings not defined for {params}")
+                return
+            rsp.raise_for_status()
+            for item in iter_json_array(chunks()):
+                start = perf_counter()
+                qre = QueryResponseEntity.from_json(item, **self._decode_params)
+                decoding += perf_counter() - start
+                yield qre
+        finally:
+            self._record_request("query", rsp, seconds, received)
+            if decoding:
+                self._metrics.decode("query", decoding)  # type: ignore[union-attr]
+
+    def iter_query_image(self, nvr: str, **kwargs: Any) -> Iterator[QueryResponseEntity]:
+        """
+        Query StArMap using an image NVR, yielding each response while it's being received.
 
-    @property
-    def policies(self) -> Iterator[Policy]:
-        """Iterate over all Policies registered in StArMap."""
+        Unlike :meth:`query_image` the server response is parsed incrementally, thus only one
+        response is held in memory at a time. When the client has a cache the cached response is
+        returned, if any, while the streamed responses are never stored into it.
+
+        Args:
+            nvr (str): The image archive name or NVR.
+            workflow(Workflow, optional): The desired workflow to retrieve the mappings.
+
+        Returns:
+            Iterator with the query responses, which is empty when not found.
+        """
+        return self._iter_query({"image": nvr, **kwargs})
+
+    def iter_query_image_by_name(
+        self,
+        name: str,
+        version: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Iterator[QueryResponseEntity]:
+        """
+        Query StArMap using an image name, yielding each response while it's being received.
+
+        Unlike :meth:`query_image_by_name` the server response is parsed incrementally, thus
+        only one response is held in memory at a time. When the client has a cache the cached
+        response is returned, if any, while the streamed responses are never stored into it.
+
+        Args:
+            name (str): The image name from NVR.
+            version (str, optional): The version from NVR.
+            workflow(Workflow, optional): The desired workflow to retrieve the mappings.
+
+        Returns:
+            Iterator with the query responses, which is empty when not found.
+        """
+        return self._iter_query(self._name_params(name, version, **kwargs))
+
+    def _query_many(
+        self, queries: List[Tuple[str, Dict[str, Any]]], max_workers: Optional[int] = None
+    ) -> Dict[str, Optional[QueryResponseContainer]]:
+        """Run the given ``(key, params)`` queries concurrently and return the results by key.
+
+        Duplicated queries, including the ones for equivalent NVRs, are sent only once and the
+        queries answered by the local provider are not sent to the server. When any query fails
+        all the others are still completed and a :class:`BatchQueryError` is raised with them.
+        """
+        results: Dict[CacheKey, Optional[QueryResponseContainer]] = {}
+        errors: Dict[CacheKey, Exception] = {}
+        pending: Dict[CacheKey, Dict[str, Any]] = {}
+        keys = {key: make_cache_key(params) for key, params in queries}
+        for key, params in queries:
+            ckey = keys[key]
+            if ckey in results or ckey in pending or ckey in errors:
+                continue
+            try:
+                qr = self._query_provider(params)
+            except Exception as exc:
+                errors[ckey] = exc
+                continue
+            if qr:
+                results[ckey] = qr
+            else:
+                pending[ckey] = params
+
+        if pending:
+            workers = min(max_workers or self.MAX_WORKERS, len(pending))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {k: executor.submit(self._query_cached, p) for k, p in pending.items()}
+                for k, f in futures.items():
+                    try:
+                        results[k] = f.result()
+                    except Exception as exc:
+                        errors[k] = exc
+
+        # Preserve the input order in the returned dictionary
+        res = {key: results[keys[key]] for key, _ in queries if keys[key] in results}
+        if errors:
+            failed = {key: errors[keys[key]] for key, _ in queries if keys[key] in errors}
+            raise BatchQueryError(res, failed) from next(iter(errors.values()))
+        return res
+
+    def query_images(
+        self, nvrs: Iterable[str], max_workers: Optional[int] = None, **kwargs: Any
+    ) -> Dict[str, Optional[QueryResponseContainer]]:
+        """
+        Query StArMap for multiple images NVRs at once.
+
+        The local provider is queried first and the remaining NVRs are requested concurrently
+        to the server.
+
+        Args:
+            nvrs (list): The images archive names or NVRs.
+            max_workers (int, optional):
+                The maximum number of concurrent requests. Defaults to ``MAX_WORKERS``.
+            workflow(Workflow, optional): The desired workflow to retrieve the mappings.
+
+        Returns:
+            dict: The query result (or None when not found) for each NVR.
+        Raises:
+            BatchQueryError: When any query failed, with the results of the others.
+        """
+        queries = [(nvr, {"image": nvr, **kwargs}) for nvr in nvrs]
+        return self._query_many(queries, max_workers=max_workers)
+
+    def query_images_by_name(
+        self,
+        names: Iterable[str],
+        version: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        **kwargs: Any,
+    ) -> Dict[str, Optional[QueryResponseContainer]]:
+        """
+        Query StArMap for multiple images names at once.
+
+        The local provider is queried first and the remaining names are requested concurrently
+        to the server.
+
+        Args:
+            names (list): The images names from NVR.
+            version (str, optional): The version from NVR to query for all names.
+            max_workers (int, optional):
+                The maximum number of concurrent requests. Defaults to ``MAX_WORKERS``.
+
+        Returns:
+            dict: The query result (or None when not found) for each name.
+        Raises:
+            BatchQueryError: When any query failed, with the results of the others.
+        """
+        queries = [(name, self._name_params(name, version, **kwargs)) for name in names]
+        return self._query_many(queries, max_workers=max_workers)
+
+    def _get_policies_page(self, page: int) -> Optional[PoliciesPage]:
+        params = {"page": page, "per_page": self.POLICIES_PER_PAGE}
+        res = self._send("policy", "policy", params=params)
+        if res.status_code == 404:
+            log.error("No policies registered in StArMap.")
+            return None
+        res.raise_for_status()
+
+        def decode_page(data: PaginatedRawData, **kwargs: Any) -> PoliciesPage:
+            return data["nav"], [Policy.from_json(item, **kwargs) for item in data.get("items", [])]
+
+        return self._decode(res, decode_page, "policy")
+
+    def _prefetch_policies_pages(self) -> Iterator[PoliciesPage]:
+        """Yield the policies pages in order while fetching the next ones concurrently.
+
+        The pages are followed one at a time when the first one doesn't have ``total_pages``,
+        as well as the ones after the last prefetched page still linking to a next one.
+        """
+        data = self._get_policies_page(1)
+        if data is None:
+            return
+        yield data
+
+        # Not every server reports it, even though the metadata declares it
+        total_pages = cast(Optional[int], data[0].get("total_pages"))
+        if total_pages is None:
+            if data[0].get("next") is not None:
+                yield from self._iter_policies_pages(2)
+            return
+
+        window = self.POLICIES_PREFETCH_PAGES
+        pages = iter(range(2, total_pages + 1))
+        executor = ThreadPoolExecutor(max_workers=window)
+        try:
+            futures = deque(
+                executor.submit(self._get_policies_page, p) for p in islice(pages, window)
+            )
+            while futures:
+                next_data = futures.popleft().result()
+                if next_data is None:
+                    return
+                # Keep the window full while the current page is being consumed
+                futures.extend(
+                    executor.submit(self._get_policies_page, p) for p in islice(pages, 1)
+                )
+                data = next_data
+                yield data
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        # The policies may have grown after the first page was fetched
+        if data[0].get("next") is not None:
+            yield from self._iter_policies_pages(total_pages + 1)
+
+    def _iter_policies_pages(self, page: int = 1) -> Iterator[PoliciesPage]:
+        """Yield the policies pages in order, one request at a time, from the given page."""
         has_next_page = True
-        page = 1
 
         # Iterate over pagination until there is no longer a "next" URL
         while has_next_page:
-            params = {"page": page, "per_page": self.POLICIES_PER_PAGE}
-            res = self.session.get("policy", params=params)
-            if res.status_code == 404:
-                log.error("No policies registered in StArMap.")
+            data = self._get_policies_page(page)
+            if data is None:
                 return
-            res.raise_for_status()
-
-            data: PaginatedRawData = res.json()
-            nav = data["nav"]
-
-            # Yield all Policy elements from the current page list
-            for item in data.get("items", []):
-                yield Policy.from_json(item)
+            yield data
 
             # next iteration
-            has_next_page = nav.get("next") is not None
+            has_next_page = data[0].get("next") is not None
             page += 1
 
+    @property
+    def policies(self) -> Iterator[Policy]:
+        """Iterate over all Policies registered in StArMap.
+
+        When ``POLICIES_PREFETCH_PAGES`` is set the remaining pages are fetched concurrently
+        according to the ``total_pages`` of the first response, still yielding the policies
+        in order.
+        """
+        if self.POLICIES_PREFETCH_PAGES > 0:
+            pages = self._prefetch_policies_pages()
+        else:
+            pages = self._iter_policies_pages()
+
+        # Yield all Policy elements from each page list
+        for _, policies in pages:
+            yield from policies
+
     def list_policies(self) -> List[Policy]:
         """
         List all Policies present in StArMap.
@@ -146,7 +735,9 @@ class StarmapClient(object):
             list(Policy): List with all policies present in StArMap.
         """
         if not self._policies:
-            self._policies = [p for p in self.policies]
+            with self._policies_lock:
+                if not self._policies:
+                    self._policies = [p for p in self.policies]
         return self._policies
 
     def get_policy(self, policy_id: str) -> Optional[Policy]:
@@ -159,12 +750,8 @@ class StarmapClient(object):
         Returns:
             Policy: The requested Policy when found.
         """
-        rsp = self.session.get(f"/policy/{policy_id}")
-        if rsp.status_code == 404:
-            log.error(f"Policy not found with ID = \"{policy_id}\"")
-            return None
-        rsp.raise_for_status()
-        return Policy.from_json(json=rsp.json())
+        not_found = f"Policy not found with ID = \"{policy_id}\""
+        return self._get("policy/{id}", f"/policy/{policy_id}", Policy.from_json, not_found)
 
     def list_mappings(self, policy_id: str) -> List[Mapping]:
         """
@@ -193,12 +780,8 @@ class StarmapClient(object):
         Returns:
             The requested Marketplace Mapping when found.
         """
-        rsp = self.session.get(f"/mapping/{mapping_id}")
-        if rsp.status_code == 404:
-            log.error(f"Marketplace Mapping not found with ID = \"{mapping_id}\"")
-            return None
-        rsp.raise_for_status()
-        return Mapping.from_json(json=rsp.json())
+        not_found = f"Marketplace Mapping not found with ID = \"{mapping_id}\""
+        return self._get("mapping/{id}", f"/mapping/{mapping_id}", Mapping.from_json, not_found)
 
     def list_destinations(self, mapping_id: str) -> List[Destination]:
         """
@@ -227,9 +810,207 @@ class StarmapClient(object):
         Returns:
             The requested Destination when found.
         """
-        rsp = self.session.get(f"/destination/{destination_id}")
-        if rsp.status_code == 404:
-            log.error(f"Destination not found with ID = \"{destination_id}\"")
-            return None
+        not_found = f"Destination not found with ID = \"{destination_id}\""
+        return self._get(
+            "destination/{id}", f"/destination/{destination_id}", Destination.from_json, not_found
+        )
+
+    def _write(self, operation: WriteOperation, payload: Dict[str, Any]) -> WritableModel:
+        method, path, endpoint = operation.request()
+        rsp = self._send(endpoint, path, method, json=payload)
         rsp.raise_for_status()
-        return Destination.from_json(json=rsp.json())
+        res = self._decode(rsp, type(operation.obj).from_json, endpoint)
+        with self._policies_lock:
+            # The listed policies are no longer up to date
+            self._policies = []
+        if self._cache is not None:
+            # Neither are the cached query responses
+            self._cache.clear()
+        return cast(WritableModel, res)
+
+    def create_policy(self, policy: Policy) -> Policy:
+        """
+        Create a new policy, with its mappings and destinations, in StArMap.
+
+        Args:
+            policy (Policy): The policy to create.
+
+        Returns:
+            Policy: The created policy returned by the server.
+        Raises:
+            requests.HTTPError: When the server rejects the request.
+        """
+        operation = WriteOperation(policy)
+        return cast(Policy, self._write(operation, model_to_json(policy)))
+
+    def update_policy(self, policy: Policy) -> Policy:
+        """
+        Replace an existing policy in StArMap by the one with the same ID.
+
+        Args:
+            policy (Policy): The policy to update.
+
+        Returns:
+            Policy: The updated policy returned by the server.
+        Raises:
+            ValueError: When the policy has no ID.
+            requests.HTTPError: When the server rejects the request.
+        """
+        operation = WriteOperation(policy, update=True)
+        return cast(Policy, self._write(operation, model_to_json(policy)))
+
+    def create_mapping(self, policy_id: str, mapping: Mapping) -> Mapping:
+        """
+        Create a new Marketplace Mapping, with its destinations, in a policy.
+
+        Args:
+            policy_id (str): The ID of the Policy to add the mapping to.
+            mapping (Mapping): The mapping to create.
+
+        Returns:
+            Mapping: The created mapping returned by the server.
+        Raises:
+            requests.HTTPError: When the server rejects the request.
+        """
+        operation = WriteOperation(mapping, parent_id=policy_id)
+        return cast(Mapping, self._write(operation, model_to_json(mapping)))
+
+    def update_mapping(self, mapping: Mapping) -> Mapping:
+        """
+        Replace an existing Marketplace Mapping in StArMap by the one with the same ID.
+
+        Args:
+            mapping (Mapping): The mapping to update.
+
+        Returns:
+            Mapping: The updated mapping returned by the server.
+        Raises:
+            ValueError: When the mapping has no ID.
+            requests.HTTPError: When the server rejects the request.
+        """
+        operation = WriteOperation(mapping, update=True)
+        return cast(Mapping, self._write(operation, model_to_json(mapping)))
+
+    def create_destination(self, mapping_id: str, destination: Destination) -> Destination:
+        """
+        Create a new Destination in a Marketplace Mapping.
+
+        Args:
+            mapping_id (str): The ID of the Marketplace Mapping to add the destination to.
+            destination (Destination): The destination to create.
+
+        Returns:
+            Destination: The created destination returned by the server.
+        Raises:
+            requests.HTTPError: When the server rejects the request.
+        """
+        operation = WriteOperation(destination, parent_id=mapping_id)
+        return cast(Destination, self._write(operation, model_to_json(destination)))
+
+    def update_destination(self, destination: Destination) -> Destination:
+        """
+        Replace an existing Destination in StArMap by the one with the same ID.
+
+        Args:
+            destination (Destination): The destination to update.
+
+        Returns:
+            Destination: The updated destination returned by the server.
+        Raises:
+            ValueError: When the destination has no ID.
+            requests.HTTPError: When the server rejects the request.
+        """
+        operation = WriteOperation(destination, update=True)
+        return cast(Destination, self._write(operation, model_to_json(destination)))
+
+    def _write_backoff(self, retry: int, errors: List[Optional[Exception]]) -> float:
+        """Return the time to wait before sending the failed operations again."""
+        factor = getattr(self.session, "backoff_factor", self.WRITE_BACKOFF_FACTOR)
+        delay = factor * (2 ** (retry - 1))
+        for exc in errors:
+            retry_after = _retry_after(exc)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+        return float(min(self.WRITE_BACKOFF_MAX, delay))
+
+    def bulk_write(
+        self,
+        operations: Iterable[WriteOperation],
+        max_workers: Optional[int] = None,
+        retries: Optional[int] = None,
+    ) -> List[WriteResult]:
+        """
+        Create and update multiple objects in StArMap at once.
+
+        The operations are sent concurrently and their errors don't stop the others. Once all of
+        them were sent, the updates which failed with a connection error, a timeout, a server
+        error (5xx) or ``429 Too Many Requests`` are sent again. Since creating an object isn't
+        idempotent, the creations are only sent again when the connection couldn't be
+        established. Each object is converted into JSON only once, regardless of the number of
+        attempts.
+
+        The errors raised by the session once it exhausted its own ``retries``, like a
+        ``RetryError`` or a connection error, aren't sent again, thus a :class:`StarmapSession`
+        tries to reach a dead host only ``1 + retries`` times per operation (4 by default). The
+        other errors, e.g. ``429``, are sent up to ``1 + WRITE_RETRIES`` times, each attempt
+        retried by the session according to its own policy. The sessions without a ``retries``
+        attribute are considered to not retry the requests.
+
+        Before each retry it waits for the session ``backoff_factor``, or ``WRITE_BACKOFF_FACTOR``
+        when it has none, times ``2 ** (retry - 1)`` seconds, or longer when a ``429`` or ``503``
+        response asks for it through its ``Retry-After`` header, up to ``WRITE_BACKOFF_MAX``
+        seconds.
+
+        Args:
+            operations (list): The operations to perform.
+            max_workers (int, optional):
+                The maximum number of concurrent requests. Defaults to ``MAX_WORKERS``.
+            retries (int, optional):
+                The number of times to send the failed operations again. Defaults to
+                ``WRITE_RETRIES``.
+
+        Returns:
+            list: The result of each operation, in the same order.
+        """
+        operations = list(operations)
+        if not operations:
+            return []
+        payloads = [model_to_json(op.obj) for op in operations]
+        results: List[WriteResult] = []
+        pending = list(range(len(operations)))
+        attempts = 1 + (self.WRITE_RETRIES if retries is None else retries)
+        workers = min(max_workers or self.MAX_WORKERS, len(operations))
+        session_retries = getattr(self.session, "retries", 0)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for attempt in range(1, attempts + 1):
+                futures = {
+                    i: executor.submit(self._write, operations[i], payloads[i]) for i in pending
+                }
+                pending = []
+                for i, future in futures.items():
+                    try:
+                        res = WriteResult(operations[i], future.result(), None, attempt)
+                    except Exception as exc:
+                        res = WriteResult(operations[i], None, exc, attempt)
+                        if _is_retryable(operations[i], exc, session_retries):
+                            pending.append(i)
+                    if attempt == 1:
+                        results.append(res)
+                    else:
+                        results[i] = res
+                if not pending or attempt == attempts:
+                    break
+                delay = self._write_backoff(attempt, [results[i].error for i in pending])
+                log.warning(
+                    "Retrying %d failed writes in %.1f seconds (attempt %d)",
+                    len(pending),
+                    delay,
+                    attempt,
+                )
+                sleep(delay)
+
+        failed = sum(not r.ok for r in results)
+        if failed:
+            log.error("Failed to write %d of %d objects", failed, len(results))
+        return results
@@ -0,0 +1,225 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Any, Dict, List, Sequence, Tuple
+
+import requests
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+"""The default upper bounds in seconds of the histograms buckets, same as Prometheus."""
+
+
+def response_retries(rsp: requests.Response) -> int:
+    """Return the number of retries performed by ``urllib3`` to get the given response."""
+    retries = getattr(getattr(rsp, "raw", None), "retries", None)
+    history = getattr(retries, "history", None)
+    return len(history) if isinstance(history, tuple) else 0
+
+
+class StarmapMetrics(ABC):
+    """Define the interface for receiving the client instrumentation events.
+
+    The methods are called synchronously by the client, possibly from multiple threads at the
+    same time, thus the implementations must be thread-safe and fast. They can forward the events
+    to any metrics or tracing system, like Prometheus or OpenTelemetry.
+    """
+
+    @abstractmethod
+    def request(
+        self,
+        endpoint: str,
+        method: str,
+        status: int,
+        seconds: float,
+        bytes_received: int,
+        retries: int,
+    ) -> None:
+        """Record a request sent to the server.
+
+        Args:
+            endpoint (str):
+                The endpoint template, e.g. ``query`` or ``policy/{id}``.
+            method (str):
+                The HTTP method.
+            status (int):
+                The response status code. It's ``304`` when a conditional request returned the
+                stored response and ``0`` when the request failed without a response.
+            seconds (float):
+                The time until the response was received.
+            bytes_received (int):
+                The size of the response body.
+            retries (int):
+                The number of retries performed before getting the response.
+        """
+
+    @abstractmethod
+    def decode(self, endpoint: str, seconds: float) -> None:
+        """Record the time spent converting a response body into models.
+
+        Args:
+            endpoint (str):
+                The endpoint template of the decoded response.
+            seconds (float):
+                The time spent decoding it.
+        """
+
+    @abstractmethod
+    def lookup(self, source: str, hit: bool) -> None:
+        """Record a lookup on the local sources before sending a query to the server.
+
+        Args:
+            source (str):
+                The source looked up: ``provider`` or ``cache``.
+            hit (bool):
+                Whether the source had the response.
+        """
+
+
+class Histogram:
+    """Count the observed values into cumulative buckets, like a Prometheus histogram."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """Create a new Histogram object.
+
+        Args:
+            buckets (list, optional)
+                The sorted upper bounds of the buckets. Defaults to ``DEFAULT_BUCKETS``.
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add a value to the histogram."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """Return the upper bound and the cumulative count of each bucket, ending with ``inf``."""
+        res = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            res.append((bound, total))
+        return res
+
+
+class MetricsRecorder(StarmapMetrics):
+    """Thread-safe in memory recorder of the client metrics.
+
+    The values can be read from its attributes or exported in the Prometheus text format with
+    :meth:`to_prometheus`.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """Create a new MetricsRecorder object.
+
+        Args:
+            buckets (list, optional)
+                The upper bounds in seconds of the latency histograms buckets.
+        """
+        self._buckets = buckets
+        self.latency: Dict[str, Histogram] = {}
+        self.decode_time: Dict[str, Histogram] = {}
+        self.requests: Dict[Tuple[str, str, int], int] = {}
+        self.retries: Dict[str, int] = {}
+        self.bytes_received: Dict[str, int] = {}
+        self.lookups: Dict[Tuple[str, bool], int] = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, histograms: Dict[str, Histogram], endpoint: str) -> Histogram:
+        histogram = histograms.get(endpoint)
+        if histogram is None:
+            histogram = histograms[endpoint] = Histogram(self._buckets)
+        return histogram
+
+    def request(
+        self,
+        endpoint: str,
+        method: str,
+        status: int,
+        seconds: float,
+        bytes_received: int,
+        retries: int,
+    ) -> None:
+        """Record a request sent to the server."""
+        with self._lock:
+            self._histogram(self.latency, endpoint).observe(seconds)
+            key = (endpoint, method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.retries[endpoint] = self.retries.get(endpoint, 0) + retries
+            self.bytes_received[endpoint] = self.bytes_received.get(endpoint, 0) + bytes_received
+
+    def decode(self, endpoint: str, seconds: float) -> None:
+        """Record the time spent converting a response body into models."""
+        with self._lock:
+            self._histogram(self.decode_time, endpoint).observe(seconds)
+
+    def lookup(self, source: str, hit: bool) -> None:
+        """Record a lookup on the local sources before sending a query to the server."""
+        with self._lock:
+            self.lookups[(source, hit)] = self.lookups.get((source, hit), 0) + 1
+
+    def to_prometheus(self, prefix: str = "starmap_client") -> str:
+        """Return the metrics in the Prometheus text exposition format.
+
+        Args:
+            prefix (str, optional)
+                The prefix for the metrics names. Defaults to ``starmap_client``.
+        Returns:
+            str: The metrics ready to be served to a Prometheus scraper.
+        """
+        lines: List[str] = []
+
+        def add_histogram(name: str, help: str, histograms: Dict[str, Histogram]) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help}")
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for endpoint, h in sorted(histograms.items()):
+                for bound, count in h.cumulative():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    labels = f'endpoint="{endpoint}",le="{le}"'
+                    lines.append(f"{prefix}_{name}_bucket{{{labels}}} {count}")
+                lines.append(f'{prefix}_{name}_sum{{endpoint="{endpoint}"}} {h.sum!r}')
+                lines.append(f'{prefix}_{name}_count{{endpoint="{endpoint}"}} {h.count}')
+
+        def add_counter(name: str, help: str, values: Dict[Any, int], labels: Any) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for key, value in sorted(values.items()):
+                lines.append(f"{prefix}_{name}{{{labels(key)}}} {value}")
+
+        with self._lock:
+            add_histogram(
+                "request_duration_seconds", "Time to receive the responses.", self.latency
+            )
+            add_histogram(
+                "decode_duration_seconds", "Time to convert the responses.", self.decode_time
+            )
+            add_counter(
+                "requests_total",
+                "Requests sent to the server.",
+                self.requests,
+                lambda k: f'endpoint="{k[0]}",method="{k[1]}",status="{k[2]}"',
+            )
+            add_counter(
+                "retries_total",
+                "Retries performed by the requests.",
+                self.retries,
+                lambda k: f'endpoint="{k}"',
+            )
+            add_counter(
+                "received_bytes_total",
+                "Size of the received responses bodies.",
+                self.bytes_received,
+                lambda k: f'endpoint="{k}"',
+            )
+            add_counter(
+                "lookups_total",
+                "Lookups on the local provider and cache.",
+                self.lookups,
+                lambda k: f'source="{k[0]}",result="{"hit" if k[1] else "miss"}"',
+            )
+        return "\n".join(lines) + "\n"
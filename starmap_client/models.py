@@ -1,13 +1,38 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 from __future__ import annotations
 
+from contextvars import ContextVar
 from enum import Enum
-from typing import Any, Dict, Generic, List, Optional, Type, TypedDict, TypeVar, cast
-
-from attrs import Attribute, field, frozen
+from itertools import combinations, islice
+from json import dumps as json_dumps
+from threading import Lock
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    ItemsView,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypedDict,
+    TypeVar,
+    ValuesView,
+    cast,
+)
+from weakref import finalize
+
+from attrs import Attribute, field, fields, frozen
 from attrs.validators import deep_iterable, deep_mapping, instance_of, min_len, optional
 
-from starmap_client.utils import assert_is_dict, dict_merge
+from starmap_client.utils import (
+    assert_is_dict,
+    compile_version_pattern,
+    dict_merge,
+    json_dumps_bytes,
+)
 
 __all__ = [
     'BillingCodeRule',
@@ -57,6 +82,274 @@ class Workflow(str, Enum):
 
 
 T = TypeVar('T')
+V = TypeVar('V')
+
+_trusted_decode: ContextVar[bool] = ContextVar("starmap_trusted_decode", default=False)
+"""Whether the models being decoded in the current context skip the attributes validation."""
+
+_lazy_decode: ContextVar[bool] = ContextVar("starmap_lazy_decode", default=False)
+"""Whether the models being decoded in the current context defer their nested objects."""
+
+_FieldsTable = Tuple[Tuple[str, Optional[Callable[[Any], Any]], bool], ...]
+
+
+_fields_tables: Dict[type, _FieldsTable] = {}
+
+
+def _fields_table(cls: type) -> _FieldsTable:
+    """Return the name, converter and whether to intern each attribute set by the initializer."""
+    table = _fields_tables.get(cls)
+    if table is None:
+        table = tuple(
+            (a.name, a.converter, a.metadata.get("intern", False)) for a in fields(cls) if a.init
+        )
+        _fields_tables[cls] = table
+    return table
+
+
+_JSONTable = Tuple[Tuple[str, str], ...]
+
+
+_json_tables: Dict[type, _JSONTable] = {}
+
+
+def _json_table(cls: type) -> _JSONTable:
+    """Return the name and JSON key of each attribute set by the initializer."""
+    table = _json_tables.get(cls)
+    if table is None:
+        table = tuple((a.name, a.metadata.get("json_key", a.name)) for a in fields(cls) if a.init)
+        _json_tables[cls] = table
+    return table
+
+
+def _to_json_value(value: Any, exclude_none: bool) -> Any:
+    """Convert an attribute value into JSON, keeping the plain dictionaries as they're."""
+    if isinstance(value, StarmapJSONDecodeMixin):
+        return value.to_json(exclude_none)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, list):
+        return [_to_json_value(v, exclude_none) for v in value]
+    if isinstance(value, dict) and value:
+        items = value.items()
+        # The mappings and billing code rules are the only dictionaries with models
+        if isinstance(next(iter(items))[1], StarmapJSONDecodeMixin):
+            return {k: v.to_json(exclude_none) for k, v in items}
+    return value
+
+
+class _Interner:
+    """Share a single instance of the equal strings and dictionaries among the decoded objects."""
+
+    def __init__(self) -> None:
+        self._strings: Dict[str, str] = {}
+        self._dicts: Dict[str, Dict[str, Any]] = {}
+        self._dict_ids: Dict[int, Dict[str, Any]] = {}
+        self._merged: Dict[Tuple[int, str], Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+
+    def intern(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return self._strings.setdefault(value, value)
+        if isinstance(value, dict):
+            if id(value) in self._dict_ids:  # Already interned
+                return value
+            try:
+                # The JSON keeps the values types and the keys order
+                key = json_dumps(value, separators=(",", ":"))
+            except (TypeError, ValueError):  # Not a JSON value
+                return value
+            value = self._dicts.setdefault(key, value)
+            self._dict_ids[id(value)] = value
+            return value
+        return value
+
+    def merge(self, parent: Dict[str, Any], child: Dict[str, Any]) -> Dict[str, Any]:
+        """Return the interned merge of the parent and child ``meta``.
+
+        The merge is done once per parent instance and distinct child ``meta``.
+        """
+        if child == {}:
+            # Without its own meta the child inherits an equal one, thus it just shares the parent's
+            assert_is_dict(parent)
+            return cast(Dict[str, Any], self.intern(parent))
+        try:
+            key = (id(parent), json_dumps(child, separators=(",", ":")))
+        except (TypeError, ValueError):  # Not a JSON value
+            return dict_merge(parent, child)
+        cached = self._merged.get(key)
+        if cached is None:
+            # The parent is kept to prevent its id from being reused while cached
+            merged = cast(Dict[str, Any], self.intern(dict_merge(parent, child)))
+            cached = self._merged.setdefault(key, (parent, merged))
+        return cached[1]
+
+
+_interner: ContextVar[Optional[_Interner]] = ContextVar("starmap_interner", default=None)
+"""The interner for the models being decoded in the current context, when enabled."""
+
+
+def _get_meta(json: Dict[str, Any]) -> Any:
+    """Return the ``meta`` of a JSON object, which is empty when missing or ``null``."""
+    meta = json.get("meta")
+    return {} if meta is None else meta
+
+
+def _merge_meta(parent: Dict[str, Any], child: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge the inherited ``meta`` from the parent into the child one."""
+    interner = _interner.get()
+    if interner is None:
+        return dict_merge(parent, child)
+    return interner.merge(parent, child)
+
+
+class _Raw:
+    """Hold the JSON of a value not converted yet by :class:`_LazyDict`."""
+
+    __slots__ = ("json",)
+
+    def __init__(self, json: Any) -> None:
+        self.json = json
+
+
+class _LazyDict(Dict[str, V]):
+    """Dictionary which converts each raw JSON value into its model on the first access.
+
+    It behaves as a regular dictionary of models, thus the reads, comparisons, copies and
+    serialization convert the values they touch while the unread ones cost only their JSON.
+    Once all the values are converted the converter is released, with the decoding state it
+    holds, e.g. the interner.
+    """
+
+    __slots__ = ("_converter", "_pending")
+
+    _locks = tuple(Lock() for _ in range(64))
+    """Locks striped over the instances, to avoid serializing all the conversions while
+    keeping the instances small."""
+
+    def __init__(self, json: Dict[str, Any], converter: Callable[[Any], V]) -> None:
+        super().__init__(cast(Dict[str, V], {k: _Raw(v) for k, v in json.items()}))
+        self._converter: Optional[Callable[[Any], V]] = converter
+        self._pending = len(json)
+
+    def _convert(self, key: str, value: Any) -> V:
+        if not isinstance(value, _Raw):
+            return cast(V, value)
+        with self._locks[id(self) % len(self._locks)]:
+            # Another thread may have converted it while waiting for the lock
+            current = super().get(key, value)
+            if current is value:
+                current = cast(Callable[[Any], V], self._converter)(value.json)
+                super().__setitem__(key, current)
+                self._pending -= 1
+                if not self._pending:
+                    self._converter = None
+        return cast(V, current)
+
+    def _convert_all(self) -> None:
+        for k, v in super().items():
+            if isinstance(v, _Raw):
+                self._convert(k, v)
+
+    def __getitem__(self, key: str) -> V:
+        return self._convert(key, super().__getitem__(key))
+
+    def __iter__(self) -> Iterator[str]:
+        # Overriding it also makes dict(), update() and ** unpacking read through __getitem__
+        return super().__iter__()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the converted value for the key, or the default when not found."""
+        return self[key] if key in self else default
+
+    def pop(self, key: str, *args: Any) -> Any:
+        """Remove the key and return its converted value, or the default when not found."""
+        if key not in self and args:
+            return args[0]
+        value = self[key]
+        super().pop(key)
+        return value
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        """Return the converted value for the key, setting the default when not found."""
+        if key in self:
+            return self[key]
+        return super().setdefault(key, default)
+
+    def items(self) -> ItemsView[str, V]:  # type: ignore[override]
+        """Return the items with all the values converted."""
+        self._convert_all()
+        return super().items()
+
+    def values(self) -> ValuesView[V]:  # type: ignore[override]
+        """Return all the values converted."""
+        self._convert_all()
+        return super().values()
+
+    def popitem(self) -> Tuple[str, V]:
+        """Remove and return the last item with its value converted."""
+        self._convert_all()
+        return super().popitem()
+
+    def copy(self) -> Dict[str, V]:
+        """Return a regular dictionary with all the values converted."""
+        return dict(self.items())
+
+    def __or__(self, other: Any) -> Any:
+        return self.copy() | other
+
+    def __ror__(self, other: Any) -> Any:
+        return other | self.copy()
+
+    def __eq__(self, other: object) -> bool:
+        for d in (self, other):
+            if isinstance(d, _LazyDict):
+                d._convert_all()
+        return super().__eq__(other)
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+    def __repr__(self) -> str:
+        self._convert_all()
+        return super().__repr__()
+
+    def __reduce__(self) -> Any:
+        # Pickled and deep-copied as a regular dictionary of models
+        return (dict, (self.copy(),))
+
+
+def _lazy_or(validator: Callable[[Any, Attribute[Any], Any], None]) -> Any:
+    """Skip the validation of the values in a :class:`_LazyDict`, checked once converted."""
+
+    def validate(instance: Any, attribute: Attribute[Any], value: Any) -> None:
+        if not isinstance(value, _LazyDict):
+            validator(instance, attribute, value)
+
+    return validate
+
+
+def _lazy_converter(
+    converter_type: Type[StarmapJSONDecodeMixin[T]], parent_meta: Optional[Dict[str, Any]]
+) -> Callable[[Dict[str, Any]], T]:
+    """Return the function converting a :class:`_LazyDict` value with the current options.
+
+    The value inherits the ``meta`` from the parent, when given, before being converted. When
+    interning, the value shares the interner of the whole response, which the concurrent
+    conversions can use since it only stores the values with atomic ``dict.setdefault`` calls.
+    """
+    trusted = _trusted_decode.get()
+    interner = _interner.get()
+
+    def convert(json: Dict[str, Any]) -> T:
+        token = _interner.set(interner)
+        try:
+            if parent_meta is not None:
+                json["meta"] = _merge_meta(parent_meta, _get_meta(json))
+            return converter_type.from_json(json, trusted=trusted)
+        finally:
+            _interner.reset(token)
+
+    return convert
 
 
 @frozen
@@ -93,31 +386,119 @@ class StarmapJSONDecodeMixin(Generic[T]):
         return json
 
     @classmethod
-    def from_json(cls, json: Any) -> T:
+    def _from_trusted_json(cls, json: Dict[str, Any]) -> T:
+        """Build the object from the preprocessed JSON applying the converters only."""
+        obj = object.__new__(cls)
+        for name, converter, _ in _fields_table(cls):
+            value = json.pop(name, None)
+            if converter is not None:
+                value = converter(value)
+            object.__setattr__(obj, name, value)
+        return cast(T, obj)
+
+    @classmethod
+    def from_json(
+        cls, json: Any, trusted: bool = False, intern: bool = False, lazy: bool = False
+    ) -> T:
         """
         Convert a JSON dictionary into class object.
 
         Args:
             json (dict)
                 A JSON containing a StArMap response.
+            trusted (bool, optional)
+                Whether the JSON comes from a trusted source, skipping the validation of the
+                attributes for this object and all its nested objects. Defaults to ``False``.
+            intern (bool, optional)
+                Whether to share a single instance of the equal ``meta``, ``tags`` and string
+                attributes among this object and all its nested objects, reducing the memory
+                usage. The shared dictionaries must not be modified. Defaults to ``False``.
+            lazy (bool, optional)
+                Whether to keep the ``mappings`` and ``billing_code_config`` values of the query
+                responses as JSON, converting each one only on its first access. Defaults to
+                ``False``.
         Returns:
             The converted object from JSON.
         """
+        if lazy and not _lazy_decode.get():
+            lazy_token = _lazy_decode.set(True)
+            try:
+                return cls.from_json(json, trusted=trusted, intern=intern)
+            finally:
+                _lazy_decode.reset(lazy_token)
+        if trusted and not _trusted_decode.get():
+            token = _trusted_decode.set(True)
+            try:
+                return cls.from_json(json, intern=intern)
+            finally:
+                _trusted_decode.reset(token)
+        if intern and _interner.get() is None:
+            interner_token = _interner.set(_Interner())
+            try:
+                return cls.from_json(json)
+            finally:
+                _interner.reset(interner_token)
+
         cls._assert_json_dict(json)
         json = cls._preprocess_json(json)
 
-        args = {}
-        cls_attr = [a.name for a in cls.__attrs_attrs__ if isinstance(a, Attribute)]
-        for a in cls_attr:
-            args[a] = json.pop(a, None)
+        table = _fields_table(cls)
+        interner = _interner.get()
+        if interner is not None:
+            for name, _, interned in table:
+                if interned and name in json:
+                    json[name] = interner.intern(json[name])
+
+        if _trusted_decode.get():
+            return cls._from_trusted_json(json)
+        args = {name: json.pop(name, None) for name, _, _ in table}
         return cast(T, cls(**args))
 
+    def to_json(self, exclude_none: bool = False) -> Dict[str, Any]:
+        """
+        Convert this object and all its nested objects into JSON.
+
+        The result can be converted back into an equal object with :meth:`from_json`. The
+        ``meta`` and ``tags`` dictionaries are shared with the object, thus they must not be
+        modified.
+
+        Args:
+            exclude_none (bool, optional)
+                Whether to leave out the attributes which aren't set, like the ``id`` of the
+                query responses. Defaults to ``False``.
+        Returns:
+            dict: The JSON representation of the object.
+        """
+        res: Dict[str, Any] = {}
+        for name, key in _json_table(type(self)):
+            value = getattr(self, name)
+            if value is None:
+                if not exclude_none:
+                    res[key] = None
+                continue
+            res[key] = _to_json_value(value, exclude_none)
+        return res
+
+    def to_json_bytes(self, exclude_none: bool = False) -> bytes:
+        """
+        Encode this object and all its nested objects into compact UTF-8 JSON.
+
+        It uses ``orjson`` when installed, which is much faster for large outputs.
+
+        Args:
+            exclude_none (bool, optional)
+                Whether to leave out the attributes which aren't set. Defaults to ``False``.
+        Returns:
+            bytes: The encoded JSON representation of the object.
+        """
+        return json_dumps_bytes(self.to_json(exclude_none))
+
 
 @frozen
 class MetaMixin:
     """Mixin for defining the meta attribute and its validator."""
 
-    meta: Optional[Dict[str, Any]] = field()
+    meta: Optional[Dict[str, Any]] = field(metadata={"intern": True})
     """Dictionary with additional information related to a VM image."""
 
     @meta.validator
@@ -146,10 +527,12 @@ class StarmapBaseData(MetaMixin, StarmapJSONDecodeMixin[T]):
 class Destination(StarmapBaseData["Destination"]):
     """Represent a destination entry from Mapping."""
 
-    architecture: Optional[str] = field(validator=optional(instance_of(str)))
+    architecture: Optional[str] = field(
+        validator=optional(instance_of(str)), metadata={"intern": True}
+    )
     """Architecture of the VM image."""
 
-    destination: str = field(validator=instance_of(str))
+    destination: str = field(validator=instance_of(str), metadata={"intern": True})
     """The product listing destination in the cloud marketplace."""
 
     overwrite: bool = field(validator=instance_of(bool))
@@ -170,7 +553,7 @@ class Destination(StarmapBaseData["Destination"]):
     """Ami versioning template. Available options are major,minor,patch, or version.
     Such as {major}.{minor}. If version is used it'll use the already available version."""
 
-    provider: Optional[str] = field(validator=optional(instance_of(str)))
+    provider: Optional[str] = field(validator=optional(instance_of(str)), metadata={"intern": True})
     """Represent the RHSM provider name for the community workflow."""
 
     tags: Optional[Dict[str, str]] = field(
@@ -180,7 +563,8 @@ class Destination(StarmapBaseData["Destination"]):
                 value_validator=instance_of(str),
                 mapping_validator=instance_of(dict),
             )
-        )
+        ),
+        metadata={"intern": True},
     )
     """Dictionary with custom tags to be set on cloud marketplaces resources."""
 
@@ -224,6 +608,22 @@ class Mapping(StarmapBaseData["Mapping"]):
 
     It can't be set together with ``version_fnmatch``."""
 
+    def matches_version(self, version: str) -> bool:
+        """Return whether the mapping applies to the given NVR version.
+
+        The ``version_fnmatch`` must match the whole version while the ``version_regexmatch``
+        must match from its beginning. A mapping without any of them applies to every version.
+        The patterns are compiled once and cached.
+
+        Args:
+            version (str):
+                The version from the NVR.
+        Returns:
+            bool: Whether the version is matched.
+        """
+        pattern = compile_version_pattern(self.version_fnmatch, self.version_regexmatch)
+        return pattern is None or pattern.match(version) is not None
+
 
 def _to_list_mappings(x: List[Any]) -> List[Mapping]:
     return [Mapping.from_json(m) for m in x] if x else []
@@ -254,6 +654,17 @@ class Policy(StarmapBaseData["Policy"]):
     workflow: Workflow = field(converter=_to_workflow)
     """The policy workflow name."""
 
+    def mappings_for_version(self, version: str) -> List[Mapping]:
+        """Return the mappings which apply to the given NVR version.
+
+        Args:
+            version (str):
+                The version from the NVR.
+        Returns:
+            list: The matched mappings, in the policy order.
+        """
+        return [m for m in self.mappings if m.matches_version(version)]
+
 
 # ============================================ APIv2 ===============================================
 
@@ -321,9 +732,9 @@ class MappingResponseObject(MetaMixin, StarmapJSONDecodeMixin["MappingResponseOb
         destinations = json.get("destinations", [])
         if not isinstance(destinations, list):
             raise ValueError(f"Expected destinations to be a list, got \"{type(destinations)}\"")
-        meta = json.get("meta", {})
+        meta = _get_meta(json)
         for d in destinations:
-            d["meta"] = dict_merge(meta, d.get("meta", {}))
+            d["meta"] = _merge_meta(meta, _get_meta(d))
 
     @classmethod
     def _preprocess_json(cls, json: Dict[str, Any]) -> Dict[str, Any]:
@@ -355,12 +766,15 @@ class QueryResponseEntity(MetaMixin, StarmapJSONDecodeMixin["QueryResponseEntity
 
     billing_code_config: Optional[Dict[str, BillingCodeRule]] = field(
         validator=optional(
-            deep_mapping(
-                key_validator=instance_of(str),
-                value_validator=instance_of(BillingCodeRule),
-                mapping_validator=instance_of(dict),
+            _lazy_or(
+                deep_mapping(
+                    key_validator=instance_of(str),
+                    value_validator=instance_of(BillingCodeRule),
+                    mapping_validator=instance_of(dict),
+                )
             )
-        )
+        ),
+        metadata={"json_key": "billing-code-config"},
     )
     """The Billing Code Configuration for the community workflow."""
 
@@ -371,10 +785,12 @@ class QueryResponseEntity(MetaMixin, StarmapJSONDecodeMixin["QueryResponseEntity
     """The :class:`~Policy` workflow."""
 
     mappings: Dict[str, MappingResponseObject] = field(
-        validator=deep_mapping(
-            key_validator=instance_of(str),
-            value_validator=instance_of(MappingResponseObject),
-            mapping_validator=instance_of(dict),
+        validator=_lazy_or(
+            deep_mapping(
+                key_validator=instance_of(str),
+                value_validator=instance_of(MappingResponseObject),
+                mapping_validator=instance_of(dict),
+            )
         ),
     )
     """Dictionary with the cloud account names and MappingResponseObjects."""
@@ -408,9 +824,9 @@ class QueryResponseEntity(MetaMixin, StarmapJSONDecodeMixin["QueryResponseEntity
     def _unify_meta_with_mappings(json: Dict[str, Any]) -> None:
         """Merge the ``meta`` data from package into the mappings."""
         mappings = json.get("mappings", {})
-        meta = json.get("meta", {})
+        meta = _get_meta(json)
         for k, v in mappings.items():
-            mappings[k]["meta"] = dict_merge(meta, v.get("meta", {}))
+            mappings[k]["meta"] = _merge_meta(meta, _get_meta(v))
 
     @classmethod
     def _preprocess_json(cls, json: Dict[str, Any]) -> Dict[str, Any]:
@@ -424,23 +840,116 @@ class QueryResponseEntity(MetaMixin, StarmapJSONDecodeMixin["QueryResponseEntity
         """  # noqa: D202 E501
 
         def parse_entity_build_obj(
-            entity_name: str, converter_type: Type[StarmapJSONDecodeMixin[T]]
+            entity_name: str,
+            converter_type: Type[StarmapJSONDecodeMixin[T]],
+            parent_meta: Optional[Dict[str, Any]] = None,
         ) -> None:
             entity = json.pop(entity_name, {})
             for k in entity.keys():
                 assert_is_dict(entity[k])
-                obj = converter_type.from_json(entity[k])
-                entity[k] = obj
+                if not lazy:
+                    obj = converter_type.from_json(entity[k])
+                    entity[k] = obj
+            if lazy and entity:
+                entity = _LazyDict(entity, _lazy_converter(converter_type, parent_meta))
             json[entity_name] = entity
 
+        lazy = _lazy_decode.get()
+
         bcc = json.pop("billing-code-config", {})
         json["billing_code_config"] = bcc
-        cls._unify_meta_with_mappings(json)
-        parse_entity_build_obj("mappings", MappingResponseObject)
+        if lazy:
+            # The meta is also merged into each mapping only when it's converted
+            parse_entity_build_obj("mappings", MappingResponseObject, _get_meta(json))
+        else:
+            cls._unify_meta_with_mappings(json)
+            parse_entity_build_obj("mappings", MappingResponseObject)
         parse_entity_build_obj("billing_code_config", BillingCodeRule)
         return json
 
 
+_IndexKey = Tuple[Tuple[str, Any], ...]
+
+
+class _ResponsesIndex:
+    """Hash index of :class:`~QueryResponseEntity` by ``name``, ``cloud`` and ``workflow``.
+
+    Each entity is stored under every combination of the indexed attributes, thus
+    any ``filter_by`` call using only those attributes is answered by a single lookup.
+    """
+
+    FIELDS = ("cloud", "name", "workflow")
+    """The indexed attributes, in the same (sorted) order used to build the keys."""
+
+    def __init__(self) -> None:
+        self.size = 0
+        self.last: Optional[QueryResponseEntity] = None
+        self.buckets: Dict[_IndexKey, List[QueryResponseEntity]] = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def make_key(filters: Dict[str, Any]) -> _IndexKey:
+        """Return the index key for the given filters."""
+        return tuple(sorted(filters.items()))
+
+    def _is_current(self, responses: List[QueryResponseEntity]) -> bool:
+        if len(responses) != self.size:
+            return False
+        return self.size == 0 or responses[self.size - 1] is self.last
+
+    def invalidate(self) -> None:
+        """Discard the index, which is rebuilt on the next update."""
+        with self._lock:
+            self.size = 0
+            self.last = None
+            self.buckets = {}
+
+    def update(self, responses: List[QueryResponseEntity]) -> None:
+        """Synchronize the index with the given list of responses.
+
+        Appended responses are indexed incrementally while any other change detected in the
+        list, like a removed or replaced last response, triggers a full rebuild.
+        """
+        if self._is_current(responses):
+            return
+        with self._lock:
+            indexed = self.size
+            if indexed > len(responses) or (indexed and responses[indexed - 1] is not self.last):
+                self.size = 0
+                self.buckets = {}
+            for rsp in islice(responses, self.size, None):
+                values = [(f, getattr(rsp, f)) for f in self.FIELDS]
+                for n in range(1, len(values) + 1):
+                    for key in combinations(values, n):
+                        self.buckets.setdefault(key, []).append(rsp)
+            self.size = len(responses)
+            self.last = responses[-1] if responses else None
+
+    def get(self, filters: Dict[str, Any]) -> List[QueryResponseEntity]:
+        """Return a new list with the responses matching all the given filters."""
+        return list(self.buckets.get(self.make_key(filters), []))
+
+
+_indexes: Dict[int, _ResponsesIndex] = {}
+"""The index of each living :class:`QueryResponseContainer` by its ``id``.
+
+It's kept out of the container attributes, thus it's never copied, pickled or serialized
+along with them, and it's discarded once the container is collected.
+"""
+
+
+def _get_index(container: QueryResponseContainer) -> _ResponsesIndex:
+    """Return the index of the given container, creating it on the first call."""
+    key = id(container)
+    index = _indexes.get(key)
+    if index is None:
+        new = _ResponsesIndex()
+        index = _indexes.setdefault(key, new)
+        if index is new:
+            finalize(container, _indexes.pop, key, None)
+    return index
+
+
 @frozen
 class QueryResponseContainer:
     """Represent a full query response from APIv2."""
@@ -453,22 +962,89 @@ class QueryResponseContainer:
     """List with all responses from a Query V2 mapping."""
 
     @classmethod
-    def from_json(cls, json: Any) -> QueryResponseContainer:
+    def from_json(
+        cls, json: Any, trusted: bool = False, intern: bool = False, lazy: bool = False
+    ) -> QueryResponseContainer:
         """
         Convert the APIv2 response JSON into this object.
 
         Args:
             json (list)
                 A JSON containing a StArMap APIv2 response.
+            trusted (bool, optional)
+                Whether the JSON comes from a trusted source, skipping the validation of the
+                attributes for all the nested objects. Defaults to ``False``.
+            intern (bool, optional)
+                Whether to share a single instance of the equal ``meta``, ``tags`` and string
+                attributes among all the nested objects. Defaults to ``False``.
+            lazy (bool, optional)
+                Whether to convert the mappings and billing code rules of each response only when
+                first accessed. Defaults to ``False``.
         Returns:
             The converted object from JSON.
         """
         if not isinstance(json, list):
             raise ValueError(f"Expected root to be a list, got \"{type(json)}\".")
 
-        responses = [QueryResponseEntity.from_json(qre) for qre in json]
+        if intern and _interner.get() is None:
+            token = _interner.set(_Interner())
+            try:
+                return cls.from_json(json, trusted=trusted, lazy=lazy)
+            finally:
+                _interner.reset(token)
+
+        responses = [QueryResponseEntity.from_json(qre, trusted=trusted, lazy=lazy) for qre in json]
         return cls(responses)
 
+    def to_json(self, exclude_none: bool = False) -> List[Dict[str, Any]]:
+        """
+        Convert all the responses into the APIv2 JSON.
+
+        Args:
+            exclude_none (bool, optional)
+                Whether to leave out the attributes which aren't set. Defaults to ``False``.
+        Returns:
+            list: The JSON representation of the responses.
+        """
+        return [r.to_json(exclude_none) for r in self.responses]
+
+    def to_json_bytes(self, exclude_none: bool = False) -> bytes:
+        """
+        Encode all the responses into compact UTF-8 APIv2 JSON.
+
+        It uses ``orjson`` when installed, which is much faster for large outputs.
+
+        Args:
+            exclude_none (bool, optional)
+                Whether to leave out the attributes which aren't set. Defaults to ``False``.
+        Returns:
+            bytes: The encoded JSON representation of the responses.
+        """
+        return json_dumps_bytes(self.to_json(exclude_none))
+
+    def append(self, response: QueryResponseEntity) -> None:
+        """Add a response at the end of the container.
+
+        Args:
+            response (QueryResponseEntity):
+                The response to add.
+        """
+        self.responses.append(response)
+
+    def remove(self, response: QueryResponseEntity) -> None:
+        """Remove the first response equal to the given one from the container.
+
+        Args:
+            response (QueryResponseEntity):
+                The response to remove.
+        Raises:
+            ValueError: When the response isn't in the container.
+        """
+        self.responses.remove(response)
+        index = _indexes.get(id(self))
+        if index is not None:
+            index.invalidate()
+
     def filter_by_name(
         self, name: str, responses: Optional[List[QueryResponseEntity]] = None
     ) -> List[QueryResponseEntity]:
@@ -524,7 +1100,18 @@ class QueryResponseContainer:
         return [x for x in rsp if x.cloud == cloud]
 
     def filter_by(self, **kwargs: Any) -> List[QueryResponseEntity]:
-        """Return a sublist of the responses with the selected filters."""
+        """Return a sublist of the responses with the selected filters.
+
+        Filtering by ``name``, ``cloud`` and/or ``workflow`` is served by a hash index which
+        is lazily built on the first call and kept up to date by :meth:`append` and
+        :meth:`remove`. The responses appended directly to the list are indexed too, but any
+        other direct change to it, like replacing a response in place, isn't detected.
+        """
+        if kwargs and all(k in _ResponsesIndex.FIELDS for k in kwargs):
+            index = _get_index(self)
+            index.update(self.responses)
+            return index.get(kwargs)
+
         filters = {
             "name": self.filter_by_name,
             "cloud": self.filter_by_cloud,
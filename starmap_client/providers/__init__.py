@@ -1,5 +1,7 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 from starmap_client.providers.base import StarmapProvider
 from starmap_client.providers.memory import InMemoryMapProviderV2
+from starmap_client.providers.snapshot import SnapshotError
+from starmap_client.providers.sqlite import SQLiteMapProviderV2
 
-__all__ = ["StarmapProvider", "InMemoryMapProviderV2"]
+__all__ = ["StarmapProvider", "InMemoryMapProviderV2", "SQLiteMapProviderV2", "SnapshotError"]
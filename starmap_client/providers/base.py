@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import Any, Dict, Generic, List, Optional, TypeVar
 
+from starmap_client.providers.snapshot import dump_snapshot, load_snapshot
+
 TQRC = TypeVar("TQRC")  # QueryResponseContainer
 TQRE = TypeVar("TQRE")  # QueryResponseEntity
 
@@ -11,6 +13,11 @@ class StarmapProvider(ABC, Generic[TQRC, TQRE]):
     api = "default"
     """The provider's API level implementation."""
 
+    read_only = False
+    """Whether the provider can't store nor discard the responses, e.g. when it resolves them
+    from the policies or its storage is opened in read-only mode. Its :meth:`store` always
+    fails."""
+
     @abstractmethod
     def query(self, params: Dict[str, Any]) -> Optional[TQRC]:
         """Retrieve the mapping without using the server.
@@ -33,7 +40,50 @@ class StarmapProvider(ABC, Generic[TQRC, TQRE]):
     def store(self, response: TQRE) -> None:
         """Store a single response into the local provider.
 
+        The :attr:`read_only` providers raise an exception instead.
+
         Args:
             response (response):
                 The object to store.
         """
+
+    def discard(self, response: TQRE) -> None:
+        """Remove a single response from the local provider, if present.
+
+        It's not required by the client, thus the providers only implement it when they can
+        be updated, e.g. by the sync engine.
+
+        Args:
+            response (response):
+                The object to remove.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} doesn't support removing responses")
+
+    def export_snapshot(self) -> bytes:
+        """Return all the stored responses as a binary snapshot.
+
+        The snapshot can be loaded into another provider with :meth:`import_snapshot` much faster
+        than converting the responses from JSON again.
+
+        Returns:
+            bytes: The snapshot data.
+        """
+        return dump_snapshot(self.api, self.list_content())
+
+    def import_snapshot(self, data: bytes, pause_gc: bool = False) -> None:
+        """Store all the responses from a snapshot into the local provider.
+
+        The snapshots must only be loaded from trusted sources.
+
+        Args:
+            data (bytes):
+                The snapshot data from :meth:`export_snapshot`.
+            pause_gc (bool, optional):
+                Whether to disable the garbage collector of the process while loading the
+                snapshot, see :func:`~starmap_client.providers.snapshot.load_snapshot`. Defaults
+                to ``False``.
+        Raises:
+            SnapshotError: When the snapshot is corrupt or incompatible with the provider.
+        """
+        for response in load_snapshot(data, self.api, pause_gc):
+            self.store(response)
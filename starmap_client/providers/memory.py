@@ -2,6 +2,7 @@ from typing import Any, Dict, List, Optional
 
 from starmap_client.models import QueryResponseContainer, QueryResponseEntity
 from starmap_client.providers.base import StarmapProvider
+from starmap_client.providers.snapshot import load_snapshot
 from starmap_client.providers.utils import get_image_name
 
 
@@ -22,6 +23,24 @@ class InMemoryMapProviderV2(StarmapProvider[QueryResponseContainer, QueryRespons
         self._container = container
         super(StarmapProvider, self).__init__()
 
+    @classmethod
+    def from_snapshot(cls, data: bytes, pause_gc: bool = False) -> "InMemoryMapProviderV2":
+        """Create a new InMemoryMapProviderV2 object with the responses from a snapshot.
+
+        Args:
+            data (bytes)
+                The snapshot data from :meth:`~StarmapProvider.export_snapshot`.
+            pause_gc (bool, optional)
+                Whether to disable the garbage collector of the process while loading the
+                snapshot, see :func:`~starmap_client.providers.snapshot.load_snapshot`. Defaults
+                to ``False``.
+        Returns:
+            The provider with all the responses from the snapshot.
+        Raises:
+            SnapshotError: When the snapshot is corrupt or incompatible with the provider.
+        """
+        return cls(QueryResponseContainer(load_snapshot(data, cls.api, pause_gc)))
+
     def query(self, params: Dict[str, Any]) -> Optional[QueryResponseContainer]:
         """Retrieve the mapping without using the server.
 
@@ -55,4 +74,16 @@ class InMemoryMapProviderV2(StarmapProvider[QueryResponseContainer, QueryRespons
             container (container):
                 The container to store.
         """
-        self._container.responses.append(response)
+        self._container.append(response)
+
+    def discard(self, response: QueryResponseEntity) -> None:
+        """Remove a single response from the local provider's container, if present.
+
+        Args:
+            response (QueryResponseEntity):
+                The response to remove.
+        """
+        try:
+            self._container.remove(response)
+        except ValueError:
+            pass
@@ -0,0 +1,143 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+import gc
+import hashlib
+import pickle  # nosec B403
+import struct
+import threading
+import zlib
+from types import TracebackType
+from typing import Any, List, Optional, Type
+
+from attrs import fields
+
+from starmap_client.models import (
+    BillingCodeRule,
+    Destination,
+    MappingResponseObject,
+    QueryResponseEntity,
+)
+
+SNAPSHOT_MAGIC = b"STARMAP\x00"
+"""The bytes identifying a snapshot file."""
+
+SNAPSHOT_VERSION = 1
+"""The version of the snapshot format, increased on any incompatible change."""
+
+# magic, format version, provider API, models schema fingerprint, payload SHA-256
+_HEADER = struct.Struct(">8sH8s16s32s")
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot is invalid, corrupt or incompatible with the provider."""
+
+
+class _GCPause:
+    """Disable the garbage collector while loading the snapshots.
+
+    The collector is global to the process, thus it's re-enabled only once the last of the
+    concurrent loads is done, and only when it was enabled before the first one.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loads = 0
+        self._enabled = False
+
+    def __enter__(self) -> None:
+        with self._lock:
+            if not self._loads:
+                self._enabled = gc.isenabled()
+                gc.disable()
+            self._loads += 1
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        with self._lock:
+            self._loads -= 1
+            if not self._loads and self._enabled:
+                gc.enable()
+
+
+_gc_pause = _GCPause()
+
+
+def _schema_fingerprint() -> bytes:
+    """Return a fingerprint of the models layout, so snapshots from other layouts are rejected."""
+    layout = [
+        f"{cls.__name__}:{','.join(a.name for a in fields(cls))}"
+        for cls in [QueryResponseEntity, MappingResponseObject, Destination, BillingCodeRule]
+    ]
+    return hashlib.sha256(";".join(layout).encode()).digest()[:16]
+
+
+def dump_snapshot(api: str, responses: List[Any], compress_level: int = 6) -> bytes:
+    """Serialize the responses into a versioned and checksummed binary snapshot.
+
+    Args:
+        api (str):
+            The API level of the provider which owns the responses.
+        responses (list):
+            The responses to serialize.
+        compress_level (int, optional):
+            The zlib compression level from 0 (no compression) to 9. Defaults to 6.
+    Returns:
+        bytes: The snapshot data.
+    """
+    payload = zlib.compress(pickle.dumps(responses, protocol=5), compress_level)
+    header = _HEADER.pack(
+        SNAPSHOT_MAGIC,
+        SNAPSHOT_VERSION,
+        api.encode(),
+        _schema_fingerprint(),
+        hashlib.sha256(payload).digest(),
+    )
+    return header + payload
+
+
+def load_snapshot(data: bytes, api: str, pause_gc: bool = False) -> List[Any]:
+    """Load the responses from a snapshot after verifying its integrity.
+
+    The snapshots must only be loaded from trusted sources since the payload is a pickle.
+
+    Args:
+        data (bytes):
+            The snapshot data created by :func:`dump_snapshot`.
+        api (str):
+            The API level of the provider which loads the responses.
+        pause_gc (bool, optional):
+            Whether to disable the garbage collector while loading, since it would be triggered
+            many times while creating all the objects, doubling the loading time of the large
+            snapshots. It's disabled for the whole process, thus the other threads don't collect
+            the reference cycles meanwhile. Defaults to ``False``.
+    Returns:
+        list: The responses stored in the snapshot.
+    Raises:
+        SnapshotError: When the snapshot is corrupt or was created for another format, API or
+            models version.
+    """
+    if len(data) < _HEADER.size:
+        raise SnapshotError("Invalid snapshot: the data is too short")
+    magic, version, snap_api, schema, digest = _HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC:
+        raise SnapshotError("Invalid snapshot: unknown file format")
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version}, expected {SNAPSHOT_VERSION}")
+    snap_api = snap_api.rstrip(b"\x00").decode()
+    if snap_api != api:
+        raise SnapshotError(f"API mismatch: Snapshot has API {snap_api} but expected: {api}")
+    if schema != _schema_fingerprint():
+        raise SnapshotError("Stale snapshot: it was created for a different version of the models")
+
+    offset = _HEADER.size
+    payload = memoryview(data)[offset:]
+    if hashlib.sha256(payload).digest() != digest:
+        raise SnapshotError("Corrupt snapshot: checksum mismatch")
+
+    if not pause_gc:
+        return pickle.loads(zlib.decompress(payload))  # type: ignore[no-any-return] # nosec B301
+    with _gc_pause:
+        return pickle.loads(zlib.decompress(payload))  # type: ignore[no-any-return] # nosec B301
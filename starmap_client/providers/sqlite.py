@@ -0,0 +1,166 @@
+import json
+import sqlite3
+import threading
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from starmap_client.models import QueryResponseContainer, QueryResponseEntity
+from starmap_client.providers.base import StarmapProvider
+from starmap_client.providers.snapshot import load_snapshot
+from starmap_client.providers.utils import get_image_name
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    cloud TEXT NOT NULL,
+    workflow TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_name_cloud_workflow ON responses (name, cloud, workflow);
+CREATE INDEX IF NOT EXISTS responses_name_workflow ON responses (name, workflow);
+"""
+
+
+def _entity_to_json(response: QueryResponseEntity) -> Dict[str, Any]:
+    """Convert a QueryResponseEntity back to its APIv2 JSON representation."""
+    return response.to_json(exclude_none=True)
+
+
+def _to_str(value: Any) -> str:
+    return str(value.value) if isinstance(value, Enum) else str(value)
+
+
+class SQLiteMapProviderV2(StarmapProvider[QueryResponseContainer, QueryResponseEntity]):
+    """Provide QueryResponseEntity objects for APIv2 from a SQLite database file.
+
+    Only the entries matched by a query are loaded from the disk and converted into models,
+    while the database pages are shared among processes through the OS page cache.
+    """
+
+    api = "v2"
+
+    MMAP_SIZE = 256 * 1024 * 1024
+    """Maximum number of bytes of the database file to access using memory-mapped I/O."""
+
+    def __init__(self, path: str, read_only: bool = False, *args: None, **kwargs: None) -> None:
+        """Create a new SQLiteMapProviderV2 object.
+
+        Args:
+            path (str)
+                The path of the SQLite database file. It's created when it doesn't exist.
+            read_only (bool, optional)
+                Whether to open the database in read-only mode, where storing the responses
+                raises ``sqlite3.OperationalError``. Defaults to ``False``.
+        """
+        self.read_only = read_only
+        if read_only:
+            # The URI quotes the characters with a meaning in it, like "?" or "#"
+            uri = f"{Path(path).absolute().as_uri()}?mode=ro"
+            self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.executescript(_SCHEMA)
+        self._conn.execute(f"PRAGMA mmap_size={self.MMAP_SIZE}")
+        self._lock = threading.Lock()
+        super(StarmapProvider, self).__init__()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def __enter__(self) -> "SQLiteMapProviderV2":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _select(self, where: str = "", params: Iterable[str] = ()) -> List[QueryResponseEntity]:
+        # The WHERE clause only has placeholders for the values
+        query = "SELECT data FROM responses {} ORDER BY id".format(where)  # nosec B608
+        with self._lock:
+            rows = self._conn.execute(query, tuple(params)).fetchall()
+        return [QueryResponseEntity.from_json(json.loads(r[0])) for r in rows]
+
+    def query(self, params: Dict[str, Any]) -> Optional[QueryResponseContainer]:
+        """Retrieve the mapping without using the server.
+
+        It relies in the local provider to retrieve the correct mappings
+        according to the parameters.
+
+        Args:
+            params (dict):
+                The request params to retrieve the mapping.
+        Returns:
+            The requested container with mappings when found.
+        """
+        filter_params = {"name": params.get("name") or get_image_name(params.get("image"))}
+        for k in ["cloud", "workflow"]:
+            v = params.get(k)
+            if v:
+                filter_params.update({k: v})
+        where = " AND ".join(f"{k} = ?" for k in filter_params)
+        res = self._select(f"WHERE {where}", [_to_str(v) for v in filter_params.values()])
+        if res:
+            return QueryResponseContainer(res)
+        return None
+
+    def list_content(self) -> List[QueryResponseEntity]:
+        """Return all the responses stored in the database."""
+        return self._select()
+
+    def store(self, response: QueryResponseEntity) -> None:
+        """Store a single response into the database.
+
+        Args:
+            response (QueryResponseEntity):
+                The response to store.
+        """
+        self.store_json([_entity_to_json(response)])
+
+    def discard(self, response: QueryResponseEntity) -> None:
+        """Remove a single response from the database, if present.
+
+        Args:
+            response (QueryResponseEntity):
+                The response to remove.
+        """
+        params = (response.name, response.cloud, _to_str(response.workflow))
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT id, data FROM responses WHERE name = ? AND cloud = ? AND workflow = ?",
+                params,
+            ).fetchall()
+            for row_id, data in rows:
+                if QueryResponseEntity.from_json(json.loads(data)) == response:
+                    self._conn.execute("DELETE FROM responses WHERE id = ?", (row_id,))
+                    return
+
+    def store_json(self, json_data: List[Dict[str, Any]]) -> None:
+        """Store multiple responses in their APIv2 JSON format in a single transaction.
+
+        Args:
+            json_data (list):
+                The list of query responses as returned by the StArMap APIv2.
+        """
+        rows = [(d["name"], d["cloud"], _to_str(d["workflow"]), json.dumps(d)) for d in json_data]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO responses (name, cloud, workflow, data) VALUES (?, ?, ?, ?)", rows
+            )
+
+    def import_snapshot(self, data: bytes, pause_gc: bool = False) -> None:
+        """Store all the responses from a snapshot in a single transaction.
+
+        Args:
+            data (bytes):
+                The snapshot data from :meth:`~StarmapProvider.export_snapshot`.
+            pause_gc (bool, optional):
+                Whether to disable the garbage collector of the process while loading the
+                snapshot, see :func:`~starmap_client.providers.snapshot.load_snapshot`. Defaults
+                to ``False``.
+        Raises:
+            SnapshotError: When the snapshot is corrupt or incompatible with the provider.
+        """
+        self.store_json([_entity_to_json(r) for r in load_snapshot(data, self.api, pause_gc)])
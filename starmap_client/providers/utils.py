@@ -2,10 +2,28 @@
 # The functions below were adapted from Kobo's RPMLib:
 # https://github.com/release-engineering/kobo/blob/master/kobo/rpmlib.py
 import logging
-from typing import Dict, Optional, Tuple
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional, Tuple
 
 log = logging.getLogger(__name__)
 
+NVR_CACHE_SIZE = 8192
+"""Maximum number of parsed NVRs kept in memory by :func:`parse_nvr_cached`."""
+
+
+class ParsedNVR(NamedTuple):
+    """Immutable representation of a parsed N-V-R."""
+
+    name: str
+    version: str
+    release: str
+    epoch: str
+
+    def __str__(self) -> str:
+        """Return the NVR in the canonical ``N-V-R`` or ``N-V-R:E`` format."""
+        nvr = f"{self.name}-{self.version}-{self.release}"
+        return f"{nvr}:{self.epoch}" if self.epoch else nvr
+
 
 def split_nvr_epoch(nvre: str) -> Tuple[str, str]:
     """
@@ -34,12 +52,14 @@ def split_nvr_epoch(nvre: str) -> Tuple[str, str]:
     return nvr, epoch
 
 
-def parse_nvr(nvre: str) -> Dict[str, str]:
+@lru_cache(maxsize=NVR_CACHE_SIZE)
+def parse_nvr_cached(nvre: str) -> ParsedNVR:
     """
-    Split N-V-R into a dictionary.
+    Split N-V-R into a ParsedNVR, caching the results for the repeated values.
 
     :param nvre: N-V-R:E, E:N-V-R or N-E:V-R string
-    :return: {name, version, release, epoch}
+    :return: ParsedNVR(name, version, release, epoch)
+    :raises RuntimeError: when the NVR is invalid
     """
     log.debug("Parsing NVR")
     if "/" in nvre:
@@ -64,14 +84,22 @@ def parse_nvr(nvre: str) -> Dict[str, str]:
         except ValueError:
             raise RuntimeError(f"Invalid epoch '{epoch}' in '{nvr}'")
 
-    result = dict(zip(["name", "version", "release"], nvr_parts))
-    result["epoch"] = epoch
-    return result
+    return ParsedNVR(nvr_parts[0], nvr_parts[1], nvr_parts[2], epoch)
+
+
+def parse_nvr(nvre: str) -> Dict[str, str]:
+    """
+    Split N-V-R into a dictionary.
+
+    :param nvre: N-V-R:E, E:N-V-R or N-E:V-R string
+    :return: {name, version, release, epoch}
+    """
+    name, version, release, epoch = parse_nvr_cached(nvre)
+    return {"name": name, "version": version, "release": release, "epoch": epoch}
 
 
 def get_image_name(image: Optional[str]) -> str:
     """Retrieve the name from NVR."""
     if not image:
         return ""
-    nvr = parse_nvr(image)
-    return nvr.get("name", "")
+    return parse_nvr_cached(image).name
@@ -0,0 +1,175 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from starmap_client.client import StarmapClient
+from starmap_client.models import Mapping, Policy, QueryResponseContainer, QueryResponseEntity
+from starmap_client.providers import StarmapProvider
+from starmap_client.providers.utils import parse_nvr_cached
+from starmap_client.sync import CloudResolver, default_cloud_resolver, policy_to_responses
+from starmap_client.versions import VersionMatcher
+
+_ResponsesKey = Tuple[int, Tuple[int, ...]]
+_PoliciesIndex = Tuple[List[Tuple[Policy, VersionMatcher]], Dict[str, List[int]]]
+
+
+class PolicyResolver(StarmapProvider[QueryResponseContainer, QueryResponseEntity]):
+    """Resolve the APIv2 queries locally from a list of policies, without using the server.
+
+    Unlike the providers built by :class:`~starmap_client.sync.StarmapSync` it applies the
+    version constraints of the mappings, thus each query returns only the mappings matching the
+    requested NVR version, like the server does.
+
+    The responses are converted from the policies on demand and kept for the next queries
+    matching the same mappings. The policies must not change while they're being resolved, but
+    they can be replaced all at once with :meth:`update`.
+
+    The resolver is read-only: its responses always come from the policies, thus it can't store
+    nor discard them.
+    """
+
+    api = "v2"
+
+    read_only = True
+
+    RESPONSES_CACHE_SIZE = 1024
+    """Maximum number of converted query responses lists kept in memory."""
+
+    def __init__(
+        self, policies: Iterable[Policy], cloud_resolver: CloudResolver = default_cloud_resolver
+    ) -> None:
+        """Create a new PolicyResolver object.
+
+        Args:
+            policies (list)
+                The policies to resolve the queries from, e.g. from
+                :meth:`~starmap_client.StarmapClient.list_policies`.
+            cloud_resolver (callable, optional)
+                Function returning the cloud name for a given marketplace account. Defaults to
+                the account prefix before the first ``-``.
+        Raises:
+            ValueError: When a mapping has both version patterns.
+            re.error: When a mapping has an invalid regular expression.
+        """
+        self.cloud_resolver = cloud_resolver
+        self._index: _PoliciesIndex = ([], {})
+        self._responses: OrderedDict[_ResponsesKey, Tuple[Policy, List[QueryResponseEntity]]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.update(policies)
+
+    @classmethod
+    def from_client(
+        cls, client: StarmapClient, cloud_resolver: CloudResolver = default_cloud_resolver
+    ) -> "PolicyResolver":
+        """Create a new PolicyResolver object with the policies cached by the client.
+
+        The policies are retrieved from the server only when the client didn't list them yet.
+
+        Args:
+            client (StarmapClient)
+                The client to get the policies from.
+            cloud_resolver (callable, optional)
+                Function returning the cloud name for a given marketplace account.
+        Returns:
+            The resolver for all the policies registered in StArMap.
+        """
+        return cls(client.list_policies(), cloud_resolver)
+
+    def update(self, policies: Iterable[Policy]) -> None:
+        """Replace all the policies to resolve the queries from.
+
+        The version patterns of the policies already being resolved aren't compiled again.
+
+        Args:
+            policies (list)
+                The new policies, e.g. from :meth:`~starmap_client.StarmapClient.list_policies`.
+        Raises:
+            ValueError: When a mapping has both version patterns.
+            re.error: When a mapping has an invalid regular expression.
+        """
+        matchers = {id(p): m for p, m in self._index[0]}
+        entries: List[Tuple[Policy, VersionMatcher]] = []
+        by_name: Dict[str, List[int]] = {}
+        for policy in policies:
+            matcher = matchers.get(id(policy)) or VersionMatcher(policy.mappings)
+            by_name.setdefault(policy.name, []).append(len(entries))
+            entries.append((policy, matcher))
+        # Replaced at once, so the running queries keep resolving from the previous policies
+        self._index = (entries, by_name)
+        with self._lock:
+            self._responses.clear()
+
+    def _policy_responses(
+        self, policy: Policy, mappings: List[Mapping]
+    ) -> List[QueryResponseEntity]:
+        # The cached policy keeps its mappings alive, thus their ids identify them
+        key = (id(policy), tuple(id(m) for m in mappings))
+        with self._lock:
+            cached = self._responses.get(key)
+            if cached is not None:
+                self._responses.move_to_end(key)
+                return cached[1]
+
+        res = policy_to_responses(policy, self.cloud_resolver, mappings)
+
+        with self._lock:
+            self._responses[key] = (policy, res)
+            while len(self._responses) > self.RESPONSES_CACHE_SIZE:
+                self._responses.popitem(last=False)
+        return res
+
+    def query(self, params: Dict[str, Any]) -> Optional[QueryResponseContainer]:
+        """Resolve the query from the policies.
+
+        Args:
+            params (dict):
+                The request params, with either the ``image`` NVR or the ``name`` and optional
+                ``version``, and the optional ``workflow`` and ``cloud``.
+        Returns:
+            The container with the responses for the matched mappings when found.
+        """
+        name = params.get("name")
+        version = params.get("version")
+        image = params.get("image")
+        if not name and image:
+            nvr = parse_nvr_cached(image)
+            name, version = nvr.name, nvr.version
+        workflow = params.get("workflow")
+        cloud = params.get("cloud")
+
+        entries, by_name = self._index
+        res: List[QueryResponseEntity] = []
+        for index in by_name.get(name or "", []):
+            policy, matcher = entries[index]
+            if workflow and policy.workflow != workflow:
+                continue
+            mappings = matcher.match(version) if version else policy.mappings
+            if not mappings:
+                continue
+            res.extend(
+                r for r in self._policy_responses(policy, mappings) if not cloud or r.cloud == cloud
+            )
+        if res:
+            return QueryResponseContainer(res)
+        return None
+
+    def list_content(self) -> List[QueryResponseEntity]:
+        """Return the responses for all the mappings of the policies."""
+        return [
+            r
+            for policy, _ in self._index[0]
+            for r in self._policy_responses(policy, policy.mappings)
+        ]
+
+    def store(self, response: QueryResponseEntity) -> None:
+        """Reject the response since the resolver is read-only, see :attr:`read_only`.
+
+        Use :meth:`update` to change the policies the responses are resolved from instead.
+
+        Raises:
+            NotImplementedError: Always.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} is read-only")
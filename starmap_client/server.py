@@ -0,0 +1,279 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import TracebackType
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from starmap_client.cache import CacheKey, make_cache_key
+from starmap_client.models import Policy, QueryResponseContainer, QueryResponseEntity
+from starmap_client.providers import StarmapProvider
+from starmap_client.utils import json_dumps_bytes
+
+log = logging.getLogger(__name__)
+
+Response = Tuple[int, bytes]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serve the requests through the :class:`StarmapStandInServer` owning the HTTP server."""
+
+    protocol_version = "HTTP/1.1"  # Keep the connections alive for the client pool
+    disable_nagle_algorithm = True  # Don't delay the body sent after the headers
+    server: "_HTTPServer"
+
+    def do_GET(self) -> None:  # noqa: N802
+        status, body = self.server.app.handle(self.path)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        log.debug(format, *args)
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], app: "StarmapStandInServer") -> None:
+        super().__init__(address, _Handler)
+        self.app = app
+
+
+class StarmapStandInServer:
+    """Local HTTP server implementing the StArMap APIv2 read endpoints for testing.
+
+    It serves the query responses from an APIv2 provider and the policies, with their mappings
+    and destinations, from a list. The latency and the server errors can be injected to
+    load-test the client end to end without the real service.
+
+    The query responses are cached once encoded, thus the provider must not change while the
+    server is running.
+    """
+
+    QUERY_CACHE_SIZE = 1024
+    """Maximum number of encoded query responses kept in memory."""
+
+    MAX_PER_PAGE = 1000
+    """Maximum number of policies returned per page."""
+
+    def __init__(
+        self,
+        provider: Optional[StarmapProvider[QueryResponseContainer, QueryResponseEntity]] = None,
+        policies: Optional[Iterable[Policy]] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: Optional[int] = None,
+    ) -> None:
+        """Create a new StarmapStandInServer object.
+
+        Args:
+            provider (StarmapProvider, optional)
+                The APIv2 provider answering the ``/query`` requests. Nothing is found when not set.
+            policies (list, optional)
+                The policies served by the ``/policy``, ``/mapping`` and ``/destination``
+                endpoints.
+            host (str, optional)
+                The address to listen on. Defaults to ``127.0.0.1``.
+            port (int, optional)
+                The port to listen on. Defaults to ``0``, which picks a free port.
+            latency (float, optional)
+                The time in seconds to wait before replying to each request. Defaults to ``0``.
+            jitter (float, optional)
+                The maximum random time in seconds added to the latency. Defaults to ``0``.
+            error_rate (float, optional)
+                The probability, from 0 to 1, of replying to a request with ``error_status``
+                instead. Defaults to ``0``.
+            error_status (int, optional)
+                The status code of the injected errors. Defaults to ``503``.
+            seed (int, optional)
+                The seed for the jitter and errors injection, making them reproducible.
+        """
+        if provider is not None and provider.api != "v2":
+            raise ValueError(f"The server requires an APIv2 provider, got: {provider.api}")
+        if not 0 <= error_rate <= 1:
+            raise ValueError(f"The error_rate must be between 0 and 1, got: {error_rate}")
+        self.provider = provider
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self.errors = 0
+        # Only used for the simulated latency and errors, not for security
+        self._random = random.Random(seed)  # nosec B311
+        self._lock = threading.Lock()
+        self._queries: OrderedDict[CacheKey, Response] = OrderedDict()
+        self._httpd: Optional[_HTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+        self._policies: List[bytes] = []
+        self._objects: Dict[str, bytes] = {}
+        for policy in policies or []:
+            data = policy.to_json_bytes()
+            self._policies.append(data)
+            self._index("policy", policy.id, data)
+            for mapping in policy.mappings:
+                self._index("mapping", mapping.id, mapping.to_json_bytes())
+                for destination in mapping.destinations:
+                    self._index("destination", destination.id, destination.to_json_bytes())
+
+    def _index(self, kind: str, obj_id: Optional[str], data: bytes) -> None:
+        if obj_id is not None:
+            self._objects[f"{kind}/{obj_id}"] = data
+
+    @property
+    def url(self) -> str:
+        """Return the base URL of the server for the client, e.g. ``http://127.0.0.1:8080``."""
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "StarmapStandInServer":
+        """Start serving the requests in a background thread.
+
+        Returns:
+            StarmapStandInServer: This object, with the ``port`` set to the listening one.
+        """
+        if self._httpd is not None:
+            raise RuntimeError("The server is already running")
+        self._httpd = _HTTPServer((self.host, self.port), self)
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(
+            target=self._httpd.serve_forever,
+            kwargs={"poll_interval": 0.05},  # Fast shutdown
+            name="starmap-stand-in",
+            daemon=True,
+        )
+        self._thread.start()
+        log.info("StArMap stand-in server listening on %s", self.url)
+        return self
+
+    def stop(self) -> None:
+        """Stop the server and close its socket."""
+        if self._httpd is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join()  # type: ignore[union-attr]
+        self._httpd = None
+        self._thread = None
+
+    def __enter__(self) -> "StarmapStandInServer":
+        return self.start()
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        self.stop()
+
+    def handle(self, path: str) -> Response:
+        """Return the status code and body for a GET request.
+
+        Args:
+            path (str):
+                The request path with the query string, e.g. ``/api/v2/query?name=product``.
+        Returns:
+            tuple: The status code and the JSON body.
+        """
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0)
+            failed = self.error_rate > 0 and self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        if delay:
+            time.sleep(delay)
+        if failed:
+            return self.error_status, json_dumps_bytes({"error": "Injected error"})
+
+        url = urlsplit(path)
+        params = dict(parse_qsl(url.query))
+        route = url.path.strip("/")
+        if not route.startswith("api/v2/"):
+            return self._not_found()
+        route = route.removeprefix("api/v2/")
+        if route == "query":
+            return self._query(params)
+        if route == "policy":
+            return self._policies_page(params)
+        data = self._objects.get(route)
+        if data is None:
+            return self._not_found()
+        return 200, data
+
+    @staticmethod
+    def _not_found() -> Response:
+        return 404, json_dumps_bytes({"error": "Not found"})
+
+    def _query(self, params: Dict[str, str]) -> Response:
+        if not params.get("name") and not params.get("image"):
+            return 400, json_dumps_bytes({"error": "Either the name or the image is required"})
+        key = make_cache_key(params)
+        with self._lock:
+            res = self._queries.get(key)
+            if res is not None:
+                self._queries.move_to_end(key)
+                return res
+
+        try:
+            qr = self.provider.query(params) if self.provider is not None else None
+        except RuntimeError as exc:
+            # Raised for an invalid NVR in the image
+            return 400, json_dumps_bytes({"error": str(exc)})
+        if qr is None:
+            res = self._not_found()
+        else:
+            res = 200, qr.to_json_bytes(exclude_none=True)
+
+        with self._lock:
+            self._queries[key] = res
+            while len(self._queries) > self.QUERY_CACHE_SIZE:
+                self._queries.popitem(last=False)
+        return res
+
+    def _policies_page(self, params: Dict[str, str]) -> Response:
+        try:
+            page = int(params.get("page", 1))
+            per_page = min(int(params.get("per_page", 100)), self.MAX_PER_PAGE)
+        except ValueError:
+            return 400, json_dumps_bytes({"error": "The page and per_page must be integers"})
+        if page < 1 or per_page < 1:
+            return 400, json_dumps_bytes({"error": "The page and per_page must be positive"})
+
+        total = len(self._policies)
+        total_pages = max(1, -(-total // per_page))
+        if page > total_pages:
+            return self._not_found()
+
+        def page_url(number: int) -> str:
+            return f"{self.url}/api/v2/policy?{urlencode({'page': number, 'per_page': per_page})}"
+
+        nav = {
+            "first": page_url(1),
+            "last": page_url(total_pages),
+            "next": page_url(page + 1) if page < total_pages else None,
+            "page": page,
+            "per_page": per_page,
+            "previous": page_url(page - 1) if page > 1 else None,
+            "total": total,
+            "total_pages": total_pages,
+        }
+        start = (page - 1) * per_page
+        end = start + per_page
+        items = self._policies[start:end]
+        body = b'{"items":[' + b",".join(items) + b'],"nav":' + json_dumps_bytes(nav) + b"}"
+        return 200, body
@@ -1,12 +1,15 @@
 # SPDX-License-Identifier: GPL-3.0-or-later
 import logging
 import re
+import threading
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Tuple, Union
+from copy import copy
+from typing import Any, Dict, Optional, Tuple, Union
+from urllib.parse import urlencode
 
 import requests
 import requests_mock
-from requests.adapters import HTTPAdapter, Retry
+from requests.adapters import DEFAULT_POOLBLOCK, DEFAULT_POOLSIZE, HTTPAdapter, Retry
 
 log = logging.getLogger(__name__)
 
@@ -28,7 +31,13 @@ class StarmapBaseSession(ABC):
 
 
 class StarmapSession(StarmapBaseSession):
-    """Implement a HTTP(S) session with StArMap."""
+    """Implement a HTTP(S) session with StArMap.
+
+    The session is safe to share across threads, which reuse the connections from its pool.
+    """
+
+    CONDITIONAL_CACHE_SIZE = 1024
+    """Maximum number of responses kept for the conditional requests."""
 
     def __init__(
         self,
@@ -37,6 +46,10 @@ class StarmapSession(StarmapBaseSession):
         retries: int = 3,
         backoff_factor: float = 2.0,
         timeout: Union[float, Tuple[float, float]] = 10.0,
+        conditional_requests: bool = False,
+        pool_connections: int = DEFAULT_POOLSIZE,
+        pool_maxsize: int = DEFAULT_POOLSIZE,
+        pool_block: bool = DEFAULT_POOLBLOCK,
     ):
         """
         Create the StarmapSession object.
@@ -54,11 +67,28 @@ class StarmapSession(StarmapBaseSession):
                 The timeout in seconds for the request. If a tuple is provided, the first value
                 is the connection timeout, and the second is the read timeout. Defaults to
                 10 seconds for both connection and read.
+            conditional_requests (bool, optional)
+                Whether to store the ``ETag``/``Last-Modified`` validators of the GET responses and
+                send conditional requests for them. The streamed requests are sent unconditionally,
+                since storing them would load their whole body. The responses have the attribute
+                ``from_cache``, which is ``True`` when the server replied with ``304 Not Modified``.
+                In that case a shallow copy of the stored response is returned, with the stored one
+                in its ``stored_response`` attribute. Defaults to ``False``.
+            pool_connections (int, optional)
+                The number of connection pools to cache, one per host. Defaults to 10.
+            pool_maxsize (int, optional)
+                The maximum number of connections kept open per host. It should be at least the
+                number of threads sharing the session. Defaults to 10.
+            pool_block (bool, optional)
+                Whether to wait for a free connection when all of them are in use instead of
+                opening a new one which is discarded after the request. Defaults to ``False``.
         """
         super(StarmapSession, self).__init__()
         self.url = url
         self.api_version = api_version
         self.timeout = timeout
+        self.backoff_factor = backoff_factor
+        self.retries = retries
         self.session = requests.Session()
         retry = Retry(
             total=retries,
@@ -67,9 +97,18 @@ class StarmapSession(StarmapBaseSession):
             backoff_factor=backoff_factor,
             status_forcelist=set(range(500, 512)),
         )
-        adapter = HTTPAdapter(max_retries=retry)
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=retry,
+            pool_block=pool_block,
+        )
         self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.verify = True
+        self.conditional_requests = conditional_requests
+        self._validated: Dict[str, requests.Response] = {}
+        self._validated_lock = threading.Lock()
 
     def _request(self, method: str, path: str, **kwargs: Any) -> requests.Response:
         """Perform a generic request on StArMap."""
@@ -84,10 +123,57 @@ class StarmapSession(StarmapBaseSession):
         # If timeout is not provided, use the default timeout
         timeout = kwargs.pop("timeout", self.timeout)
 
-        return self.session.request(
+        cache_key = None
+        cached = None
+        if self.conditional_requests and method == "get" and not kwargs.get("stream"):
+            cache_key = self._conditional_cache_key(url, kwargs.get("params"))
+            cached = self._validated.get(cache_key)
+            if cached is not None:
+                headers.update(self._conditional_headers(cached))
+
+        rsp = self.session.request(
             method, url=url, headers=headers, verify=self.verify, timeout=timeout, **kwargs
         )
 
+        if cache_key is None:
+            return rsp
+        if cached is not None and rsp.status_code == 304:
+            log.debug(f"Content not modified for {path}, returning the stored response")
+            # A copy, since the stored response may be in use by another thread
+            not_modified = copy(cached)
+            not_modified.from_cache = True  # type: ignore[attr-defined]
+            not_modified.stored_response = cached  # type: ignore[attr-defined]
+            return not_modified
+        if rsp.status_code == 200 and self._conditional_headers(rsp):
+            self._store_validated(cache_key, rsp)
+        return rsp
+
+    @staticmethod
+    def _conditional_cache_key(url: str, params: Optional[Dict[str, Any]]) -> str:
+        if not params:
+            return url
+        return f"{url}?{urlencode(sorted(params.items()), doseq=True)}"
+
+    @staticmethod
+    def _conditional_headers(rsp: requests.Response) -> Dict[str, str]:
+        """Return the conditional request headers for the validators of a given response."""
+        headers = {}
+        etag = rsp.headers.get("ETag")
+        if etag:
+            headers["If-None-Match"] = etag
+        last_modified = rsp.headers.get("Last-Modified")
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def _store_validated(self, cache_key: str, rsp: requests.Response) -> None:
+        rsp.from_cache = False  # type: ignore[attr-defined]
+        with self._validated_lock:
+            self._validated.pop(cache_key, None)
+            self._validated[cache_key] = rsp
+            while len(self._validated) > self.CONDITIONAL_CACHE_SIZE:
+                self._validated.pop(next(iter(self._validated)))
+
     def get(self, path: str, **kwargs: Any) -> requests.Response:
         """Perform a GET request on StArMap."""
         return self._request("get", path, **kwargs)
@@ -123,6 +209,7 @@ class StarmapMockSession(StarmapSession):
         self.api_version = api_version
         self.status_code = status_code
         self.json_data = json_data or {}
+        self.retries = 0
         self.session = requests.Session()
         self.adapter = requests_mock.Adapter()
         self.session.mount("mock://", self.adapter)
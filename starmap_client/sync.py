@@ -0,0 +1,229 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+import logging
+import threading
+from copy import deepcopy
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from attrs import frozen
+
+from starmap_client.client import StarmapClient
+from starmap_client.models import Mapping, Policy, QueryResponseContainer, QueryResponseEntity
+from starmap_client.providers import StarmapProvider
+from starmap_client.utils import dict_merge
+
+log = logging.getLogger(__name__)
+
+CloudResolver = Callable[[str], str]
+
+
+def default_cloud_resolver(marketplace_account: str) -> str:
+    """Return the cloud name from the marketplace account prefix, e.g. ``aws`` for ``aws-na``."""
+    return marketplace_account.split("-", 1)[0]
+
+
+def policy_to_responses(
+    policy: Policy,
+    cloud_resolver: CloudResolver = default_cloud_resolver,
+    mappings: Optional[Iterable[Mapping]] = None,
+) -> List[QueryResponseEntity]:
+    """Convert a policy into the APIv2 query responses, one for each cloud of its mappings.
+
+    The ``meta`` from the policy and mappings is merged into the destinations just like on the
+    query responses from the server. Since the query responses don't have the version
+    constraints, the destinations of multiple mappings for the same marketplace account are
+    combined into a single mapping response. Each destination keeps the ``meta`` of its own
+    mapping, while the combined mapping response only has the ``meta`` shared by all of them.
+
+    The responses apply to any version, thus the mappings with version constraints should be
+    selected beforehand, as :class:`~starmap_client.resolver.PolicyResolver` does.
+
+    Args:
+        policy (Policy):
+            The policy to convert.
+        cloud_resolver (callable, optional):
+            Function returning the cloud name for a given marketplace account.
+        mappings (list, optional):
+            The mappings of the policy to convert, e.g. the ones matching a version. Defaults
+            to all the policy mappings.
+    Returns:
+        list: The query responses for the policy.
+    """
+    clouds: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for mapping in policy.mappings if mappings is None else mappings:
+        account = mapping.marketplace_account
+        accounts = clouds.setdefault(cloud_resolver(account), {})
+        meta = mapping.meta or {}
+        destinations = [d.to_json() for d in mapping.destinations]
+        for d in destinations:
+            d["meta"] = dict_merge(meta, d["meta"] or {})
+        combined = accounts.get(account)
+        if combined is None:
+            accounts[account] = {
+                "destinations": destinations,
+                "meta": deepcopy(meta),
+                "provider": mapping.destinations[0].provider,
+            }
+        else:
+            combined["destinations"].extend(destinations)
+            combined["meta"] = {
+                k: v for k, v in combined["meta"].items() if k in meta and meta[k] == v
+            }
+
+    return [
+        QueryResponseEntity.from_json(
+            {
+                "name": policy.name,
+                "workflow": policy.workflow.value,
+                "cloud": cloud,
+                "meta": deepcopy(policy.meta) or {},
+                "mappings": accounts,
+            }
+        )
+        for cloud, accounts in clouds.items()
+    ]
+
+
+@frozen
+class SyncResult:
+    """Represent the changes applied to the provider by a single sync."""
+
+    added: int
+    """Number of new policies."""
+
+    updated: int
+    """Number of policies changed since the last sync."""
+
+    removed: int
+    """Number of policies no longer present on the server."""
+
+    unchanged: int
+    """Number of policies not changed since the last sync."""
+
+
+class StarmapSync:
+    """Build and keep a local provider up to date with all the policies from the server.
+
+    By default the policies are resolved by a :class:`~starmap_client.resolver.PolicyResolver`,
+    which applies the version constraints of the mappings like the server does. Any other
+    APIv2 provider is populated with the policies converted into query responses, which don't
+    have the version constraints, thus it returns all the mappings of a policy for any version.
+
+    Every sync lists all the policies from the server, one request per page, while only the
+    policies which changed since the previous sync are converted again. When the client session
+    uses conditional requests the unchanged pages are replied with ``304 Not Modified``, thus
+    they aren't downloaded nor decoded again.
+    """
+
+    def __init__(
+        self,
+        client: StarmapClient,
+        provider: Optional[StarmapProvider[QueryResponseContainer, QueryResponseEntity]] = None,
+        cloud_resolver: CloudResolver = default_cloud_resolver,
+    ) -> None:
+        """Create a new StarmapSync object.
+
+        Args:
+            client (StarmapClient)
+                The client to retrieve the policies from the server.
+            provider (StarmapProvider, optional)
+                The APIv2 provider to populate. Unless it's a ``PolicyResolver`` it must support
+                :meth:`~StarmapProvider.discard` to allow refreshing it. Defaults to an empty
+                ``PolicyResolver``.
+            cloud_resolver (callable, optional)
+                Function returning the cloud name for a given marketplace account. Defaults to
+                the account prefix before the first ``-``.
+        Raises:
+            ValueError: When the provider isn't an APIv2 one, is read-only or doesn't support
+                :meth:`~StarmapProvider.discard`.
+        """
+        # Imported here since the resolver converts the policies with this module
+        from starmap_client.resolver import PolicyResolver
+
+        if provider is None:
+            provider = PolicyResolver([], cloud_resolver)
+        if provider.api != "v2":
+            raise ValueError(f"The sync requires an APIv2 provider, got: {provider.api}")
+        self._update_policies: Optional[Callable[[List[Policy]], None]] = None
+        if isinstance(provider, PolicyResolver):
+            self._update_policies = provider.update
+        elif provider.read_only:
+            raise ValueError(
+                f"The sync requires a writable provider, got: {provider.__class__.__name__}"
+            )
+        elif getattr(type(provider), "discard", None) is StarmapProvider.discard:
+            raise ValueError(
+                "The sync requires a provider supporting discard, got: "
+                f"{provider.__class__.__name__}"
+            )
+        self.client = client
+        self.provider = provider
+        self.cloud_resolver = cloud_resolver
+        self._synced: Dict[str, Tuple[Policy, List[QueryResponseEntity]]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _policy_key(policy: Policy) -> str:
+        return policy.id or f"{policy.name}:{policy.workflow.value}"
+
+    def sync(self) -> SyncResult:
+        """Synchronize the provider with the current policies from the server.
+
+        Returns:
+            SyncResult: The number of added, updated, removed and unchanged policies.
+        """
+        with self._lock:
+            added = updated = unchanged = 0
+            seen = set()
+            policies: List[Policy] = []
+            for policy in self.client.policies:
+                key = self._policy_key(policy)
+                seen.add(key)
+                previous = self._synced.get(key)
+                if previous is not None and (previous[0] is policy or previous[0] == policy):
+                    # Keep the synced object, whose converted responses may be reused
+                    policies.append(previous[0])
+                    unchanged += 1
+                    continue
+
+                policies.append(policy)
+                if previous is None:
+                    added += 1
+                else:
+                    updated += 1
+                responses = []
+                if self._update_policies is None:
+                    responses = self._store(key, policy, previous)
+                self._synced[key] = (policy, responses)
+
+            removed_keys = [k for k in self._synced if k not in seen]
+            for key in removed_keys:
+                self._discard(self._synced.pop(key)[1])
+            if self._update_policies is not None:
+                self._update_policies(policies)
+
+        res = SyncResult(added, updated, len(removed_keys), unchanged)
+        log.info("Synced the policies from StArMap: %s", res)
+        return res
+
+    def _store(
+        self,
+        key: str,
+        policy: Policy,
+        previous: Optional[Tuple[Policy, List[QueryResponseEntity]]],
+    ) -> List[QueryResponseEntity]:
+        if any(m.version_fnmatch or m.version_regexmatch for m in policy.mappings):
+            log.warning(
+                "The provider returns all the mappings of the policy %s regardless of their "
+                "version constraints",
+                key,
+            )
+        responses = policy_to_responses(policy, self.cloud_resolver)
+        if previous is not None:
+            self._discard(previous[1])
+        for response in responses:
+            self.provider.store(response)
+        return responses
+
+    def _discard(self, responses: List[QueryResponseEntity]) -> None:
+        for response in responses:
+            self.provider.discard(response)
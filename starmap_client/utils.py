@@ -1,4 +1,37 @@
-from typing import Any, Dict
+import codecs
+import json
+import re
+import threading
+from concurrent.futures import Future
+from fnmatch import translate
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    Optional,
+    Pattern,
+    TypeVar,
+    Union,
+    cast,
+)
+
+try:
+    import orjson
+
+    _HAS_ORJSON = True
+except ImportError:  # pragma: no cover
+    _HAS_ORJSON = False
+
+V = TypeVar("V")
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+VERSION_PATTERN_CACHE_SIZE = 4096
+"""Maximum number of compiled version patterns kept in memory."""
 
 
 def assert_is_dict(data: Any) -> None:
@@ -7,9 +40,23 @@ def assert_is_dict(data: Any) -> None:
         raise ValueError(f"Expected dictionary, got {type(data)}: {data}")
 
 
+def json_dumps_bytes(data: Any) -> bytes:
+    """Encode the data into compact UTF-8 JSON.
+
+    It uses ``orjson`` when installed, which is much faster for large outputs, otherwise the
+    standard ``json`` module.
+    """
+    if _HAS_ORJSON:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+
+
 def dict_merge(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
     """Return a new dictionary with the combination of A and B.
 
+    The inner dictionaries are merged as well. Neither A nor B are modified and the inner
+    dictionaries from A are copied into the result, thus changing it won't affect A.
+
     Args:
         a (dict):
             The left dictionary to be combined
@@ -21,15 +68,177 @@ def dict_merge(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
     for x in [a, b]:
         assert_is_dict(x)
 
-    # Process the inner values before merging
-    for k, v in a.items():
-        # Merge two inner dictionaries
-        if b.get(k) and all([isinstance(x, dict) for x in [v, b.get(k)]]):
-            b[k] = dict_merge(v, b[k])
+    res = a | b
+    stack = [(res, a, b)]
+    while stack:
+        target, left, right = stack.pop()
+        for k, v in left.items():
+            if not isinstance(v, dict):
+                continue
+            r = right.get(k)
+            # Merge two inner dictionaries
+            if r and isinstance(r, dict):
+                target[k] = target_v = v | r
+                stack.append((target_v, v, r))
+            # Copy the left inner dictionary
+            elif not r:
+                target[k] = target_v = v.copy()
+                stack.append((target_v, v, {}))
+    return res
+
+
+@lru_cache(maxsize=VERSION_PATTERN_CACHE_SIZE)
+def compile_version_pattern(
+    version_fnmatch: Optional[str], version_regexmatch: Optional[str]
+) -> Optional[Pattern[str]]:
+    """Compile the version pattern of a mapping into a regular expression.
+
+    The ``fnmatch`` pattern must match the whole version while the regular expression must match
+    from its beginning, as ``re.match``. The compiled patterns are cached.
+
+    Args:
+        version_fnmatch (str):
+            The ``fnmatch`` pattern or ``None``.
+        version_regexmatch (str):
+            The regular expression or ``None``.
+    Returns:
+        The compiled pattern, or ``None`` when none is set and thus every version matches.
+    Raises:
+        ValueError: When both patterns are set.
+        re.error: When the regular expression is invalid.
+    """
+    if version_fnmatch is not None and version_regexmatch is not None:
+        raise ValueError("The version_fnmatch and version_regexmatch can't be set together")
+    if version_fnmatch is not None:
+        return re.compile(translate(version_fnmatch))
+    if version_regexmatch is not None:
+        return re.compile(version_regexmatch)
+    return None
+
+
+class SingleFlight:
+    """Coalesce the concurrent calls with the same key into a single execution.
+
+    The first caller for a key runs the function while the others arriving before it finishes
+    wait and receive the same result, or exception. Once finished the key is released, thus the
+    next call runs the function again.
+    """
+
+    def __init__(self) -> None:
+        """Create a new SingleFlight object."""
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future[Any]] = {}
+
+    def do(self, key: Hashable, func: Callable[..., V], *args: Any) -> V:
+        """Run ``func(*args)`` unless there's already a call in flight for the same key.
+
+        Args:
+            key (hashable):
+                The key identifying the call.
+            func (callable):
+                The function to run.
+            args:
+                The positional arguments for the function.
+        Returns:
+            The value returned by the function, shared among all the concurrent callers.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = self._calls[key] = Future()
+        if not leader:
+            return cast(V, call.result())
 
-        # Merge left inner dictionary
-        elif isinstance(v, dict) and not b.get(k):
-            b[k] = dict_merge(v, {})
+        try:
+            res = func(*args)
+        except BaseException as exc:
+            self._release(key)
+            call.set_exception(exc)
+            raise
+        self._release(key)
+        call.set_result(res)
+        return res
+
+    def _release(self, key: Hashable) -> None:
+        with self._lock:
+            del self._calls[key]
+
+
+def iter_json_array(chunks: Iterable[Union[bytes, str]]) -> Iterator[Any]:
+    """Incrementally parse a JSON array yielding its elements as soon as they're complete.
+
+    Only the element being parsed is kept in memory, thus huge arrays can be processed while
+    they're being downloaded. An element which fails to parse is only parsed again once its
+    unparsed text has doubled, keeping the time linear in the size of the elements spanning
+    many chunks.
+
+    Args:
+        chunks (iterable):
+            The JSON document split in chunks of bytes (UTF-8) or strings.
+    Returns:
+        Iterator with the decoded elements of the array.
+    Raises:
+        ValueError: When the document is not a valid JSON array.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    it = iter(chunks)
+    buf = ""
+    pos = 0
+    offset = 0  # The position of the buffer in the document
+    state = "start"
+    eof = False
+    retry_size = 0  # The unparsed text size needed to parse the current element again
 
-    # Default merge of dictionaries
-    return a | b
+    while True:
+        pos = _WHITESPACE.match(buf, pos).end()  # type: ignore[union-attr]
+        if pos < len(buf):
+            char = buf[pos]
+            if state == "start":
+                if char != "[":
+                    raise ValueError(
+                        f"Expected a JSON array, got \"{char}\" at position {offset + pos}"
+                    )
+                pos += 1
+                state = "first"
+                continue
+            if char == "]" and state in ("first", "separator"):
+                return
+            if state == "separator":
+                if char != ",":
+                    raise ValueError(
+                        f"Expected \",\" or \"]\", got \"{char}\" at position {offset + pos}"
+                    )
+                pos += 1
+                state = "value"
+                continue
+            if eof or len(buf) - pos >= retry_size:
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                    retry_size = 2 * (len(buf) - pos)
+                else:
+                    # A value not followed by a separator, e.g. a number, may continue in the
+                    # next chunk
+                    sep = _WHITESPACE.match(buf, end).end()  # type: ignore[union-attr]
+                    if eof or (sep < len(buf) and buf[sep] in ",]"):
+                        yield value
+                        pos = end
+                        state = "separator"
+                        retry_size = 0
+                        continue
+        if eof:
+            raise ValueError("Unexpected end of the JSON array")
+        # Drop the parsed text once per chunk, since slicing it after each value is quadratic
+        buf = buf[pos:]
+        offset += pos
+        pos = 0
+        chunk = next(it, None)
+        if chunk is None:
+            eof = True
+            buf += text_decoder.decode(b"", final=True)
+        else:
+            buf += text_decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
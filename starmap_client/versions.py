@@ -0,0 +1,66 @@
+# SPDX-License-Identifier: GPL-3.0-or-later
+from typing import Dict, Iterable, List, Pattern, Tuple
+
+from starmap_client.models import Destination, Mapping
+from starmap_client.utils import compile_version_pattern
+
+
+class VersionMatcher:
+    """Find the mappings which apply to a version among many ones.
+
+    The mappings are grouped by their version pattern, thus each distinct pattern is compiled
+    once and matched once per version, however many mappings share it.
+
+    The matcher is immutable and safe to share across threads.
+    """
+
+    def __init__(self, mappings: Iterable[Mapping]) -> None:
+        """Create a new VersionMatcher object.
+
+        Args:
+            mappings (list)
+                The mappings to match, e.g. all the mappings of a set of policies.
+        Raises:
+            ValueError: When a mapping has both version patterns.
+            re.error: When a mapping has an invalid regular expression.
+        """
+        self.mappings = list(mappings)
+        self._always: List[int] = []
+        patterns: Dict[Pattern[str], List[int]] = {}
+        for i, mapping in enumerate(self.mappings):
+            pattern = compile_version_pattern(mapping.version_fnmatch, mapping.version_regexmatch)
+            if pattern is None:
+                self._always.append(i)
+            else:
+                patterns.setdefault(pattern, []).append(i)
+        self._patterns: List[Tuple[Pattern[str], List[int]]] = list(patterns.items())
+
+    def _matched(self, version: str) -> List[int]:
+        matched = list(self._always)
+        for pattern, targets in self._patterns:
+            if pattern.match(version) is not None:
+                matched.extend(targets)
+        matched.sort()
+        return matched
+
+    def match(self, version: str) -> List[Mapping]:
+        """Return the mappings which apply to the given NVR version.
+
+        Args:
+            version (str):
+                The version from the NVR.
+        Returns:
+            list: The matched mappings, in the original order.
+        """
+        return [self.mappings[i] for i in self._matched(version)]
+
+    def destinations(self, version: str) -> List[Destination]:
+        """Return the destinations of all the mappings which apply to the given NVR version.
+
+        Args:
+            version (str):
+                The version from the NVR.
+        Returns:
+            list: The destinations of the matched mappings, in the original order.
+        """
+        return [d for i in self._matched(version) for d in self.mappings[i].destinations]
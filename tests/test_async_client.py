@@ -0,0 +1,210 @@
+import asyncio
+import json
+import logging
+from copy import deepcopy
+from typing import Any
+from unittest import mock
+
+import httpx
+import pytest
+from _pytest.logging import LogCaptureFixture
+
+from starmap_client.async_client import AsyncStarmapClient
+from starmap_client.async_session import AsyncStarmapSession
+from starmap_client.models import Destination, Mapping, Policy, QueryResponseContainer
+from starmap_client.providers import InMemoryMapProviderV2
+
+
+def load_json(json_file: str) -> Any:
+    with open(json_file, "r") as fd:
+        data = json.load(fd)
+    return data
+
+
+def run(coro: Any) -> Any:
+    return asyncio.run(coro)
+
+
+class TestAsyncStarmapClient:
+    @pytest.fixture(autouse=True)
+    def inject_fixtures(self, caplog: LogCaptureFixture) -> None:
+        self._caplog = caplog
+
+    def setup_method(self) -> None:
+        self.svc = AsyncStarmapClient("https://test.starmap.com", api_version="v2")
+        self.mock_session = mock.patch.object(self.svc, 'session').start()
+        self.mock_session.get = mock.AsyncMock()
+        self.mock_session.aclose = mock.AsyncMock()
+
+        self.image = "foo-bar-1.0-1.raw.xz"
+
+        self.mock_resp_success = mock.MagicMock()
+        self.mock_resp_success.status_code = 200
+        self.mock_resp_not_found = mock.MagicMock()
+        self.mock_resp_not_found.status_code = 404
+
+    def teardown_method(self) -> None:
+        mock.patch.stopall()
+
+    def test_init(self) -> None:
+        svc = AsyncStarmapClient("https://test.starmap.com", session_params={"retries": 5})
+        assert isinstance(svc.session, AsyncStarmapSession)
+        assert svc.session.retries == 5
+
+        with pytest.raises(ValueError, match="Cannot initialize the client"):
+            AsyncStarmapClient()
+
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        provider = InMemoryMapProviderV2(QueryResponseContainer.from_json(load_json(fpath)))
+        err = "API mismatch: Provider has API v2 but the client expects: v1"
+        with pytest.raises(ValueError, match=err):
+            AsyncStarmapClient("foo", api_version="v1", provider=provider)
+
+    def test_context_manager(self) -> None:
+        async def use_client() -> None:
+            async with self.svc as svc:
+                assert svc is self.svc
+
+        run(use_client())
+        self.mock_session.aclose.assert_awaited_once()
+
+    def test_query_image(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        self.mock_resp_success.json.return_value = load_json(fpath)
+        self.mock_session.get.return_value = self.mock_resp_success
+
+        res = run(self.svc.query_image(self.image))
+
+        self.mock_session.get.assert_awaited_once_with("/query", params={"image": self.image})
+        self.mock_resp_success.raise_for_status.assert_called_once()
+        assert res == QueryResponseContainer.from_json(load_json(fpath))
+
+    def test_query_image_by_name(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        self.mock_resp_success.json.return_value = load_json(fpath)
+        self.mock_session.get.return_value = self.mock_resp_success
+
+        res = run(self.svc.query_image_by_name("foo-bar", version="1.0"))
+
+        self.mock_session.get.assert_awaited_once_with(
+            "/query", params={"name": "foo-bar", "version": "1.0"}
+        )
+        assert res == QueryResponseContainer.from_json(load_json(fpath))
+
+    def test_query_image_not_found(self) -> None:
+        self.mock_session.get.return_value = self.mock_resp_not_found
+
+        with self._caplog.at_level(logging.ERROR):
+            res = run(self.svc.query_image(self.image))
+
+        assert res is None
+        expected_msg = "Marketplace mappings not defined for {'image': '%s'}" % self.image
+        assert expected_msg in self._caplog.text
+
+    def test_query_image_from_provider(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        data = QueryResponseContainer.from_json(load_json(fpath))
+        self.svc._provider = InMemoryMapProviderV2(data)
+
+        res = run(self.svc.query_image("product-test-1.0-1.raw.xz", workflow="stratosphere"))
+
+        assert res
+        assert res.responses == [data.responses[0]]
+        self.mock_session.get.assert_not_awaited()
+
+    def test_query_image_provider_miss(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        data = QueryResponseContainer.from_json(load_json(fpath))
+        self.svc._provider = InMemoryMapProviderV2(data)
+        self.mock_session.get.return_value = self.mock_resp_not_found
+
+        res = run(self.svc.query_image(self.image))
+
+        assert res is None
+        self.mock_session.get.assert_awaited_once()
+
+    def test_policies_multi_page(self) -> None:
+        fpath = "tests/data/policy/valid_pol1.json"
+        page1 = {
+            "items": [load_json(fpath)],
+            "nav": {"next": "https://test.starmap.com/api/v2/policy?page=2&per_page=1"},
+        }
+        page2 = deepcopy(page1)
+        page2["nav"]["next"] = None  # type: ignore[index]
+        self.svc.POLICIES_PER_PAGE = 1
+        self.mock_resp_success.json.side_effect = [page1, page2]
+        self.mock_session.get.return_value = self.mock_resp_success
+
+        res = run(self.svc.list_policies())
+
+        assert res == [Policy.from_json(load_json(fpath)), Policy.from_json(load_json(fpath))]
+        self.mock_session.get.assert_has_awaits(
+            [
+                mock.call("policy", params={"page": 1, "per_page": 1}),
+                mock.call("policy", params={"page": 2, "per_page": 1}),
+            ]
+        )
+
+        # Cached policies
+        assert run(self.svc.list_policies()) == res
+        assert self.mock_session.get.await_count == 2
+
+    def test_policies_not_found(self) -> None:
+        self.mock_session.get.return_value = self.mock_resp_not_found
+
+        with self._caplog.at_level(logging.ERROR):
+            res = run(self.svc.list_policies())
+
+        assert res == []
+        assert "No policies registered in StArMap." in self._caplog.text
+
+    def test_get_policy_and_mappings(self) -> None:
+        fpath = "tests/data/policy/valid_pol1.json"
+        self.mock_resp_success.json.side_effect = lambda: load_json(fpath)
+        self.mock_session.get.return_value = self.mock_resp_success
+        expected = Policy.from_json(load_json(fpath))
+
+        assert run(self.svc.get_policy("policy-id")) == expected
+        assert run(self.svc.list_mappings("policy-id")) == expected.mappings
+        self.mock_session.get.assert_awaited_with("/policy/policy-id")
+
+    def test_get_mapping_and_destinations(self) -> None:
+        fpath = "tests/data/mapping/valid_map1.json"
+        self.mock_resp_success.json.side_effect = lambda: load_json(fpath)
+        self.mock_session.get.return_value = self.mock_resp_success
+        expected = Mapping.from_json(load_json(fpath))
+
+        assert run(self.svc.get_mapping("mapping-id")) == expected
+        assert run(self.svc.list_destinations("mapping-id")) == expected.destinations
+        self.mock_session.get.assert_awaited_with("/mapping/mapping-id")
+
+    def test_get_destination(self) -> None:
+        fpath = "tests/data/destination/valid_dest1.json"
+        self.mock_resp_success.json.return_value = load_json(fpath)
+        self.mock_session.get.return_value = self.mock_resp_success
+
+        res = run(self.svc.get_destination("destination-id"))
+
+        self.mock_session.get.assert_awaited_once_with("/destination/destination-id")
+        assert res == Destination.from_json(load_json(fpath))
+
+    def test_not_found(self) -> None:
+        self.mock_session.get.return_value = self.mock_resp_not_found
+
+        with self._caplog.at_level(logging.ERROR):
+            assert run(self.svc.get_policy("policy-id")) is None
+            assert run(self.svc.list_mappings("policy-id")) == []
+            assert run(self.svc.get_mapping("mapping-id")) is None
+            assert run(self.svc.list_destinations("mapping-id")) == []
+            assert run(self.svc.get_destination("destination-id")) is None
+
+        assert "Policy not found with ID = \"policy-id\"" in self._caplog.text
+        assert "Marketplace Mapping not found with ID = \"mapping-id\"" in self._caplog.text
+        assert "Destination not found with ID = \"destination-id\"" in self._caplog.text
+
+    def test_raise_for_status(self) -> None:
+        rsp = httpx.Response(500, request=httpx.Request("GET", "https://test.starmap.com"))
+        self.mock_session.get.return_value = rsp
+
+        with pytest.raises(httpx.HTTPStatusError):
+            run(self.svc.get_policy("policy-id"))
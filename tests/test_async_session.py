@@ -0,0 +1,253 @@
+import asyncio
+from typing import Any, Callable, List, Type
+from unittest import mock
+
+import httpx
+import pytest
+
+from starmap_client.async_session import AsyncStarmapSession, RetryError
+
+
+class TestAsyncStarmapSession:
+    def setup_method(self) -> None:
+        self.starmap_url = "https://test.starmap.com"
+        self.starmap_api_version = "v2"
+        self.session = AsyncStarmapSession(
+            url=self.starmap_url, api_version=self.starmap_api_version, backoff_factor=0.5
+        )
+        self.requests: List[httpx.Request] = []
+        self.mock_sleep = mock.patch(
+            "starmap_client.async_session.asyncio.sleep", new_callable=mock.AsyncMock
+        ).start()
+
+    def teardown_method(self) -> None:
+        mock.patch.stopall()
+
+    def _mock_transport(self, handler: Callable[[httpx.Request], httpx.Response]) -> None:
+        def record(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            return handler(request)
+
+        self.session.session = httpx.AsyncClient(transport=httpx.MockTransport(record))
+
+    def _run(self, coro: Any) -> Any:
+        return asyncio.run(coro)
+
+    def test_get_request(self) -> None:
+        self._mock_transport(lambda r: httpx.Response(200, json={"foo": "bar"}))
+
+        rsp = self._run(self.session.get("/foo", params={"page": 1}))
+
+        assert rsp.json() == {"foo": "bar"}
+        assert len(self.requests) == 1
+        req = self.requests[0]
+        assert req.method == "GET"
+        assert str(req.url) == f"{self.starmap_url}/api/v2/foo?page=1"
+        assert req.headers["Accept"] == "application/json"
+        assert req.extensions["timeout"] == httpx.Timeout(10.0).as_dict()
+
+    def test_post_request(self) -> None:
+        data = {"foo": "bar"}
+        self._mock_transport(lambda r: httpx.Response(201, json=data))
+
+        rsp = self._run(self.session.post("/foo", json=data))
+
+        assert rsp.status_code == 201
+        assert self.requests[0].method == "POST"
+        assert self.requests[0].content == b'{"foo":"bar"}'
+
+    def test_put_request(self) -> None:
+        data = {"foo": "bar"}
+        self._mock_transport(lambda r: httpx.Response(200, json=data))
+
+        rsp = self._run(self.session.put("/foo", json=data, timeout=(1.0, 5.0)))
+
+        assert rsp.status_code == 200
+        assert self.requests[0].method == "PUT"
+        assert self.requests[0].extensions["timeout"] == httpx.Timeout(5.0, connect=1.0).as_dict()
+
+    def test_retry_on_status(self) -> None:
+        responses = [httpx.Response(503), httpx.Response(500), httpx.Response(200, json=[])]
+        self._mock_transport(lambda r: responses.pop(0))
+
+        rsp = self._run(self.session.get("/query"))
+
+        assert rsp.status_code == 200
+        assert len(self.requests) == 3
+        # Same as urllib3: no backoff before the first retry
+        self.mock_sleep.assert_has_awaits([mock.call(0.0), mock.call(1.0)])
+
+    def test_retry_exhausted_on_status(self) -> None:
+        self._mock_transport(lambda r: httpx.Response(502))
+
+        # Same as the requests RetryError raised by StarmapSession
+        with pytest.raises(RetryError, match="too many 502 error responses") as exc_info:
+            self._run(self.session.get("/query"))
+
+        assert exc_info.value.response.status_code == 502
+        assert len(self.requests) == 4
+        self.mock_sleep.assert_has_awaits([mock.call(0.0), mock.call(1.0), mock.call(2.0)])
+
+    def test_no_retries_on_status(self) -> None:
+        self.session.retries = 0
+        self._mock_transport(lambda r: httpx.Response(500))
+
+        with pytest.raises(RetryError):
+            self._run(self.session.get("/query"))
+        assert len(self.requests) == 1
+
+    @pytest.mark.parametrize("status", [413, 429, 503])
+    def test_retry_after_exhausted(self, status: int) -> None:
+        self._mock_transport(lambda r: httpx.Response(status, headers={"Retry-After": "1"}))
+
+        if status == 503:
+            with pytest.raises(RetryError):
+                self._run(self.session.get("/query"))
+        else:
+            # Same as urllib3: only the statuses to retry raise once the retries are exhausted
+            rsp = self._run(self.session.get("/query"))
+            assert rsp.status_code == status
+        assert len(self.requests) == 4
+
+    @pytest.mark.parametrize("status", [413, 429])
+    def test_no_retry_without_retry_after(self, status: int) -> None:
+        self._mock_transport(lambda r: httpx.Response(status))
+
+        rsp = self._run(self.session.get("/query"))
+
+        assert rsp.status_code == status
+        assert len(self.requests) == 1
+
+    def test_no_retry_on_status_for_post(self) -> None:
+        self._mock_transport(lambda r: httpx.Response(500))
+
+        rsp = self._run(self.session.post("/policy", json={}))
+
+        assert rsp.status_code == 500
+        assert len(self.requests) == 1
+
+    def test_retry_on_connect_error(self) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            if len(self.requests) < 3:
+                raise httpx.ConnectError("boom", request=request)
+            return httpx.Response(200)
+
+        self._mock_transport(handler)
+
+        rsp = self._run(self.session.post("/policy", json={}))
+
+        assert rsp.status_code == 200
+        assert len(self.requests) == 3
+
+    def test_retry_exhausted_on_connect_error(self) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise httpx.ConnectTimeout("boom", request=request)
+
+        self._mock_transport(handler)
+
+        with pytest.raises(httpx.ConnectTimeout):
+            self._run(self.session.get("/query"))
+        assert len(self.requests) == 4
+
+    def test_retry_on_read_error(self) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            if len(self.requests) < 2:
+                raise httpx.ReadTimeout("boom", request=request)
+            return httpx.Response(200)
+
+        self._mock_transport(handler)
+
+        rsp = self._run(self.session.get("/query"))
+
+        assert rsp.status_code == 200
+        assert len(self.requests) == 2
+
+    def test_no_retry_on_read_error_for_post(self) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise httpx.ReadError("boom", request=request)
+
+        self._mock_transport(handler)
+
+        with pytest.raises(httpx.ReadError):
+            self._run(self.session.post("/policy", json={}))
+        assert len(self.requests) == 1
+
+    @pytest.mark.parametrize(
+        "error", [httpx.RemoteProtocolError, httpx.WriteError, httpx.PoolTimeout]
+    )
+    def test_retry_on_transport_error(self, error: Type[httpx.TransportError]) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            if len(self.requests) < 2:
+                raise error("boom", request=request)
+            return httpx.Response(200)
+
+        self._mock_transport(handler)
+
+        rsp = self._run(self.session.get("/query"))
+
+        assert rsp.status_code == 200
+        assert len(self.requests) == 2
+
+    @pytest.mark.parametrize(
+        "error,attempts",
+        [(httpx.RemoteProtocolError, 1), (httpx.WriteError, 1), (httpx.PoolTimeout, 4)],
+    )
+    def test_retry_on_transport_error_for_post(
+        self, error: Type[httpx.TransportError], attempts: int
+    ) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise error("boom", request=request)
+
+        self._mock_transport(handler)
+
+        # Only the requests which weren't sent are sent again
+        with pytest.raises(error):
+            self._run(self.session.post("/policy", json={}))
+        assert len(self.requests) == attempts
+
+    def test_no_retry_on_unsupported_protocol(self) -> None:
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise httpx.UnsupportedProtocol("boom", request=request)
+
+        self._mock_transport(handler)
+
+        with pytest.raises(httpx.UnsupportedProtocol):
+            self._run(self.session.get("/query"))
+        assert len(self.requests) == 1
+
+    @pytest.mark.parametrize(
+        "status,retry_after,delay",
+        [
+            (413, "7", 7.0),
+            (429, "7", 7.0),
+            (503, "7", 7.0),
+            (503, "1000", 120.0),
+            (503, "invalid", 0.0),
+            (500, "7", 0.0),
+        ],
+    )
+    def test_retry_after(self, status: int, retry_after: str, delay: float) -> None:
+        responses = [
+            httpx.Response(status, headers={"Retry-After": retry_after}),
+            httpx.Response(200),
+        ]
+        self._mock_transport(lambda r: responses.pop(0))
+
+        rsp = self._run(self.session.get("/query"))
+
+        assert rsp.status_code == 200
+        self.mock_sleep.assert_awaited_once_with(delay)
+
+    def test_backoff_max(self) -> None:
+        self.session.backoff_factor = 100.0
+
+        assert self.session._get_backoff_time(1) == 0.0
+        assert self.session._get_backoff_time(2) == 120.0
+
+    def test_context_manager(self) -> None:
+        async def run() -> None:
+            async with self.session as s:
+                assert s is self.session
+            assert self.session.session.is_closed
+
+        self._run(run())
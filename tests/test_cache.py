@@ -0,0 +1,109 @@
+from typing import Any, Dict
+from unittest import mock
+
+import pytest
+
+from starmap_client.cache import InMemoryQueryCache, make_cache_key
+from starmap_client.models import QueryResponseContainer, Workflow
+
+
+@pytest.mark.parametrize(
+    "params,expected",
+    [
+        ({}, ()),
+        ({"name": "foo", "version": None}, (("name", "foo"),)),
+        (
+            {"workflow": Workflow.stratosphere, "name": "foo"},
+            (("name", "foo"), ("workflow", "stratosphere")),
+        ),
+        (
+            {"workflow": "stratosphere", "name": "foo"},
+            (("name", "foo"), ("workflow", "stratosphere")),
+        ),
+        ({"image": "foo-1.0-1.raw.xz", "page": 1}, (("image", "foo-1.0-1.raw.xz"), ("page", "1"))),
+        ({"image": "/path/to/foo-1.0-1.raw.xz"}, (("image", "foo-1.0-1.raw.xz"),)),
+        ({"image": "1:foo-1.0-1.raw.xz"}, (("image", "foo-1.0-1.raw.xz:1"),)),
+        ({"image": "foo-1:1.0-1.raw.xz"}, (("image", "foo-1.0-1.raw.xz:1"),)),
+        ({"image": "foo"}, (("image", "foo"),)),
+        ({"image": ["foo"]}, (("image", "['foo']"),)),
+    ],
+)
+def test_make_cache_key(params: Dict[str, Any], expected: Any) -> None:
+    assert make_cache_key(params) == expected
+
+
+class TestInMemoryQueryCache:
+    def setup_method(self) -> None:
+        self.qrc = QueryResponseContainer([])
+        self.mock_time = mock.patch("starmap_client.cache.time.monotonic").start()
+        self.mock_time.return_value = 100.0
+
+    def teardown_method(self) -> None:
+        mock.patch.stopall()
+
+    def test_invalid_max_entries(self) -> None:
+        with pytest.raises(ValueError, match="The max_entries must be a positive number, got: 0"):
+            InMemoryQueryCache(max_entries=0)
+
+    def test_get_set(self) -> None:
+        cache = InMemoryQueryCache()
+        key = make_cache_key({"name": "foo"})
+
+        with pytest.raises(KeyError):
+            cache.get(key)
+
+        cache.set(key, self.qrc)
+        assert cache.get(key) is self.qrc
+        assert cache.stats == {"hits": 1, "misses": 1, "evictions": 0, "size": 1}
+
+        cache.clear()
+        assert len(cache) == 0
+
+    def test_ttl(self) -> None:
+        cache = InMemoryQueryCache(ttl=10.0)
+        key = make_cache_key({"name": "foo"})
+        cache.set(key, self.qrc)
+
+        self.mock_time.return_value = 110.0
+        assert cache.get(key) is self.qrc
+
+        self.mock_time.return_value = 110.1
+        with pytest.raises(KeyError):
+            cache.get(key)
+        assert len(cache) == 0
+
+    def test_no_ttl(self) -> None:
+        cache = InMemoryQueryCache(ttl=None)
+        key = make_cache_key({"name": "foo"})
+        cache.set(key, self.qrc)
+
+        self.mock_time.return_value = 1e12
+        assert cache.get(key) is self.qrc
+
+    def test_lru_eviction(self) -> None:
+        cache = InMemoryQueryCache(max_entries=2)
+        k1, k2, k3 = [make_cache_key({"name": n}) for n in ["a", "b", "c"]]
+        cache.set(k1, self.qrc)
+        cache.set(k2, self.qrc)
+
+        # Use k1 so k2 becomes the least recently used
+        cache.get(k1)
+        cache.set(k3, self.qrc)
+
+        assert cache.get(k1) is self.qrc
+        assert cache.get(k3) is self.qrc
+        with pytest.raises(KeyError):
+            cache.get(k2)
+        assert cache.evictions == 1
+
+    def test_not_found(self) -> None:
+        key = make_cache_key({"name": "foo"})
+
+        cache = InMemoryQueryCache()
+        cache.set(key, None)
+        with pytest.raises(KeyError):
+            cache.get(key)
+
+        cache = InMemoryQueryCache(cache_not_found=True)
+        cache.set(key, None)
+        assert cache.get(key) is None
@@ -0,0 +1,167 @@
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+import pytest
+
+from starmap_client import StarmapClient
+from starmap_client.catalogue import PolicyCatalogue
+from starmap_client.models import Policy, Workflow
+from tests.utils import make_destination, make_mapping, make_policy
+
+
+def catalogue_policy(
+    policy_id: Optional[str], name: str, workflow: str, mappings: List[Dict[str, Any]]
+) -> Policy:
+    """Return the policy with the given ID and mappings."""
+    return Policy.from_json(make_policy(name, mappings, workflow=workflow, id=policy_id, meta={}))
+
+
+@pytest.fixture
+def policies() -> List[Policy]:
+    return [
+        catalogue_policy(
+            "p1",
+            "product-1",
+            "stratosphere",
+            [
+                make_mapping(
+                    "aws-na",
+                    [
+                        make_destination("dest-1", id="d1", architecture="x86_64"),
+                        make_destination("dest-2", id="d2", architecture="aarch64"),
+                    ],
+                    id="m1",
+                ),
+                make_mapping(
+                    "azure-na",
+                    [make_destination("dest-1", id="d3", architecture="x86_64")],
+                    id="m2",
+                ),
+            ],
+        ),
+        catalogue_policy(
+            "p2",
+            "product-1",
+            "community",
+            [
+                make_mapping(
+                    "aws-na", [make_destination("dest-3", id="d4", architecture=None)], id="m3"
+                )
+            ],
+        ),
+        catalogue_policy(
+            None,
+            "product-2",
+            "stratosphere",
+            [
+                make_mapping(
+                    "aws-emea",
+                    [make_destination("dest-1", id=None, architecture="x86_64")],
+                    id=None,
+                )
+            ],
+        ),
+    ]
+
+
+def test_get_by_id(policies: List[Policy]) -> None:
+    catalogue = PolicyCatalogue(policies)
+
+    assert catalogue.get_policy("p2") is policies[1]
+    assert catalogue.get_mapping("m2") is policies[0].mappings[1]
+    assert catalogue.get_destination("d4") is policies[1].mappings[0].destinations[0]
+    assert catalogue.get_policy("unknown") is None
+    assert catalogue.get_mapping("unknown") is None
+    assert catalogue.get_destination("unknown") is None
+
+
+def test_list_by_id(policies: List[Policy]) -> None:
+    catalogue = PolicyCatalogue(policies)
+
+    assert catalogue.list_mappings("p1") == policies[0].mappings
+    assert catalogue.list_destinations("m1") == policies[0].mappings[0].destinations
+    assert catalogue.list_mappings("unknown") == []
+    assert catalogue.list_destinations("unknown") == []
+
+    # The returned lists are copies
+    catalogue.list_mappings("p1").clear()
+    catalogue.list_destinations("m1").clear()
+    assert len(policies[0].mappings) == 2
+    assert len(policies[0].mappings[0].destinations) == 2
+
+
+@pytest.mark.parametrize(
+    "kwargs,expected",
+    [
+        ({}, [0, 1, 2]),
+        ({"name": "product-1"}, [0, 1]),
+        ({"workflow": Workflow.stratosphere}, [0, 2]),
+        ({"workflow": "community"}, [1]),
+        ({"name": "product-1", "workflow": Workflow.community}, [1]),
+        ({"name": "product-2", "workflow": "community"}, []),
+        ({"name": "unknown"}, []),
+    ],
+)
+def test_find_policies(policies: List[Policy], kwargs: Dict[str, Any], expected: List[int]) -> None:
+    catalogue = PolicyCatalogue(policies)
+
+    res = catalogue.find_policies(**kwargs)
+
+    assert res == [policies[i] for i in expected]
+    res.clear()
+    assert catalogue.find_policies(**kwargs) == [policies[i] for i in expected]
+
+
+def test_mappings_by_account(policies: List[Policy]) -> None:
+    catalogue = PolicyCatalogue(policies)
+
+    assert catalogue.mappings_by_account("aws-na") == [
+        policies[0].mappings[0],
+        policies[1].mappings[0],
+    ]
+    assert catalogue.mappings_by_account("aws-emea") == policies[2].mappings
+    assert catalogue.mappings_by_account("unknown") == []
+
+
+def test_policies_by_account(policies: List[Policy]) -> None:
+    # A second mapping for the same account doesn't list the policy twice
+    policy = catalogue_policy(
+        "p3",
+        "product-3",
+        "stratosphere",
+        [make_mapping("aws-na", [make_destination("dest-4")]) for _ in range(2)],
+    )
+    catalogue = PolicyCatalogue(policies + [policy])
+
+    assert catalogue.policies_by_account("aws-na") == [policies[0], policies[1], policy]
+    assert catalogue.policies_by_account("azure-na") == [policies[0]]
+    assert catalogue.policies_by_account("unknown") == []
+
+
+def test_destinations_by_destination(policies: List[Policy]) -> None:
+    catalogue = PolicyCatalogue(policies)
+
+    res = catalogue.destinations_by_destination("dest-1")
+
+    assert [d.id for d in res] == ["d1", "d3", None]
+    assert catalogue.destinations_by_destination("dest-3")[0].id == "d4"
+    assert catalogue.destinations_by_destination("unknown") == []
+
+
+def test_destinations_by_architecture(policies: List[Policy]) -> None:
+    catalogue = PolicyCatalogue(policies)
+
+    assert [d.id for d in catalogue.destinations_by_architecture("x86_64")] == ["d1", "d3", None]
+    assert [d.id for d in catalogue.destinations_by_architecture("aarch64")] == ["d2"]
+    assert catalogue.destinations_by_architecture("unknown") == []
+
+
+def test_from_client(policies: List[Policy]) -> None:
+    client = mock.MagicMock(spec=StarmapClient)
+    client.list_policies.return_value = policies
+
+    catalogue = PolicyCatalogue.from_client(client)
+
+    client.list_policies.assert_called_once_with()
+    assert catalogue.policies == policies
+    assert catalogue.get_policy("p1") is policies[0]
@@ -1,17 +1,36 @@
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
-from typing import Any
+from typing import Any, Callable, Dict, List, Optional
 from unittest import TestCase, mock
 
 import pytest
 from _pytest.logging import LogCaptureFixture
-from requests.exceptions import HTTPError
+from requests.exceptions import (
+    ConnectionError,
+    ConnectTimeout,
+    HTTPError,
+    ReadTimeout,
+    RetryError,
+)
+from urllib3.exceptions import MaxRetryError, NewConnectionError
 
 from starmap_client import StarmapClient
-from starmap_client.models import Destination, Mapping, Policy, QueryResponseContainer
+from starmap_client.cache import InMemoryQueryCache
+from starmap_client.client import BatchQueryError, WriteOperation, WriteResult, model_to_json
+from starmap_client.metrics import MetricsRecorder
+from starmap_client.models import (
+    Destination,
+    Mapping,
+    Policy,
+    QueryResponseContainer,
+    Workflow,
+)
 from starmap_client.providers import InMemoryMapProviderV2
-from starmap_client.session import StarmapMockSession
+from starmap_client.session import StarmapBaseSession, StarmapMockSession
+from tests.utils import waiting_followers
 
 
 def load_json(json_file: str) -> Any:
@@ -20,6 +39,18 @@ def load_json(json_file: str) -> Any:
     return data
 
 
+def make_response(
+    status_code: int, json_data: Any = None, headers: Optional[Dict[str, str]] = None
+) -> mock.MagicMock:
+    rsp = mock.MagicMock()
+    rsp.status_code = status_code
+    rsp.headers = headers or {}
+    rsp.json.side_effect = lambda: deepcopy(json_data)
+    if status_code >= 400:
+        rsp.raise_for_status.side_effect = HTTPError(f"Error {status_code}", response=rsp)
+    return rsp
+
+
 class TestStarmapClient(TestCase):
     @pytest.fixture(autouse=True)
     def inject_fixtures(self, caplog: LogCaptureFixture) -> None:
@@ -30,6 +61,9 @@ class TestStarmapClient(TestCase):
 
         self.mock_requests = mock.patch('starmap_client.session.requests').start()
         self.mock_session_v2 = mock.patch.object(self.svc_v2, 'session').start()
+        self.mock_session_v2.backoff_factor = 2.0
+        self.mock_session_v2.retries = 0
+        self.mock_sleep = mock.patch('starmap_client.client.sleep').start()
 
         self.image_name = "foo-bar"
         self.image_version = "1.0-1"
@@ -132,6 +166,298 @@ class TestStarmapClient(TestCase):
         # Note: JSON need to be loaded twice as `from_json` pops its original data
         assert res == QueryResponseContainer.from_json(load_json(fpath))
 
+    def _mock_stream(self, fpath: str, chunk_size: int = 16) -> None:
+        with open(fpath, "rb") as fd:
+            doc = fd.read()
+        chunks = [doc[i : i + chunk_size] for i in range(0, len(doc), chunk_size)]  # noqa: E203
+        self.mock_resp_success.__enter__.return_value = self.mock_resp_success
+        self.mock_resp_success.iter_content.return_value = iter(chunks)
+        self.mock_session_v2.get.return_value = self.mock_resp_success
+
+    def test_iter_query_image_APIv2(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        self._mock_stream(fpath)
+
+        res = self.svc_v2.iter_query_image(self.image, workflow="stratosphere")
+
+        self.mock_session_v2.get.assert_not_called()
+        assert list(res) == QueryResponseContainer.from_json(load_json(fpath)).responses
+        self.mock_session_v2.get.assert_called_once_with(
+            "/query", params={"image": self.image, "workflow": "stratosphere"}, stream=True
+        )
+        self.mock_resp_success.iter_content.assert_called_once_with(self.svc_v2.STREAM_CHUNK_SIZE)
+        self.mock_resp_success.raise_for_status.assert_called_once()
+        self.mock_resp_success.__exit__.assert_called_once()
+
+    def test_iter_query_image_by_name_APIv2(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        self._mock_stream(fpath)
+
+        res = list(self.svc_v2.iter_query_image_by_name(self.image_name, self.image_version))
+
+        assert res == QueryResponseContainer.from_json(load_json(fpath)).responses
+        self.mock_session_v2.get.assert_called_once_with(
+            "/query", params={"name": self.image_name, "version": self.image_version}, stream=True
+        )
+
+    def test_iter_query_image_not_found(self) -> None:
+        self.mock_resp_not_found.__enter__.return_value = self.mock_resp_not_found
+        self.mock_session_v2.get.return_value = self.mock_resp_not_found
+
+        with self._caplog.at_level(logging.ERROR):
+            res = list(self.svc_v2.iter_query_image(self.image))
+
+        assert res == []
+        expected_msg = "Marketplace mappings not defined for {'image': '%s'}" % self.image
+        assert expected_msg in self._caplog.text
+
+    def test_iter_query_image_provider_and_cache(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        data = QueryResponseContainer.from_json(load_json(fpath))
+        provider = InMemoryMapProviderV2(data)
+        cache = InMemoryQueryCache()
+        cache.set((("image", self.image),), data)
+        svc = StarmapClient(session=self.mock_session_v2, provider=provider, cache=cache)
+
+        from_provider = list(svc.iter_query_image("product-test-1.0-1.raw.xz"))
+        from_cache = list(svc.iter_query_image(self.image))
+
+        assert from_provider == data.filter_by_name("product-test")
+        assert from_cache == data.responses
+        self.mock_session_v2.get.assert_not_called()
+
+        # Cache miss, streamed without being stored
+        self._mock_stream(fpath)
+        assert list(svc.iter_query_image("missing-1.0-1.raw.xz")) == data.responses
+        self.mock_session_v2.get.assert_called_once_with(
+            "/query", params={"image": "missing-1.0-1.raw.xz"}, stream=True
+        )
+        with pytest.raises(KeyError):
+            cache.get((("image", "missing-1.0-1.raw.xz"),))
+
+    def test_iter_query_image_cached_not_found(self) -> None:
+        cache = InMemoryQueryCache(cache_not_found=True)
+        cache.set((("image", self.image),), None)
+        svc = StarmapClient(session=self.mock_session_v2, cache=cache)
+
+        assert list(svc.iter_query_image(self.image)) == []
+        self.mock_session_v2.get.assert_not_called()
+
+    def test_query_images_APIv2(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        data = load_json(fpath)
+
+        def get(path: str, params: Dict[str, Any]) -> mock.MagicMock:
+            if params["image"] == "missing-1.0-1.raw.xz":
+                return self.mock_resp_not_found
+            rsp = mock.MagicMock()
+            rsp.status_code = 200
+            rsp.json.return_value = deepcopy(data)
+            return rsp
+
+        self.mock_session_v2.get.side_effect = get
+        nvrs = [self.image, "missing-1.0-1.raw.xz", self.image]
+
+        res = self.svc_v2.query_images(nvrs, max_workers=2, workflow="stratosphere")
+
+        assert list(res.keys()) == [self.image, "missing-1.0-1.raw.xz"]
+        assert res[self.image] == QueryResponseContainer.from_json(load_json(fpath))
+        assert res["missing-1.0-1.raw.xz"] is None
+        # Duplicated NVRs must be requested only once
+        assert self.mock_session_v2.get.call_count == 2
+        self.mock_session_v2.get.assert_any_call(
+            "/query", params={"image": self.image, "workflow": "stratosphere"}
+        )
+
+    def test_query_images_errors_APIv2(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        data = load_json(fpath)
+        error = RetryError("Max retries exceeded")
+
+        def get(path: str, params: Dict[str, Any]) -> mock.MagicMock:
+            if params["image"] == "failed-1.0-1.raw.xz":
+                raise error
+            rsp = mock.MagicMock()
+            rsp.status_code = 200
+            rsp.json.return_value = deepcopy(data)
+            return rsp
+
+        self.mock_session_v2.get.side_effect = get
+        nvrs = ["failed-1.0-1.raw.xz", self.image, "/path/to/failed-1.0-1.raw.xz"]
+
+        with pytest.raises(BatchQueryError, match="2 of 3 queries failed") as exc_info:
+            self.svc_v2.query_images(nvrs, max_workers=2)
+
+        # The other queries are still completed
+        assert exc_info.value.results == {
+            self.image: QueryResponseContainer.from_json(load_json(fpath))
+        }
+        assert exc_info.value.errors == {
+            "failed-1.0-1.raw.xz": error,
+            "/path/to/failed-1.0-1.raw.xz": error,
+        }
+        assert exc_info.value.__cause__ is error
+        assert self.mock_session_v2.get.call_count == 2
+
+    def test_query_images_equivalent_nvrs_APIv2(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        self.mock_resp_success.json.side_effect = lambda: load_json(fpath)
+        self.mock_session_v2.get.return_value = self.mock_resp_success
+        nvrs = ["foo-1.0-1.raw.xz", "/path/to/foo-1.0-1.raw.xz"]
+
+        res = self.svc_v2.query_images(nvrs)
+
+        assert list(res.keys()) == nvrs
+        assert res[nvrs[0]] is res[nvrs[1]]
+        self.mock_session_v2.get.assert_called_once_with(
+            "/query", params={"image": "foo-1.0-1.raw.xz"}
+        )
+
+    def test_query_images_provider_first_APIv2(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        data = QueryResponseContainer.from_json(load_json(fpath))
+        provider = InMemoryMapProviderV2(data)
+        self.svc_v2 = StarmapClient("https://test.starmap.com", api_version="v2", provider=provider)
+        self.mock_session_v2 = mock.patch.object(self.svc_v2, 'session').start()
+        self.mock_session_v2.get.return_value = self.mock_resp_not_found
+
+        res = self.svc_v2.query_images(
+            ["product-test-1.0-1.raw.xz", self.image], workflow="stratosphere"
+        )
+
+        assert res["product-test-1.0-1.raw.xz"] == QueryResponseContainer([data.responses[0]])
+        assert res[self.image] is None
+        self.mock_session_v2.get.assert_called_once_with(
+            "/query", params={"image": self.image, "workflow": "stratosphere"}
+        )
+
+    def test_query_images_provider_error_APIv2(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        data = QueryResponseContainer.from_json(load_json(fpath))
+        provider = InMemoryMapProviderV2(data)
+        self.svc_v2 = StarmapClient("https://test.starmap.com", api_version="v2", provider=provider)
+        self.mock_session_v2 = mock.patch.object(self.svc_v2, 'session').start()
+        self.mock_session_v2.get.return_value = self.mock_resp_not_found
+
+        with pytest.raises(BatchQueryError, match="1 of 3 queries failed") as exc_info:
+            self.svc_v2.query_images(["product-test-1.0-1.raw.xz", "badnvr", self.image])
+
+        assert exc_info.value.results == {
+            "product-test-1.0-1.raw.xz": QueryResponseContainer([data.responses[0]]),
+            self.image: None,
+        }
+        assert list(exc_info.value.errors) == ["badnvr"]
+        assert isinstance(exc_info.value.errors["badnvr"], RuntimeError)
+        self.mock_session_v2.get.assert_called_once_with("/query", params={"image": self.image})
+
+    def test_query_images_all_from_provider_APIv2(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        data = QueryResponseContainer.from_json(load_json(fpath))
+        provider = InMemoryMapProviderV2(data)
+        self.svc_v2 = StarmapClient("https://test.starmap.com", api_version="v2", provider=provider)
+        self.mock_session_v2 = mock.patch.object(self.svc_v2, 'session').start()
+
+        res = self.svc_v2.query_images_by_name(["product-test"], workflow="stratosphere")
+
+        assert res == {"product-test": QueryResponseContainer([data.responses[0]])}
+        self.mock_session_v2.get.assert_not_called()
+
+    def test_query_images_by_name_APIv2(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        self.mock_resp_success.json.side_effect = lambda: load_json(fpath)
+        self.mock_session_v2.get.return_value = self.mock_resp_success
+
+        res = self.svc_v2.query_images_by_name(["foo", "bar"], version=self.image_version)
+
+        expected = QueryResponseContainer.from_json(load_json(fpath))
+        assert res == {"foo": expected, "bar": expected}
+        get_calls = [
+            mock.call("/query", params={"name": "foo", "version": self.image_version}),
+            mock.call("/query", params={"name": "bar", "version": self.image_version}),
+        ]
+        self.mock_session_v2.get.assert_has_calls(get_calls, any_order=True)
+
+    def test_query_image_cached_APIv2(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        self.mock_resp_success.json.return_value = load_json(fpath)
+        self.mock_session_v2.get.return_value = self.mock_resp_success
+        cache = InMemoryQueryCache()
+        self.svc_v2._cache = cache
+
+        res1 = self.svc_v2.query_image(self.image, workflow=Workflow.stratosphere)
+        res2 = self.svc_v2.query_image(self.image, workflow="stratosphere")
+
+        assert res1
+        assert res1 is res2
+        self.mock_session_v2.get.assert_called_once()
+        assert cache.stats == {"hits": 1, "misses": 1, "evictions": 0, "size": 1}
+
+    def test_query_image_not_found_cached_APIv2(self) -> None:
+        self.mock_session_v2.get.return_value = self.mock_resp_not_found
+        self.svc_v2._cache = InMemoryQueryCache(cache_not_found=True)
+
+        assert self.svc_v2.query_image(self.image) is None
+        assert self.svc_v2.query_image(self.image) is None
+        self.mock_session_v2.get.assert_called_once()
+
+    def test_query_image_provider_before_cache_APIv2(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        data = QueryResponseContainer.from_json(load_json(fpath))
+        cache = mock.MagicMock()
+        self.svc_v2 = StarmapClient(
+            "https://test.starmap.com", provider=InMemoryMapProviderV2(data), cache=cache
+        )
+
+        res = self.svc_v2.query_image_by_name(name="product-test", workflow="stratosphere")
+
+        assert res
+        cache.get.assert_not_called()
+
+    @staticmethod
+    def _not_modified(stored: mock.MagicMock) -> mock.MagicMock:
+        """Return the copy of a stored response returned by the session for a 304."""
+        rsp = mock.MagicMock(from_cache=True, stored_response=stored)
+        rsp.json.side_effect = stored.json.side_effect
+        return rsp
+
+    def test_get_policy_not_modified(self) -> None:
+        fpath = "tests/data/policy/valid_pol1.json"
+        self.mock_resp_success.json.side_effect = lambda: load_json(fpath)
+        self.mock_resp_success.from_cache = False
+        self.mock_session_v2.get.return_value = self.mock_resp_success
+
+        res1 = self.svc_v2.get_policy(policy_id="policy-id")
+        self.mock_session_v2.get.return_value = self._not_modified(self.mock_resp_success)
+        res2 = self.svc_v2.get_policy(policy_id="policy-id")
+
+        assert res1 == Policy.from_json(load_json(fpath))
+        assert res2 is res1
+        self.mock_resp_success.json.assert_called_once()
+
+    def test_query_image_from_cache_not_decoded(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        self.mock_resp_success.json.side_effect = lambda: load_json(fpath)
+        self.mock_session_v2.get.return_value = self._not_modified(self.mock_resp_success)
+
+        # The response was never decoded by this client
+        res = self.svc_v2.query_image(self.image)
+
+        assert res == QueryResponseContainer.from_json(load_json(fpath))
+        self.mock_resp_success.json.assert_called_once()
+
+    @mock.patch("starmap_client.client.Policy.from_json")
+    @mock.patch("starmap_client.client.QueryResponseContainer.from_json")
+    def test_decode_params(self, mock_qrc: mock.MagicMock, mock_policy: mock.MagicMock) -> None:
+        svc = StarmapClient(session=self.mock_session_v2, decode_params={"trusted": True})
+        self.mock_resp_success.json.return_value = {"nav": {"next": None}, "items": [{}]}
+        self.mock_session_v2.get.return_value = self.mock_resp_success
+
+        svc.query_image(self.image)
+        svc.list_policies()
+
+        mock_qrc.assert_called_once_with(self.mock_resp_success.json.return_value, trusted=True)
+        mock_policy.assert_called_once_with({}, trusted=True)
+
     def test_policies_single_page(self) -> None:
         fpath = "tests/data/policy/valid_pol1.json"
         single_page = {
@@ -209,6 +535,114 @@ class TestStarmapClient(TestCase):
                 next(self.svc_v2.policies)
         assert "No policies registered in StArMap." in self._caplog.text
 
+    def _policy_page(
+        self, page: int, total_pages: int, listed_pages: Optional[int] = None
+    ) -> Dict[str, Any]:
+        item = load_json("tests/data/policy/valid_pol1.json")
+        item["name"] = f"policy-{page}"
+        nav: Dict[str, Any] = {
+            "next": None if page == total_pages else f"policy?page={page + 1}&per_page=1",
+            "page": page,
+            "per_page": 1,
+            "total": total_pages,
+        }
+        if listed_pages != 0:
+            nav["total_pages"] = listed_pages or total_pages
+        return {"items": [item], "nav": nav}
+
+    def _mock_policy_pages(
+        self, total_pages: int, missing: int = 0, listed_pages: Optional[int] = None
+    ) -> None:
+        """Mock the policies pages, with ``listed_pages`` as ``total_pages`` or none when 0."""
+
+        def get(path: str, params: Dict[str, Any]) -> mock.MagicMock:
+            if params["page"] == missing:
+                return self.mock_resp_not_found
+            rsp = mock.MagicMock()
+            rsp.status_code = 200
+            rsp.json.return_value = self._policy_page(params["page"], total_pages, listed_pages)
+            return rsp
+
+        self.mock_session_v2.get.side_effect = get
+
+    def test_policies_prefetch(self) -> None:
+        self.svc_v2.POLICIES_PER_PAGE = 1
+        self.svc_v2.POLICIES_PREFETCH_PAGES = 2
+        self._mock_policy_pages(total_pages=5)
+
+        res = [p.name for p in self.svc_v2.policies]
+
+        assert res == [f"policy-{i}" for i in range(1, 6)]
+        assert self.mock_session_v2.get.call_count == 5
+        for i in range(1, 6):
+            self.mock_session_v2.get.assert_any_call("policy", params={"page": i, "per_page": 1})
+
+    def test_policies_prefetch_without_total_pages(self) -> None:
+        self.svc_v2.POLICIES_PER_PAGE = 1
+        self.svc_v2.POLICIES_PREFETCH_PAGES = 2
+        self._mock_policy_pages(total_pages=3, listed_pages=0)
+
+        res = [p.name for p in self.svc_v2.policies]
+
+        assert res == ["policy-1", "policy-2", "policy-3"]
+        assert self.mock_session_v2.get.call_count == 3
+
+    def test_policies_prefetch_follows_next(self) -> None:
+        self.svc_v2.POLICIES_PER_PAGE = 1
+        self.svc_v2.POLICIES_PREFETCH_PAGES = 2
+        # The listing grew after the first page was fetched
+        self._mock_policy_pages(total_pages=5, listed_pages=2)
+
+        res = [p.name for p in self.svc_v2.policies]
+
+        assert res == [f"policy-{i}" for i in range(1, 6)]
+        assert self.mock_session_v2.get.call_count == 5
+
+    def test_policies_prefetch_single_page(self) -> None:
+        self.svc_v2.POLICIES_PER_PAGE = 1
+        self.svc_v2.POLICIES_PREFETCH_PAGES = 2
+        self._mock_policy_pages(total_pages=1)
+
+        res = [p.name for p in self.svc_v2.policies]
+
+        assert res == ["policy-1"]
+        self.mock_session_v2.get.assert_called_once_with(
+            "policy", params={"page": 1, "per_page": 1}
+        )
+
+    def test_policies_prefetch_not_found(self) -> None:
+        self.svc_v2.POLICIES_PER_PAGE = 1
+        self.svc_v2.POLICIES_PREFETCH_PAGES = 2
+        self._mock_policy_pages(total_pages=3, missing=1)
+
+        with self._caplog.at_level(logging.ERROR):
+            res = [p for p in self.svc_v2.policies]
+
+        assert res == []
+        assert "No policies registered in StArMap." in self._caplog.text
+
+    def test_policies_prefetch_page_vanished(self) -> None:
+        self.svc_v2.POLICIES_PER_PAGE = 1
+        self.svc_v2.POLICIES_PREFETCH_PAGES = 2
+        self._mock_policy_pages(total_pages=4, missing=3)
+
+        res = [p.name for p in self.svc_v2.policies]
+
+        assert res == ["policy-1", "policy-2"]
+
+    def test_policies_prefetch_stop_early(self) -> None:
+        self.svc_v2.POLICIES_PER_PAGE = 1
+        self.svc_v2.POLICIES_PREFETCH_PAGES = 2
+        self._mock_policy_pages(total_pages=10)
+
+        policies = self.svc_v2.policies
+        assert next(policies).name == "policy-1"
+        assert next(policies).name == "policy-2"
+        policies.close()  # type: ignore[attr-defined]
+
+        # Only the pages within the prefetch window were requested
+        assert self.mock_session_v2.get.call_count <= 4
+
     @mock.patch('starmap_client.StarmapClient.policies')
     def test_list_policies(self, mock_policies: mock.MagicMock) -> None:
         fpath = "tests/data/policy/valid_pol1.json"
@@ -228,6 +662,28 @@ class TestStarmapClient(TestCase):
         mock_policies.__iter__.assert_called_once()
         assert res == pol_list
 
+    def test_list_policies_concurrent(self) -> None:
+        pol = Policy.from_json(load_json("tests/data/policy/valid_pol1.json"))
+        started = threading.Event()
+
+        def slow_policies() -> List[Policy]:
+            started.set()
+            threading.Event().wait(0.05)
+            return [pol]
+
+        with mock.patch.object(
+            StarmapClient, "policies", new_callable=mock.PropertyMock
+        ) as mock_policies:
+            mock_policies.side_effect = slow_policies
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                futures = [executor.submit(self.svc_v2.list_policies) for _ in range(4)]
+                res = [f.result() for f in futures]
+
+        assert started.is_set()
+        mock_policies.assert_called_once()
+        assert all(r is res[0] for r in res)
+        assert res[0] == [pol]
+
     def test_get_policy(self) -> None:
         fpath = "tests/data/policy/valid_pol1.json"
         self.mock_resp_success.json.return_value = load_json(fpath)
@@ -337,6 +793,502 @@ class TestStarmapClient(TestCase):
 
         assert res is None
 
+    def _run_concurrently(
+        self, func: Callable[..., Any], *args: Any, callers: int = 4
+    ) -> List[Any]:
+        """Call the function concurrently while the first call is blocked in the session."""
+        started = threading.Event()
+        release = threading.Event()
+        get = self.mock_session_v2.get
+        rsp = get.return_value
+
+        def blocking_get(*args: Any, **kwargs: Any) -> Any:
+            started.set()
+            assert release.wait(5)
+            return rsp
+
+        get.return_value = None
+        get.side_effect = blocking_get
+        with waiting_followers() as wait_followers, ThreadPoolExecutor(callers) as executor:
+            leader = executor.submit(func, *args)
+            assert started.wait(5)
+            followers = [executor.submit(func, *args) for _ in range(callers - 1)]
+            assert wait_followers(callers - 1)
+            release.set()
+            return [f.result() for f in [leader] + followers]
+
+    def test_query_image_by_name_coalesced(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        self.mock_resp_success.json.side_effect = lambda: load_json(fpath)
+        self.mock_session_v2.get.return_value = self.mock_resp_success
+
+        res = self._run_concurrently(self.svc_v2.query_image_by_name, "foo-bar")
+
+        self.mock_session_v2.get.assert_called_once_with("/query", params={"name": "foo-bar"})
+        assert all(r is res[0] for r in res)
+        assert res[0] == QueryResponseContainer.from_json(load_json(fpath))
+
+        # Once finished the next call reaches the server again
+        self.svc_v2.query_image_by_name("foo-bar")
+        assert self.mock_session_v2.get.call_count == 2
+
+    def test_get_policy_coalesced(self) -> None:
+        fpath = "tests/data/policy/valid_pol1.json"
+        self.mock_resp_success.json.side_effect = lambda: load_json(fpath)
+        self.mock_session_v2.get.return_value = self.mock_resp_success
+
+        res = self._run_concurrently(self.svc_v2.get_policy, "policy-id")
+
+        self.mock_session_v2.get.assert_called_once_with("/policy/policy-id")
+        assert all(r is res[0] for r in res)
+        assert res[0] == Policy.from_json(load_json(fpath))
+
+    def test_get_mapping_not_found_coalesced(self) -> None:
+        self.mock_session_v2.get.return_value = self.mock_resp_not_found
+
+        res = self._run_concurrently(self.svc_v2.get_mapping, "mapping-id")
+
+        self.mock_session_v2.get.assert_called_once_with("/mapping/mapping-id")
+        assert res == [None] * 4
+
+    def test_metrics_query(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        self.mock_resp_success.json.return_value = load_json(fpath)
+        self.mock_resp_success.content = b"x" * 10
+        self.mock_resp_success.raw.retries.history = ("retry",)
+        self.mock_session_v2.get.return_value = self.mock_resp_success
+        metrics = MetricsRecorder()
+        provider = InMemoryMapProviderV2(QueryResponseContainer([]))
+        svc = StarmapClient(
+            session=self.mock_session_v2,
+            provider=provider,
+            cache=InMemoryQueryCache(),
+            metrics=metrics,
+        )
+
+        assert svc.query_image(self.image) == svc.query_image(self.image)
+
+        self.mock_session_v2.get.assert_called_once()
+        assert metrics.requests == {("query", "GET", 200): 1}
+        assert metrics.latency["query"].count == 1
+        assert metrics.decode_time["query"].count == 1
+        assert metrics.retries == {"query": 1}
+        assert metrics.bytes_received == {"query": 10}
+        assert metrics.lookups == {
+            ("provider", False): 2,
+            ("cache", False): 1,
+            ("cache", True): 1,
+        }
+
+    def test_metrics_provider_hit(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        provider = InMemoryMapProviderV2(QueryResponseContainer.from_json(load_json(fpath)))
+        metrics = MetricsRecorder()
+        svc = StarmapClient(session=self.mock_session_v2, provider=provider, metrics=metrics)
+
+        assert svc.query_image("product-test-1.0-1.raw.xz")
+
+        self.mock_session_v2.get.assert_not_called()
+        assert metrics.lookups == {("provider", True): 1}
+        assert metrics.requests == {}
+
+    def test_metrics_get_not_modified(self) -> None:
+        fpath = "tests/data/policy/valid_pol1.json"
+        self.mock_resp_success.json.side_effect = lambda: load_json(fpath)
+        self.mock_resp_success.content = b"x" * 10
+        self.mock_resp_success.from_cache = False
+        self.mock_session_v2.get.return_value = self.mock_resp_success
+        metrics = MetricsRecorder()
+        svc = StarmapClient(session=self.mock_session_v2, metrics=metrics)
+
+        svc.get_policy("policy-id")
+        self.mock_session_v2.get.return_value = self._not_modified(self.mock_resp_success)
+        svc.get_policy("policy-id")
+
+        assert metrics.requests == {("policy/{id}", "GET", 200): 1, ("policy/{id}", "GET", 304): 1}
+        assert metrics.bytes_received == {"policy/{id}": 10}
+        assert metrics.decode_time["policy/{id}"].count == 1
+
+    def test_metrics_request_error(self) -> None:
+        self.mock_session_v2.get.side_effect = ConnectionError("Failed")
+        metrics = MetricsRecorder()
+        svc = StarmapClient(session=self.mock_session_v2, metrics=metrics)
+
+        with pytest.raises(ConnectionError):
+            svc.get_mapping("mapping-id")
+
+        assert metrics.requests == {("mapping/{id}", "GET", 0): 1}
+        assert metrics.latency["mapping/{id}"].count == 1
+        assert metrics.retries == {"mapping/{id}": 0}
+
+    def test_metrics_request_retries_exhausted(self) -> None:
+        self.mock_session_v2.retries = 2
+        self.mock_session_v2.get.side_effect = RetryError("Max retries exceeded")
+        metrics = MetricsRecorder()
+        svc = StarmapClient(session=self.mock_session_v2, metrics=metrics)
+
+        with pytest.raises(RetryError):
+            svc.get_mapping("mapping-id")
+
+        assert metrics.requests == {("mapping/{id}", "GET", 0): 1}
+        assert metrics.retries == {"mapping/{id}": 2}
+
+    def test_metrics_policies(self) -> None:
+        self.mock_resp_success.json.return_value = {"nav": {"next": None}, "items": []}
+        self.mock_session_v2.get.return_value = self.mock_resp_success
+        metrics = MetricsRecorder()
+        svc = StarmapClient(session=self.mock_session_v2, metrics=metrics)
+
+        assert svc.list_policies() == []
+
+        assert metrics.requests == {("policy", "GET", 200): 1}
+        assert metrics.decode_time["policy"].count == 1
+
+    def test_metrics_iter_query(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        self._mock_stream(fpath)
+        metrics = MetricsRecorder()
+        svc = StarmapClient(session=self.mock_session_v2, metrics=metrics)
+
+        res = list(svc.iter_query_image(self.image))
+
+        assert res == QueryResponseContainer.from_json(load_json(fpath)).responses
+        with open(fpath, "rb") as fd:
+            assert metrics.bytes_received == {"query": len(fd.read())}
+        assert metrics.requests == {("query", "GET", 200): 1}
+        assert metrics.decode_time["query"].count == 1
+        self.mock_resp_success.__exit__.assert_called_once()
+
+    def test_metrics_iter_query_stopped_early(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        self._mock_stream(fpath, chunk_size=1024 * 1024)
+        metrics = MetricsRecorder()
+        svc = StarmapClient(session=self.mock_session_v2, metrics=metrics)
+
+        res = svc.iter_query_image(self.image)
+        next(res)
+        res.close()  # type: ignore[attr-defined]
+
+        assert metrics.requests == {("query", "GET", 200): 1}
+        assert metrics.decode_time["query"].count == 1
+
+    def test_metrics_iter_query_not_found(self) -> None:
+        self.mock_resp_not_found.__enter__.return_value = self.mock_resp_not_found
+        self.mock_resp_not_found.iter_content.return_value = iter([])
+        self.mock_session_v2.get.return_value = self.mock_resp_not_found
+        metrics = MetricsRecorder()
+        svc = StarmapClient(session=self.mock_session_v2, metrics=metrics)
+
+        assert list(svc.iter_query_image(self.image)) == []
+
+        assert metrics.requests == {("query", "GET", 404): 1}
+        assert metrics.bytes_received == {"query": 0}
+        assert metrics.decode_time == {}
+
+    def test_create_policy(self) -> None:
+        data = load_json("tests/data/policy/valid_pol1.json")
+        policy = Policy.from_json(deepcopy(data))
+        self.mock_session_v2.post.return_value = make_response(201, data)
+        self.svc_v2._policies = [policy]
+
+        res = self.svc_v2.create_policy(policy)
+
+        self.mock_session_v2.post.assert_called_once_with("/policy", json=model_to_json(policy))
+        assert res == policy
+        assert self.svc_v2._policies == []
+
+    def test_update_policy(self) -> None:
+        data = load_json("tests/data/policy/valid_pol1.json")
+        policy = Policy.from_json(deepcopy(data))
+        self.mock_session_v2.put.return_value = make_response(200, data)
+
+        res = self.svc_v2.update_policy(policy)
+
+        self.mock_session_v2.put.assert_called_once_with(
+            f"/policy/{policy.id}", json=model_to_json(policy)
+        )
+        assert res == policy
+
+    def test_create_mapping(self) -> None:
+        data = load_json("tests/data/mapping/valid_map1.json")
+        mapping = Mapping.from_json(deepcopy(data))
+        self.mock_session_v2.post.return_value = make_response(201, data)
+
+        res = self.svc_v2.create_mapping("policy-id", mapping)
+
+        self.mock_session_v2.post.assert_called_once_with(
+            "/policy/policy-id/mapping", json=model_to_json(mapping)
+        )
+        assert res == mapping
+
+    def test_update_mapping(self) -> None:
+        data = load_json("tests/data/mapping/valid_map1.json")
+        mapping = Mapping.from_json(deepcopy(data))
+        self.mock_session_v2.put.return_value = make_response(200, data)
+
+        res = self.svc_v2.update_mapping(mapping)
+
+        self.mock_session_v2.put.assert_called_once_with(
+            f"/mapping/{mapping.id}", json=model_to_json(mapping)
+        )
+        assert res == mapping
+
+    def test_create_destination(self) -> None:
+        data = load_json("tests/data/destination/valid_dest1.json")
+        destination = Destination.from_json(deepcopy(data))
+        self.mock_session_v2.post.return_value = make_response(201, data)
+
+        res = self.svc_v2.create_destination("mapping-id", destination)
+
+        self.mock_session_v2.post.assert_called_once_with(
+            "/mapping/mapping-id/destination", json=model_to_json(destination)
+        )
+        assert res == destination
+
+    def test_update_destination(self) -> None:
+        data = dict(load_json("tests/data/destination/valid_dest1.json"), id="destination-id")
+        destination = Destination.from_json(deepcopy(data))
+        self.mock_session_v2.put.return_value = make_response(200, data)
+
+        res = self.svc_v2.update_destination(destination)
+
+        self.mock_session_v2.put.assert_called_once_with(
+            "/destination/destination-id", json=model_to_json(destination)
+        )
+        assert res == destination
+
+    def test_write_clears_query_cache(self) -> None:
+        fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+        cache = InMemoryQueryCache()
+        svc = StarmapClient(session=self.mock_session_v2, cache=cache)
+        self.mock_resp_success.json.side_effect = lambda: load_json(fpath)
+        self.mock_session_v2.get.return_value = self.mock_resp_success
+        data = load_json("tests/data/mapping/valid_map1.json")
+        mapping = Mapping.from_json(deepcopy(data))
+        self.mock_session_v2.put.return_value = make_response(200, data)
+
+        svc.query_image(self.image)
+        svc.query_image(self.image)
+        assert self.mock_session_v2.get.call_count == 1
+
+        svc.update_mapping(mapping)
+
+        # The responses cached before the write are requested again
+        assert len(cache) == 0
+        svc.query_image(self.image)
+        assert self.mock_session_v2.get.call_count == 2
+
+    def test_write_error(self) -> None:
+        policy = Policy.from_json(load_json("tests/data/policy/valid_pol1.json"))
+        self.mock_session_v2.post.return_value = make_response(400, {"error": "Invalid"})
+        self.svc_v2._policies = [policy]
+
+        with pytest.raises(HTTPError, match="Error 400"):
+            self.svc_v2.create_policy(policy)
+
+        # The listed policies are kept when nothing was written
+        assert self.svc_v2._policies == [policy]
+
+    def test_bulk_write(self) -> None:
+        data = load_json("tests/data/destination/valid_dest1.json")
+        destinations = [
+            Destination.from_json(dict(deepcopy(data), id=f"d{i}", destination=f"destination-{i}"))
+            for i in range(8)
+        ]
+        refused = NewConnectionError(None, "Connection refused")  # type: ignore[arg-type]
+        # Even operations create the destinations while the odd ones update them
+        operations = [
+            WriteOperation(d, update=bool(i % 2), parent_id=f"mapping-{i}")
+            for i, d in enumerate(destinations)
+        ]
+        created = [make_response(201, model_to_json(d)) for d in destinations]
+        responses: Dict[str, List[Any]] = {
+            "/mapping/mapping-0/destination": [created[0]],
+            # Updates are retried until they succeed
+            "/destination/d1": [make_response(503), make_response(429), created[1]],
+            # Client errors are never retried
+            "/mapping/mapping-2/destination": [make_response(400)],
+            # Retried until the attempts are exhausted
+            "/destination/d3": [ConnectionError("Failed")] * 3,
+            # Invalid response JSON
+            "/mapping/mapping-4/destination": [make_response(201, {"invalid": True})],
+            "/destination/d5": [ReadTimeout("Read timed out"), created[5]],
+            # Creations are only retried when the connection couldn't be established
+            "/mapping/mapping-6/destination": [
+                ConnectTimeout("Connect timed out"),
+                ConnectionError(MaxRetryError(None, "/", refused)),  # type: ignore[arg-type]
+                created[6],
+            ],
+            "/destination/d7": [created[7]],
+        }
+        lock = threading.Lock()
+
+        def send(path: str, json: Dict[str, Any]) -> Any:
+            with lock:
+                rsp = responses[path].pop(0)
+            if isinstance(rsp, Exception):
+                raise rsp
+            return rsp
+
+        self.mock_session_v2.post.side_effect = send
+        self.mock_session_v2.put.side_effect = send
+
+        with self._caplog.at_level(logging.WARNING):
+            res = self.svc_v2.bulk_write(iter(operations), max_workers=3)
+
+        assert [r.operation for r in res] == operations
+        assert [(r.ok, r.attempts) for r in res] == [
+            (True, 1),
+            (True, 3),
+            (False, 1),
+            (False, 3),
+            (False, 1),
+            (True, 2),
+            (True, 3),
+            (True, 1),
+        ]
+        assert res[0].result == destinations[0]
+        assert res[1].result == destinations[1]
+        assert res[1].error is None
+        assert isinstance(res[2].error, HTTPError)
+        assert isinstance(res[3].error, ConnectionError)
+        assert res[2].result is None and res[3].result is None
+        assert all(not v for v in responses.values())
+        assert "Retrying 4 failed writes in 2.0 seconds (attempt 1)" in self._caplog.text
+        assert "Retrying 3 failed writes in 4.0 seconds (attempt 2)" in self._caplog.text
+        assert "attempt 3" not in self._caplog.text
+        assert "Failed to write 3 of 8 objects" in self._caplog.text
+        assert self.mock_sleep.call_args_list == [mock.call(2.0), mock.call(4.0)]
+
+    def test_bulk_write_create_not_retried(self) -> None:
+        policy = Policy.from_json(load_json("tests/data/policy/valid_pol1.json"))
+        self.mock_session_v2.post.side_effect = [
+            make_response(500),
+            make_response(429),
+            ReadTimeout("Read timed out"),
+            ConnectionError("Connection aborted"),
+        ]
+
+        res = self.svc_v2.bulk_write([WriteOperation(policy)] * 4, max_workers=1)
+
+        # The server may have created the objects before failing
+        assert [(r.ok, r.attempts) for r in res] == [(False, 1)] * 4
+        assert self.mock_session_v2.post.call_count == 4
+        self.mock_sleep.assert_not_called()
+
+    def test_bulk_write_retry_error_not_retried(self) -> None:
+        policy = Policy.from_json(load_json("tests/data/policy/valid_pol1.json"))
+        self.mock_session_v2.retries = 3
+        self.mock_session_v2.put.side_effect = RetryError("Max retries exceeded")
+
+        res = self.svc_v2.bulk_write([WriteOperation(policy, update=True)])
+
+        # The session already retried the status codes before giving up
+        assert not res[0].ok and res[0].attempts == 1
+        assert isinstance(res[0].error, RetryError)
+        self.mock_sleep.assert_not_called()
+
+    def test_bulk_write_session_connect_retries_not_retried(self) -> None:
+        policy = Policy.from_json(load_json("tests/data/policy/valid_pol1.json"))
+        refused = NewConnectionError(None, "Connection refused")  # type: ignore[arg-type]
+        self.mock_session_v2.retries = 3
+        self.mock_session_v2.post.side_effect = [
+            ConnectionError(MaxRetryError(None, "/", refused)),  # type: ignore[arg-type]
+            ConnectTimeout(MaxRetryError(None, "/", refused)),  # type: ignore[arg-type]
+        ]
+        self.mock_session_v2.put.side_effect = [
+            ConnectionError(MaxRetryError(None, "/", ReadTimeout())),  # type: ignore[arg-type]
+            make_response(429),
+            make_response(200, load_json("tests/data/policy/valid_pol1.json")),
+        ]
+        operations = [
+            WriteOperation(policy),
+            WriteOperation(policy),
+            WriteOperation(policy, update=True),
+            WriteOperation(policy, update=True),
+        ]
+
+        res = self.svc_v2.bulk_write(operations, max_workers=1)
+
+        # The session already retried the connection before giving up
+        assert [(r.ok, r.attempts) for r in res] == [(False, 1), (False, 1), (False, 1), (True, 2)]
+        assert self.mock_session_v2.post.call_count == 2
+        assert self.mock_session_v2.put.call_count == 3
+
+    def test_bulk_write_retry_after(self) -> None:
+        data = load_json("tests/data/policy/valid_pol1.json")
+        policy = Policy.from_json(deepcopy(data))
+        self.mock_session_v2.backoff_factor = 0.5
+        self.mock_session_v2.put.side_effect = [
+            make_response(429, headers={"Retry-After": "10"}),
+            make_response(503, headers={"Retry-After": "Invalid"}),
+            make_response(500, headers={"Retry-After": "30"}),
+            make_response(503, headers={"Retry-After": "1000"}),
+            make_response(200, data),
+        ]
+
+        res = self.svc_v2.bulk_write([WriteOperation(policy, update=True)], retries=4)
+
+        assert res[0].ok and res[0].attempts == 5
+        # The Retry-After is only honoured for 429 and 503, up to WRITE_BACKOFF_MAX
+        assert self.mock_sleep.call_args_list == [
+            mock.call(10.0),
+            mock.call(1.0),
+            mock.call(2.0),
+            mock.call(self.svc_v2.WRITE_BACKOFF_MAX),
+        ]
+
+    def test_bulk_write_success(self) -> None:
+        data = load_json("tests/data/policy/valid_pol1.json")
+        policy = Policy.from_json(deepcopy(data))
+        self.mock_session_v2.post.return_value = make_response(201, data)
+
+        res = self.svc_v2.bulk_write([WriteOperation(policy)] * 3)
+
+        assert [(r.ok, r.result, r.attempts) for r in res] == [(True, policy, 1)] * 3
+        assert self.mock_session_v2.post.call_count == 3
+
+    def test_bulk_write_no_retries(self) -> None:
+        policy = Policy.from_json(load_json("tests/data/policy/valid_pol1.json"))
+        self.mock_session_v2.put.side_effect = [make_response(500)]
+
+        res = self.svc_v2.bulk_write([WriteOperation(policy, update=True)], retries=0)
+
+        assert res == [WriteResult(WriteOperation(policy, update=True), None, res[0].error, 1)]
+        assert isinstance(res[0].error, HTTPError)
+        assert self.svc_v2.bulk_write([]) == []
+
+    def test_bulk_write_serializes_once(self) -> None:
+        policy = Policy.from_json(load_json("tests/data/policy/valid_pol1.json"))
+        self.mock_session_v2.put.side_effect = [make_response(502), make_response(502)]
+
+        with mock.patch("starmap_client.client.model_to_json", wraps=model_to_json) as mock_json:
+            res = self.svc_v2.bulk_write([WriteOperation(policy, update=True)], retries=1)
+
+        assert res[0].attempts == 2
+        mock_json.assert_called_once_with(policy)
+
+    def test_metrics_write(self) -> None:
+        data = load_json("tests/data/mapping/valid_map1.json")
+        mapping = Mapping.from_json(deepcopy(data))
+        rsp = make_response(201, data)
+        rsp.content = b"x" * 10
+        rsp.from_cache = None
+        self.mock_session_v2.post.return_value = rsp
+        self.mock_session_v2.put.side_effect = ConnectionError("Failed")
+        metrics = MetricsRecorder()
+        svc = StarmapClient(session=self.mock_session_v2, metrics=metrics)
+
+        svc.create_mapping("policy-id", mapping)
+        with pytest.raises(ConnectionError):
+            svc.update_mapping(mapping)
+
+        assert metrics.requests == {
+            ("policy/{id}/mapping", "POST", 201): 1,
+            ("mapping/{id}", "PUT", 0): 1,
+        }
+        assert metrics.decode_time["policy/{id}/mapping"].count == 1
+
     def test_client_requires_url_or_session(self) -> None:
         error = "Cannot initialize the client without defining either an \"url\" or \"session\"."
         with pytest.raises(ValueError, match=error):
@@ -368,3 +1320,98 @@ def test_offline_client() -> None:
     assert svc.list_policies() == []
     assert svc.list_mappings("test") == []
     assert svc.list_destinations("test") == []
+
+
+def test_iter_query_image_conditional_requests() -> None:
+    """Ensure the streamed queries aren't loaded nor stored by the conditional requests."""
+    fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+    data = load_json(fpath)
+    session = StarmapMockSession("fake.starmap.url", "v2")
+    session.conditional_requests = True
+    session.adapter.register_uri(
+        "GET",
+        "mock://fake.starmap.url/api/v2/query",
+        content=json.dumps(data).encode(),
+        headers={"ETag": '"abc"'},
+    )
+    svc = StarmapClient(session=session)
+
+    for _ in range(2):
+        res = list(svc.iter_query_image("product-test-1.0-1.raw.xz"))
+        assert res == QueryResponseContainer.from_json(load_json(fpath)).responses
+
+    assert session._validated == {}
+    last_request = session.adapter.last_request
+    assert last_request is not None
+    assert "If-None-Match" not in last_request.headers
+
+
+@mock.patch("starmap_client.client.sleep")
+def test_bulk_write_custom_session(mock_sleep: mock.MagicMock) -> None:
+    """Ensure the sessions without retries nor backoff factor use the client defaults."""
+    data = load_json("tests/data/policy/valid_pol1.json")
+    refused = NewConnectionError(None, "Connection refused")  # type: ignore[arg-type]
+    responses = [
+        ConnectionError(MaxRetryError(None, "/", refused)),  # type: ignore[arg-type]
+        make_response(200, data),
+    ]
+
+    class Session(StarmapBaseSession):
+        def get(self, path: str, **kwargs: Any) -> Any:
+            raise NotImplementedError()
+
+        def post(self, path: str, json: Dict[str, Any], **kwargs: Any) -> Any:
+            raise NotImplementedError()
+
+        def put(self, path: str, json: Dict[str, Any], **kwargs: Any) -> Any:
+            rsp = responses.pop(0)
+            if isinstance(rsp, Exception):
+                raise rsp
+            return rsp
+
+    svc = StarmapClient(session=Session())
+    policy = Policy.from_json(deepcopy(data))
+
+    res = svc.bulk_write([WriteOperation(policy, update=True)])
+
+    assert res[0].ok and res[0].attempts == 2
+    mock_sleep.assert_called_once_with(svc.WRITE_BACKOFF_FACTOR)
+
+
+def test_model_to_json() -> None:
+    data = load_json("tests/data/policy/valid_pol1.json")
+    policy = Policy.from_json(deepcopy(data))
+
+    res = model_to_json(policy)
+
+    assert "id" not in res["mappings"][0]["destinations"][0]
+    assert "version_regexmatch" not in res["mappings"][0]
+    assert json.loads(json.dumps(res))["workflow"] == "stratosphere"
+    assert Policy.from_json(res) == policy
+
+
+@pytest.mark.parametrize(
+    "update,parent_id,expected",
+    [
+        (False, None, ("post", "/policy", "policy")),
+        (True, None, ("put", "/policy/policy-id", "policy/{id}")),
+        (True, "ignored", ("put", "/policy/policy-id", "policy/{id}")),
+    ],
+)
+def test_write_operation_request(update: bool, parent_id: Optional[str], expected: Any) -> None:
+    data = dict(load_json("tests/data/policy/valid_pol1.json"), id="policy-id")
+    operation = WriteOperation(Policy.from_json(data), update=update, parent_id=parent_id)
+
+    assert operation.request() == expected
+
+
+def test_write_operation_invalid() -> None:
+    mapping = Mapping.from_json(load_json("tests/data/mapping/valid_map1.json"))
+    destination = Destination.from_json(load_json("tests/data/destination/valid_dest1.json"))
+
+    with pytest.raises(ValueError, match="Cannot update a destination without ID"):
+        WriteOperation(destination, update=True)
+    with pytest.raises(ValueError, match="The policy ID is required to create a mapping"):
+        WriteOperation(mapping)
+    with pytest.raises(ValueError, match="The mapping ID is required to create a destination"):
+        WriteOperation(destination)
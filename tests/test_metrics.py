@@ -0,0 +1,98 @@
+from unittest import mock
+
+import pytest
+
+from starmap_client.metrics import Histogram, MetricsRecorder, response_retries
+
+
+def test_histogram() -> None:
+    h = Histogram([0.1, 1.0])
+
+    for value in [0.05, 0.1, 0.5, 2.0]:
+        h.observe(value)
+
+    assert h.counts == [2, 1, 1]
+    assert h.count == 4
+    assert h.sum == pytest.approx(2.65)
+    assert h.cumulative() == [(0.1, 2), (1.0, 3), (float("inf"), 4)]
+
+
+@pytest.mark.parametrize(
+    "raw,expected",
+    [
+        (None, 0),
+        (mock.MagicMock(), 0),
+        (mock.MagicMock(retries=None), 0),
+        (mock.MagicMock(retries=mock.MagicMock(history=())), 0),
+        (mock.MagicMock(retries=mock.MagicMock(history=("first", "second"))), 2),
+    ],
+)
+def test_response_retries(raw: mock.MagicMock, expected: int) -> None:
+    rsp = mock.MagicMock(raw=raw)
+
+    assert response_retries(rsp) == expected
+
+
+def test_metrics_recorder() -> None:
+    recorder = MetricsRecorder(buckets=[0.1, 1.0])
+
+    recorder.request("query", "GET", 200, 0.05, 100, 0)
+    recorder.request("query", "GET", 200, 0.5, 50, 2)
+    recorder.request("policy/{id}", "GET", 404, 0.01, 10, 0)
+    recorder.decode("query", 0.02)
+    recorder.lookup("provider", False)
+    recorder.lookup("provider", False)
+    recorder.lookup("cache", True)
+
+    assert recorder.latency["query"].cumulative() == [(0.1, 1), (1.0, 2), (float("inf"), 2)]
+    assert recorder.latency["policy/{id}"].count == 1
+    assert recorder.decode_time["query"].count == 1
+    assert recorder.requests == {("query", "GET", 200): 2, ("policy/{id}", "GET", 404): 1}
+    assert recorder.retries == {"query": 2, "policy/{id}": 0}
+    assert recorder.bytes_received == {"query": 150, "policy/{id}": 10}
+    assert recorder.lookups == {("provider", False): 2, ("cache", True): 1}
+
+
+def test_metrics_recorder_to_prometheus() -> None:
+    recorder = MetricsRecorder(buckets=[0.5])
+    recorder.request("query", "GET", 200, 0.25, 100, 1)
+    recorder.decode("query", 0.75)
+    recorder.lookup("cache", True)
+    recorder.lookup("cache", False)
+
+    res = recorder.to_prometheus(prefix="test")
+
+    assert res == (
+        "# HELP test_request_duration_seconds Time to receive the responses.\n"
+        "# TYPE test_request_duration_seconds histogram\n"
+        'test_request_duration_seconds_bucket{endpoint="query",le="0.5"} 1\n'
+        'test_request_duration_seconds_bucket{endpoint="query",le="+Inf"} 1\n'
+        'test_request_duration_seconds_sum{endpoint="query"} 0.25\n'
+        'test_request_duration_seconds_count{endpoint="query"} 1\n'
+        "# HELP test_decode_duration_seconds Time to convert the responses.\n"
+        "# TYPE test_decode_duration_seconds histogram\n"
+        'test_decode_duration_seconds_bucket{endpoint="query",le="0.5"} 0\n'
+        'test_decode_duration_seconds_bucket{endpoint="query",le="+Inf"} 1\n'
+        'test_decode_duration_seconds_sum{endpoint="query"} 0.75\n'
+        'test_decode_duration_seconds_count{endpoint="query"} 1\n'
+        "# HELP test_requests_total Requests sent to the server.\n"
+        "# TYPE test_requests_total counter\n"
+        'test_requests_total{endpoint="query",method="GET",status="200"} 1\n'
+        "# HELP test_retries_total Retries performed by the requests.\n"
+        "# TYPE test_retries_total counter\n"
+        'test_retries_total{endpoint="query"} 1\n'
+        "# HELP test_received_bytes_total Size of the received responses bodies.\n"
+        "# TYPE test_received_bytes_total counter\n"
+        'test_received_bytes_total{endpoint="query"} 100\n'
+        "# HELP test_lookups_total Lookups on the local provider and cache.\n"
+        "# TYPE test_lookups_total counter\n"
+        'test_lookups_total{source="cache",result="miss"} 1\n'
+        'test_lookups_total{source="cache",result="hit"} 1\n'
+    )
+
+
+def test_metrics_recorder_empty_to_prometheus() -> None:
+    res = MetricsRecorder().to_prometheus()
+
+    assert res.count("# TYPE starmap_client_") == 6
+    assert all(line.startswith("#") for line in res.splitlines())
@@ -1,9 +1,11 @@
 import json
+import pickle
 from copy import deepcopy
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional
+from unittest import mock
 
 import pytest
-from attrs import asdict
+from attrs import asdict, evolve
 from attrs.exceptions import FrozenInstanceError
 
 from starmap_client.models import (
@@ -14,7 +16,11 @@ from starmap_client.models import (
     QueryResponseContainer,
     QueryResponseEntity,
     Workflow,
+    _interner,
+    _LazyDict,
+    _Raw,
 )
+from starmap_client.utils import dict_merge
 
 
 def load_json(json_file: str) -> Any:
@@ -142,6 +148,38 @@ class TestMapping:
         with pytest.raises(FrozenInstanceError):
             m.marketplace_account = "test"  # type: ignore[misc]
 
+    @pytest.mark.parametrize(
+        "patterns,version,expected",
+        [
+            ({}, "1.0", True),
+            ({"version_fnmatch": "1.*"}, "1.0", True),
+            ({"version_fnmatch": "1.*"}, "11.0", False),
+            ({"version_fnmatch": "1.?"}, "1.10", False),
+            ({"version_fnmatch": "*-rc[0-9]"}, "2.0-rc1", True),
+            ({"version_regexmatch": r"1\.[0-9]+"}, "1.10", True),
+            ({"version_regexmatch": r"1\.[0-9]+"}, "1.x", False),
+            ({"version_regexmatch": r"[0-9]+\.0"}, "10.0.1", True),
+            ({"version_regexmatch": r"0"}, "10.0", False),
+        ],
+    )
+    def test_matches_version(self, patterns: Dict[str, str], version: str, expected: bool) -> None:
+        data = load_json("tests/data/mapping/valid_map1.json")
+        data.pop("version_fnmatch", None)
+        data.update(patterns)
+
+        m = Mapping.from_json(data)
+
+        assert m.matches_version(version) is expected
+
+    def test_matches_version_both_patterns(self) -> None:
+        data = load_json("tests/data/mapping/valid_map1.json")
+        data.update({"version_fnmatch": "1.*", "version_regexmatch": "1.*"})
+
+        m = Mapping.from_json(data)
+
+        with pytest.raises(ValueError, match="can't be set together"):
+            m.matches_version("1.0")
+
 
 class TestPolicy:
     @pytest.mark.parametrize(
@@ -191,6 +229,14 @@ class TestPolicy:
             p.name = "test"  # type: ignore[misc]
 
 
+def test_policy_mappings_for_version() -> None:
+    p = Policy.from_json(load_json("tests/data/policy/valid_pol5.json"))
+
+    assert p.mappings_for_version("1.2") == [p.mappings[0]]
+    assert p.mappings_for_version("2.0") == [p.mappings[1]]
+    assert p.mappings_for_version("3.0") == []
+
+
 class TestV2MappingResponseObject:
     @pytest.mark.parametrize(
         "json_file,meta,provider",
@@ -368,3 +414,507 @@ class TestV2QueryResponseContainer:
         )
 
         assert qc.filter_by(cloud="test", workflow=Workflow.stratosphere)[0] == expected
+
+    def test_filter_by_index_updated_on_append(self) -> None:
+        data = load_json("tests/data/query_v2/query_response_container/valid_qrc1.json")
+        qc = QueryResponseContainer.from_json(data)
+        stt = qc.filter_by(name="product-test", workflow=Workflow.stratosphere)[0]
+
+        new = QueryResponseEntity.from_json(
+            load_json("tests/data/query_v2/query_response_entity/valid_qre2.json")
+        )
+        qc.responses.append(new)
+
+        assert qc.filter_by(name=new.name, cloud=new.cloud, workflow=new.workflow) == [new]
+        assert qc.filter_by(workflow=Workflow.stratosphere) == qc.filter_by_workflow(
+            Workflow.stratosphere
+        )
+
+        # Removing responses triggers a full rebuild of the index
+        qc.responses.remove(stt)
+        assert stt not in qc.filter_by(workflow=Workflow.stratosphere)
+
+    def test_filter_by_index_updated_on_remove_and_append(self) -> None:
+        data = load_json("tests/data/query_v2/query_response_container/valid_qrc1.json")
+        qc = QueryResponseContainer.from_json(data)
+        old = qc.responses[-1]
+        assert qc.filter_by(name=old.name) == [old]
+
+        new = evolve(old, name="other")
+        qc.remove(old)
+        qc.append(new)
+
+        assert qc.responses[-1] is new
+        assert qc.filter_by(name=old.name) == []
+        assert qc.filter_by(name="other") == [new]
+
+        # The same change done directly on the list replaces the last indexed response
+        qc.responses.remove(new)
+        qc.responses.append(old)
+        assert qc.filter_by(name="other") == []
+        assert qc.filter_by(name=old.name) == [old]
+
+    def test_filter_by_index_returns_copy(self) -> None:
+        data = load_json("tests/data/query_v2/query_response_container/valid_qrc1.json")
+        qc = QueryResponseContainer.from_json(data)
+
+        res = qc.filter_by(name="product-test")
+        res.clear()
+        assert qc.filter_by(name="product-test")
+
+    def test_filtered_container_copy_pickle_and_asdict(self) -> None:
+        data = load_json("tests/data/query_v2/query_response_container/valid_qrc1.json")
+        qc = QueryResponseContainer.from_json(data)
+        stt = qc.filter_by(name="product-test")
+
+        for copied in [deepcopy(qc), pickle.loads(pickle.dumps(qc))]:
+            assert copied == qc
+            assert copied.filter_by(name="product-test") == stt
+            # Each copy has its own index
+            copied.remove(copied.responses[0])
+            assert qc.filter_by(name="product-test") == stt
+
+        d = asdict(qc)
+        assert list(d) == ["responses"]
+        json.dumps(d)
+
+    def test_filter_by_no_filters_and_unknown(self) -> None:
+        data = load_json("tests/data/query_v2/query_response_container/valid_qrc1.json")
+        qc = QueryResponseContainer.from_json(data)
+
+        assert qc.filter_by() == qc.responses
+        with pytest.raises(KeyError):
+            qc.filter_by(foo="bar")
+
+
+class TestTrustedDecode:
+    @pytest.mark.parametrize(
+        "model,json_file",
+        [
+            (Destination, "tests/data/destination/valid_dest1.json"),
+            (Destination, "tests/data/destination/valid_dest6.json"),
+            (Mapping, "tests/data/mapping/valid_map1.json"),
+            (Policy, "tests/data/policy/valid_pol1.json"),
+            (QueryResponseEntity, "tests/data/query_v2/query_response_entity/valid_qre1.json"),
+            (QueryResponseEntity, "tests/data/query_v2/query_response_entity/valid_qre4.json"),
+            (
+                QueryResponseContainer,
+                "tests/data/query_v2/query_response_container/valid_qrc1.json",
+            ),
+        ],
+    )
+    def test_trusted_equals_untrusted(self, model: Any, json_file: str) -> None:
+        expected = model.from_json(load_json(json_file))
+
+        res = model.from_json(load_json(json_file), trusted=True)
+
+        assert res == expected
+        assert type(res) is type(expected)
+
+    def test_trusted_skips_validation(self) -> None:
+        data = load_json("tests/data/destination/invalid_dest1.json")
+        data.pop("error")
+
+        with pytest.raises(TypeError):
+            Destination.from_json(deepcopy(data))
+
+        d = Destination.from_json(data, trusted=True)
+
+        assert asdict(d)["destination"] is None
+
+    def test_trusted_applies_to_nested_objects_only_during_call(self) -> None:
+        data = load_json("tests/data/mapping/valid_map1.json")
+        data["destinations"][0]["overwrite"] = "not-a-bool"
+
+        m = Mapping.from_json(deepcopy(data), trusted=True)
+
+        assert asdict(m.destinations[0])["overwrite"] == "not-a-bool"
+        with pytest.raises(TypeError):
+            Mapping.from_json(data)
+
+    def test_trusted_still_requires_dict(self) -> None:
+        with pytest.raises(ValueError, match="Got an unsupported JSON type"):
+            Destination.from_json([], trusted=True)
+
+
+class TestInternDecode:
+    def make_qre(self, name: str) -> Dict[str, Any]:
+        destination = {
+            "architecture": "x86_64",
+            "destination": "destination",
+            "overwrite": False,
+            "restrict_version": False,
+            "provider": "AWS",
+            "tags": {"key": "value"},
+        }
+        return {
+            "name": name,
+            "cloud": "aws",
+            "workflow": "stratosphere",
+            "meta": {"release": {"type": "GA"}},
+            "mappings": {
+                account: {"destinations": [deepcopy(destination)], "provider": None}
+                for account in ["aws-na", "aws-emea"]
+            },
+        }
+
+    @pytest.mark.parametrize("trusted", [False, True])
+    def test_intern_container(self, trusted: bool) -> None:
+        data = [self.make_qre("product-1"), self.make_qre("product-2")]
+        expected = QueryResponseContainer.from_json(deepcopy(data))
+
+        qrc = QueryResponseContainer.from_json(data, trusted=trusted, intern=True)
+
+        assert qrc == expected
+        destinations = [m.destinations[0] for r in qrc.responses for m in r.all_mappings]
+        assert len(destinations) == 4
+        for d in destinations[1:]:
+            assert d.meta is destinations[0].meta
+            assert d.tags is destinations[0].tags
+            assert d.destination is destinations[0].destination
+            assert d.architecture is destinations[0].architecture
+            assert d.provider is destinations[0].provider
+        assert qrc.responses[0].meta is qrc.responses[1].meta
+
+    def test_not_interned_by_default(self) -> None:
+        qre = QueryResponseEntity.from_json(self.make_qre("product"))
+
+        na, emea = qre.all_mappings
+        assert na.destinations[0].tags == emea.destinations[0].tags
+        assert na.destinations[0].tags is not emea.destinations[0].tags
+        # Each object has its own inherited meta
+        assert na.meta is not None and na.destinations[0].meta is not None
+        na.meta["x"] = 1
+        na.destinations[0].meta["y"] = 2
+        assert emea.meta == emea.destinations[0].meta == qre.meta == {"release": {"type": "GA"}}
+
+    def test_intern_merges_once_per_parent(self) -> None:
+        data = self.make_qre("product")
+        for m in data["mappings"].values():
+            m["meta"] = {"release": {"arch": "x86_64"}}
+            for n in range(3):
+                m["destinations"].append(dict(m["destinations"][0], meta={"n": n % 2}))
+
+        with mock.patch("starmap_client.models.dict_merge", wraps=dict_merge) as merge:
+            qre = QueryResponseEntity.from_json(data, intern=True)
+
+        # One merge for the mappings meta and one for each distinct destination meta
+        assert merge.call_count == 3
+        na, emea = qre.all_mappings
+        assert [d.meta for d in na.destinations[1:]] == [
+            {"release": {"type": "GA", "arch": "x86_64"}, "n": n % 2} for n in range(3)
+        ]
+        assert na.destinations[1].meta is emea.destinations[3].meta
+
+    def test_intern_scoped_to_call(self) -> None:
+        qre1 = QueryResponseEntity.from_json(self.make_qre("product"), intern=True)
+        qre2 = QueryResponseEntity.from_json(self.make_qre("product"), intern=True)
+
+        na, emea = qre1.all_mappings
+        assert na.destinations[0].tags is emea.destinations[0].tags
+        assert qre1.meta is not qre2.meta
+
+    def test_intern_keeps_types_and_order(self) -> None:
+        data = [
+            {"meta": {"a": 1, "b": 2}, "destination": "d", "overwrite": False},
+            {"meta": {"a": True, "b": 2}, "destination": "d", "overwrite": False},
+            {"meta": {"b": 2, "a": 1}, "destination": "d", "overwrite": False},
+            {"meta": {"a": 1.0, "b": 2}, "destination": "d", "overwrite": False},
+        ]
+        for d in data:
+            d["restrict_version"] = False
+        mapping = {"marketplace_account": "test", "destinations": data}
+
+        destinations = Mapping.from_json(mapping, intern=True).destinations
+
+        metas = [d.meta for d in destinations]
+        assert [list(m.items()) for m in metas if m] == [
+            [("a", 1), ("b", 2)],
+            [("a", True), ("b", 2)],
+            [("b", 2), ("a", 1)],
+            [("a", 1.0), ("b", 2)],
+        ]
+        assert len({id(m) for m in metas}) == 4
+
+    def test_intern_merged_meta_shared(self) -> None:
+        data = self.make_qre("product")
+        for m in data["mappings"].values():
+            m["meta"] = {"release": {"arch": "x86_64"}}
+            m["destinations"].append(dict(m["destinations"][0], destination="other"))
+
+        qre = QueryResponseEntity.from_json(data, intern=True)
+
+        destinations = [d for m in qre.all_mappings for d in m.destinations]
+        assert len(destinations) == 4
+        assert destinations[0].meta == {"release": {"type": "GA", "arch": "x86_64"}}
+        assert all(d.meta is destinations[0].meta for d in destinations)
+        assert qre.all_mappings[0].meta is qre.all_mappings[1].meta
+
+    def test_intern_inherited_meta_shared(self) -> None:
+        qre = QueryResponseEntity.from_json(self.make_qre("product"), intern=True)
+
+        destinations = [d for m in qre.all_mappings for d in m.destinations]
+        assert qre.meta == {"release": {"type": "GA"}}
+        assert all(m.meta is qre.meta for m in qre.all_mappings)
+        assert all(d.meta is qre.meta for d in destinations)
+
+    def test_intern_inherited_meta_invalid(self) -> None:
+        data = self.make_qre("product")
+        data["meta"] = ["invalid"]
+
+        with pytest.raises(ValueError, match="Expected dictionary"):
+            QueryResponseEntity.from_json(data, intern=True)
+
+    def test_intern_merge_non_json_meta(self) -> None:
+        value = object()
+        mapping = {
+            "meta": {"foo": "bar"},
+            "destinations": [
+                {"destination": d, "overwrite": False, "restrict_version": False, "meta": meta}
+                for d, meta in [("d1", {"value": value}), ("d2", {"value": value})]
+            ],
+            "provider": None,
+        }
+
+        mro = MappingResponseObject.from_json(mapping, intern=True)
+
+        assert [d.meta for d in mro.destinations] == [{"foo": "bar", "value": value}] * 2
+        assert mro.destinations[0].meta is not mro.destinations[1].meta
+
+    def test_intern_non_json_values(self) -> None:
+        value = object()
+        data = {"destination": "d", "overwrite": False, "restrict_version": False}
+        meta = {"value": value}
+
+        d1 = Destination.from_json(dict(data, meta=meta), intern=True)
+
+        assert d1.meta is meta
+
+
+class TestLazyDecode:
+    QRE4 = "tests/data/query_v2/query_response_entity/valid_qre4.json"
+
+    @staticmethod
+    def raw_keys(d: Dict[str, Any]) -> List[str]:
+        return [k for k, v in dict.items(d) if isinstance(v, _Raw)]
+
+    def test_lazy_equals_eager(self) -> None:
+        expected = QueryResponseEntity.from_json(load_json(self.QRE4))
+
+        q = QueryResponseEntity.from_json(load_json(self.QRE4), lazy=True)
+
+        assert isinstance(q.mappings, _LazyDict)
+        assert isinstance(q.billing_code_config, _LazyDict)
+        assert q == expected
+        assert asdict(q) == asdict(expected)
+        assert self.raw_keys(q.mappings) == []
+
+    def test_lazy_converts_on_first_access(self) -> None:
+        q = QueryResponseEntity.from_json(load_json(self.QRE4), lazy=True)
+
+        assert q.account_names == ["test-storage", "another-storage"]
+        assert self.raw_keys(q.mappings) == ["test-storage", "another-storage"]
+        assert len(q.billing_code_config or {}) == 3
+
+        mapping = q.get_mapping_for_account("another-storage")
+
+        assert isinstance(mapping, MappingResponseObject)
+        assert q.mappings["another-storage"] is mapping
+        assert self.raw_keys(q.mappings) == ["test-storage"]
+        with pytest.raises(KeyError):
+            q.get_mapping_for_account("foo-bar")
+
+    def test_lazy_container(self) -> None:
+        data = load_json("tests/data/query_v2/query_response_container/valid_qrc1.json")
+        expected = QueryResponseContainer.from_json(deepcopy(data))
+
+        qrc = QueryResponseContainer.from_json(data, lazy=True)
+
+        assert all(isinstance(r.mappings, _LazyDict) for r in qrc.responses)
+        assert qrc == expected
+
+    def test_lazy_invalid_mapping_raises_on_access(self) -> None:
+        data = load_json(self.QRE4)
+        data["mappings"]["test-storage"]["destinations"] = "invalid"
+
+        q = QueryResponseEntity.from_json(data, lazy=True)
+
+        assert q.get_mapping_for_account("another-storage")
+        with pytest.raises(ValueError, match="Expected destinations to be a list"):
+            q.mappings["test-storage"]
+
+    def test_lazy_still_requires_dict_values(self) -> None:
+        data = load_json(self.QRE4)
+        data["billing-code-config"]["test-access"] = []
+
+        with pytest.raises(ValueError, match="Expected dictionary"):
+            QueryResponseEntity.from_json(data, lazy=True)
+
+    @pytest.mark.parametrize("trusted", [False, True])
+    @pytest.mark.parametrize("intern", [False, True])
+    def test_lazy_keeps_decode_options(self, trusted: bool, intern: bool) -> None:
+        data = load_json(self.QRE4)
+        for d in data["mappings"]["test-storage"]["destinations"]:
+            d["overwrite"] = "not-a-bool"
+
+        q = QueryResponseEntity.from_json(data, trusted=trusted, intern=intern, lazy=True)
+
+        if not trusted:
+            with pytest.raises(TypeError):
+                q.mappings["test-storage"]
+            return
+        destinations = q.mappings["test-storage"].destinations
+        assert asdict(destinations[0])["overwrite"] == "not-a-bool"
+        assert (destinations[0].meta is destinations[1].meta) is intern
+
+    @pytest.mark.parametrize("lazy", [False, True])
+    def test_lazy_intern_shares_meta_across_responses(self, lazy: bool) -> None:
+        qre = load_json(self.QRE4)
+        qrc = QueryResponseContainer.from_json([qre, deepcopy(qre)], intern=True, lazy=lazy)
+
+        first, second = [r.mappings["test-storage"] for r in qrc.responses]
+
+        assert first.meta is second.meta
+        assert first.destinations[0].meta is second.destinations[0].meta
+        assert first.destinations[0].destination is second.destinations[0].destination
+        assert _interner.get() is None
+
+    def test_lazy_dict_behaves_as_dict(self) -> None:
+        def new() -> _LazyDict[Dict[str, int]]:
+            return _LazyDict({"a": 1, "b": 2}, lambda v: {"value": v})
+
+        expected = {"a": {"value": 1}, "b": {"value": 2}}
+
+        assert list(new()) == ["a", "b"]
+        assert dict(new()) == expected
+        assert {**new()} == expected
+        assert json.loads(json.dumps(new())) == expected
+        assert new().copy() == expected and type(new().copy()) is dict
+        assert type(deepcopy(new())) is dict
+        assert pickle.loads(pickle.dumps(new())) == expected
+        assert new() == new() and expected == new() and not new() != expected
+        assert repr(new()) == repr(expected)
+        assert new() | {"c": 3} == expected | {"c": 3}
+        assert {"c": 3} | new() == {"c": 3} | expected
+        assert list(new().values()) == list(expected.values())
+        assert new().get("a") == {"value": 1} and new().get("c", 0) == 0
+        assert new().setdefault("a", {}) == {"value": 1}
+
+        d = new()
+        assert d.setdefault("c", {"value": 3}) == {"value": 3}
+        assert d.pop("a") == {"value": 1} and d.pop("a", None) is None
+        assert d.popitem() == ("c", {"value": 3})
+        assert d == {"b": {"value": 2}}
+
+    def test_lazy_dict_converts_once(self) -> None:
+        calls: List[int] = []
+
+        def convert(value: int) -> int:
+            calls.append(value)
+            return value * 10
+
+        d = _LazyDict({"a": 1}, convert)
+        raw = dict.__getitem__(d, "a")
+
+        assert d["a"] == 10
+        # A conversion started before another one finished returns the stored value
+        assert d._convert("a", raw) == 10
+        assert calls == [1]
+
+    def test_lazy_dict_releases_converter(self) -> None:
+        d = _LazyDict({"a": 1, "b": 2}, lambda v: v * 10)
+
+        def released() -> bool:
+            return d._converter is None
+
+        assert d["a"] == 10 and not released()
+        assert d["b"] == 20 and released()
+        # The converted values don't need it anymore
+        assert d == {"a": 10, "b": 20} and d.copy() == d
+
+    def test_lazy_dict_interner_released(self) -> None:
+        qrc = QueryResponseContainer.from_json(
+            load_json("tests/data/query_v2/query_response_container/valid_qrc1.json"),
+            lazy=True,
+            intern=True,
+        )
+        mappings = [r.mappings for r in qrc.responses]
+        assert all(isinstance(m, _LazyDict) and m._converter for m in mappings)
+
+        for m in mappings:
+            assert m == dict(m.items())
+        assert all(isinstance(m, _LazyDict) and m._converter is None for m in mappings)
+
+
+class TestToJSON:
+    VALID_FILES = [
+        (Destination, "destination/valid_dest", 6),
+        (Mapping, "mapping/valid_map", 6),
+        (Policy, "policy/valid_pol", 5),
+        (MappingResponseObject, "query_v2/mapping_response_obj/valid_mro", 4),
+        (QueryResponseEntity, "query_v2/query_response_entity/valid_qre", 5),
+    ]
+
+    @pytest.mark.parametrize(
+        "model,json_file",
+        [
+            (model, f"tests/data/{prefix}{i}.json")
+            for model, prefix, count in VALID_FILES
+            for i in range(1, count + 1)
+        ],
+    )
+    @pytest.mark.parametrize("exclude_none", [False, True])
+    def test_round_trip(self, model: Any, json_file: str, exclude_none: bool) -> None:
+        obj = model.from_json(load_json(json_file))
+
+        data = obj.to_json(exclude_none=exclude_none)
+
+        assert model.from_json(json.loads(json.dumps(data))) == obj
+        assert model.from_json(json.loads(obj.to_json_bytes(exclude_none))) == obj
+
+    def test_destination(self) -> None:
+        data = load_json("tests/data/destination/valid_dest1.json")
+        d = Destination.from_json(deepcopy(data))
+
+        res = d.to_json()
+
+        assert res == asdict(d)
+        assert res["id"] is None
+        assert "id" not in d.to_json(exclude_none=True)
+
+    def test_query_response_entity(self) -> None:
+        data = load_json("tests/data/query_v2/query_response_entity/valid_qre4.json")
+        q = QueryResponseEntity.from_json(deepcopy(data))
+
+        res = q.to_json(exclude_none=True)
+
+        assert res["workflow"] == "community"
+        assert type(res["workflow"]) is str
+        assert "billing_code_config" not in res
+        assert res["billing-code-config"]["test-access"] == {
+            **data["billing-code-config"]["test-access"],
+            "image_types": ["access"],
+        }
+        assert type(res["billing-code-config"]["test-access"]["image_types"][0]) is str
+        assert isinstance(res["mappings"]["test-storage"], dict)
+        assert "id" not in res
+
+    def test_query_response_entity_null_meta(self) -> None:
+        data = load_json("tests/data/query_v2/query_response_entity/valid_qre1.json")
+        data["meta"] = None
+
+        q = QueryResponseEntity.from_json(data)
+
+        assert q.meta is None
+        assert QueryResponseEntity.from_json(q.to_json()) == q
+
+    def test_query_response_container(self) -> None:
+        data = load_json("tests/data/query_v2/query_response_container/valid_qrc1.json")
+        expected = QueryResponseContainer.from_json(deepcopy(data))
+
+        qrc = QueryResponseContainer.from_json(data, lazy=True)
+        res = qrc.to_json()
+
+        assert res == expected.to_json()
+        assert QueryResponseContainer.from_json(res) == expected
+        assert json.loads(qrc.to_json_bytes(exclude_none=True)) == expected.to_json(True)
@@ -1,6 +1,7 @@
 from typing import Any, Dict, Optional
 
 import pytest
+from attrs import evolve
 
 from starmap_client.models import QueryResponseContainer, QueryResponseEntity
 from starmap_client.providers import InMemoryMapProviderV2
@@ -55,3 +56,29 @@ class TestInMemoryMapProviderV2:
 
         qr = provider.query(params)
         assert qr == expected_container
+
+    def test_discard(
+        self, qrc_object: QueryResponseContainer, qre2_object: QueryResponseEntity
+    ) -> None:
+        provider = InMemoryMapProviderV2(container=qrc_object)
+        qre1 = provider.list_content()[0]
+
+        provider.discard(qre2_object)
+        provider.discard(qre2_object)
+
+        assert provider.list_content() == [qre1]
+        assert provider.query({"name": qre2_object.name, "workflow": qre2_object.workflow}) is None
+
+    def test_discard_then_store(self, qrc_object: QueryResponseContainer) -> None:
+        provider = InMemoryMapProviderV2(container=qrc_object)
+        old = provider.list_content()[-1]
+        assert provider.query({"name": old.name}) is not None
+
+        # The number of responses doesn't change, but the index must not serve the old one
+        provider.discard(old)
+        new = evolve(old, name="other")
+        provider.store(new)
+
+        assert provider.query({"name": "other"}) == QueryResponseContainer([new])
+        res = provider.query({"name": old.name})
+        assert res is None or old not in res.responses
@@ -0,0 +1,160 @@
+import gc
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest import mock
+
+import pytest
+
+from starmap_client.models import QueryResponseContainer
+from starmap_client.providers import (
+    InMemoryMapProviderV2,
+    SnapshotError,
+    SQLiteMapProviderV2,
+    StarmapProvider,
+)
+from starmap_client.providers.snapshot import _HEADER, _GCPause, dump_snapshot, load_snapshot
+
+
+class TestSnapshot:
+    def test_round_trip(self, qrc_object: QueryResponseContainer) -> None:
+        data = dump_snapshot("v2", qrc_object.responses)
+
+        assert load_snapshot(data, "v2") == qrc_object.responses
+
+    def test_uncompressed(self, qrc_object: QueryResponseContainer) -> None:
+        data = dump_snapshot("v2", qrc_object.responses, compress_level=0)
+
+        assert load_snapshot(data, "v2") == qrc_object.responses
+        assert len(data) > len(dump_snapshot("v2", qrc_object.responses))
+
+    def test_gc_not_paused_by_default(self, qrc_object: QueryResponseContainer) -> None:
+        data = dump_snapshot("v2", qrc_object.responses)
+
+        with mock.patch("starmap_client.providers.snapshot.gc") as mock_gc:
+            load_snapshot(data, "v2")
+
+        mock_gc.disable.assert_not_called()
+
+    def test_gc_paused(self, qrc_object: QueryResponseContainer) -> None:
+        data = dump_snapshot("v2", qrc_object.responses)
+
+        with mock.patch("starmap_client.providers.snapshot.gc", wraps=gc) as mock_gc:
+            assert load_snapshot(data, "v2", pause_gc=True) == qrc_object.responses
+
+        mock_gc.disable.assert_called_once()
+        assert gc.isenabled()
+
+        gc.disable()
+        try:
+            load_snapshot(data, "v2", pause_gc=True)
+            assert not gc.isenabled()
+        finally:
+            gc.enable()
+
+    def test_gc_concurrent_loads(self) -> None:
+        pause = _GCPause()
+
+        # The first load done doesn't re-enable it while the other one is still running
+        pause.__enter__()
+        pause.__enter__()
+        pause.__exit__(None, None, None)
+        assert not gc.isenabled()
+        pause.__exit__(None, None, None)
+        assert gc.isenabled()
+
+    def test_too_short(self) -> None:
+        with pytest.raises(SnapshotError, match="the data is too short"):
+            load_snapshot(b"STARMAP", "v2")
+
+    def test_unknown_format(self) -> None:
+        with pytest.raises(SnapshotError, match="unknown file format"):
+            load_snapshot(b"\x00" * _HEADER.size, "v2")
+
+    def test_unsupported_version(self) -> None:
+        with mock.patch("starmap_client.providers.snapshot.SNAPSHOT_VERSION", 0):
+            data = dump_snapshot("v2", [])
+
+        with pytest.raises(SnapshotError, match="Unsupported snapshot version 0, expected 1"):
+            load_snapshot(data, "v2")
+
+    def test_api_mismatch(self) -> None:
+        data = dump_snapshot("v1", [])
+
+        with pytest.raises(SnapshotError, match="Snapshot has API v1 but expected: v2"):
+            load_snapshot(data, "v2")
+
+    def test_stale(self) -> None:
+        with mock.patch(
+            "starmap_client.providers.snapshot._schema_fingerprint", return_value=b"0" * 16
+        ):
+            data = dump_snapshot("v2", [])
+
+        with pytest.raises(SnapshotError, match="Stale snapshot"):
+            load_snapshot(data, "v2")
+
+    def test_corrupt(self, qrc_object: QueryResponseContainer) -> None:
+        data = bytearray(dump_snapshot("v2", qrc_object.responses))
+        data[-1] ^= 0xFF
+
+        with pytest.raises(SnapshotError, match="checksum mismatch"):
+            load_snapshot(bytes(data), "v2")
+
+    def test_payload_replaced(self, qrc_object: QueryResponseContainer) -> None:
+        data = dump_snapshot("v2", qrc_object.responses)
+        forged = data[: _HEADER.size] + zlib.compress(b"foo")
+
+        with pytest.raises(SnapshotError, match="checksum mismatch"):
+            load_snapshot(forged, "v2")
+
+
+class TestProvidersSnapshot:
+    def test_in_memory(self, qrc_object: QueryResponseContainer) -> None:
+        data = InMemoryMapProviderV2(qrc_object).export_snapshot()
+
+        provider = InMemoryMapProviderV2.from_snapshot(data)
+
+        assert provider.list_content() == qrc_object.responses
+        assert provider.query({"name": "sample-product"}) == qrc_object
+
+    def test_in_memory_import(
+        self, qrc_object: QueryResponseContainer, qre1: Dict[str, Any]
+    ) -> None:
+        data = dump_snapshot("v2", qrc_object.responses[1:])
+        provider = InMemoryMapProviderV2(QueryResponseContainer.from_json([qre1]))
+
+        provider.import_snapshot(data)
+
+        assert provider.list_content() == qrc_object.responses
+
+    def test_pause_gc(self, tmp_path: Path, qrc_object: QueryResponseContainer) -> None:
+        data = InMemoryMapProviderV2(qrc_object).export_snapshot()
+
+        with mock.patch("starmap_client.providers.snapshot.gc", wraps=gc) as mock_gc:
+            InMemoryMapProviderV2.from_snapshot(data, pause_gc=True)
+            InMemoryMapProviderV2(QueryResponseContainer([])).import_snapshot(data, pause_gc=True)
+            with SQLiteMapProviderV2(str(tmp_path / "mappings.db")) as provider:
+                provider.import_snapshot(data, pause_gc=True)
+
+        assert mock_gc.disable.call_count == 3
+        assert gc.isenabled()
+
+    def test_sqlite(
+        self, tmp_path: Path, qrc: List[Dict[str, Any]], qrc_object: QueryResponseContainer
+    ) -> None:
+        data = InMemoryMapProviderV2(qrc_object).export_snapshot()
+
+        with SQLiteMapProviderV2(str(tmp_path / "mappings.db")) as provider:
+            provider.import_snapshot(data)
+
+            assert provider.list_content() == qrc_object.responses
+            assert load_snapshot(provider.export_snapshot(), "v2") == qrc_object.responses
+
+    def test_api_mismatch(self, qrc_object: QueryResponseContainer) -> None:
+        provider: StarmapProvider[Any, Any] = InMemoryMapProviderV2(qrc_object)
+        data = dump_snapshot("v1", qrc_object.responses)
+
+        with pytest.raises(SnapshotError, match="API mismatch"):
+            provider.import_snapshot(data)
+        with pytest.raises(SnapshotError, match="API mismatch"):
+            InMemoryMapProviderV2.from_snapshot(data)
@@ -0,0 +1,133 @@
+import json
+import sqlite3
+from copy import deepcopy
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from starmap_client.models import QueryResponseContainer, QueryResponseEntity, Workflow
+from starmap_client.providers import SQLiteMapProviderV2
+
+
+def load_json(json_file: str) -> Any:
+    with open(json_file, "r") as fd:
+        data = json.load(fd)
+    return data
+
+
+class TestSQLiteMapProviderV2:
+    @pytest.fixture
+    def db_path(self, tmp_path: Path) -> str:
+        return str(tmp_path / "mappings.db")
+
+    def test_list_content(self, db_path: str, qrc: List[Dict[str, Any]]) -> None:
+        with SQLiteMapProviderV2(db_path) as provider:
+            provider.store_json(deepcopy(qrc))
+
+            assert provider.list_content() == QueryResponseContainer.from_json(qrc).responses
+
+    def test_store(
+        self,
+        db_path: str,
+        qre1_object: QueryResponseEntity,
+        qre2_object: QueryResponseEntity,
+    ) -> None:
+        with SQLiteMapProviderV2(db_path) as provider:
+            assert provider.list_content() == []
+
+            provider.store(qre1_object)
+            provider.store(qre2_object)
+            assert provider.list_content() == [qre1_object, qre2_object]
+
+    def test_store_billing_code_config(self, db_path: str) -> None:
+        fpath = "tests/data/query_v2/query_response_entity/valid_qre4.json"
+        qre = QueryResponseEntity.from_json(load_json(fpath))
+        assert qre.billing_code_config
+
+        with SQLiteMapProviderV2(db_path) as provider:
+            provider.store(qre)
+            assert provider.list_content() == [qre]
+
+    def test_persistence(self, db_path: str, qrc_object: QueryResponseContainer) -> None:
+        with SQLiteMapProviderV2(db_path) as provider:
+            for qre in qrc_object.responses:
+                provider.store(qre)
+
+        with SQLiteMapProviderV2(db_path, read_only=True) as provider:
+            assert provider.read_only is True
+            assert provider.list_content() == qrc_object.responses
+            with pytest.raises(sqlite3.OperationalError):
+                provider.store(qrc_object.responses[0])
+
+    @pytest.mark.parametrize("name", ["a?mode=rwc.db", "a#b.db", "a%20b.db", "a b.db"])
+    def test_read_only_path_quoted(
+        self, tmp_path: Path, name: str, qrc_object: QueryResponseContainer
+    ) -> None:
+        db_path = str(tmp_path / name)
+        with SQLiteMapProviderV2(db_path) as provider:
+            provider.store(qrc_object.responses[0])
+
+        with SQLiteMapProviderV2(db_path, read_only=True) as provider:
+            assert provider.list_content() == qrc_object.responses[:1]
+        assert [p.name for p in tmp_path.iterdir()] == [name]
+
+    @pytest.mark.parametrize(
+        "params, expected",
+        [
+            (
+                {"name": "sample-product", "version": "8.0", "workflow": "stratosphere"},
+                'qre1',
+            ),
+            ({"name": "sample-product", "version": "8.1", "workflow": "community"}, 'qre2'),
+            ({"name": "sample-product", "workflow": Workflow.community, "cloud": "aws"}, 'qre2'),
+            ({"image": "sample-product-8.1-1.raw.xz", "workflow": "community"}, 'qre2'),
+            ({"name": "sample-product", "cloud": "azure"}, None),
+            ({"name": "another-product", "version": "8.2", "workflow": "stratosphere"}, None),
+            ({"name": "another-product", "version": "8.2", "workflow": "community"}, None),
+        ],
+    )
+    def test_query(
+        self,
+        db_path: str,
+        params: Dict[str, Any],
+        expected: Optional[str],
+        qrc: List[Dict[str, Any]],
+        request: pytest.FixtureRequest,
+    ) -> None:
+        provider = SQLiteMapProviderV2(db_path)
+        provider.store_json(qrc)
+        expected_container = None
+
+        if expected is not None:
+            qre = request.getfixturevalue(expected)
+            expected_container = QueryResponseContainer.from_json([qre])
+
+        qr = provider.query(params)
+        assert qr == expected_container
+
+    def test_query_multiple(self, db_path: str, qrc: List[Dict[str, Any]]) -> None:
+        provider = SQLiteMapProviderV2(db_path)
+        provider.store_json(deepcopy(qrc))
+
+        qr = provider.query({"name": "sample-product"})
+
+        assert qr == QueryResponseContainer.from_json(qrc)
+
+    def test_discard(
+        self,
+        db_path: str,
+        qre1_object: QueryResponseEntity,
+        qre2_object: QueryResponseEntity,
+    ) -> None:
+        with SQLiteMapProviderV2(db_path) as provider:
+            provider.store(qre1_object)
+            provider.store(qre2_object)
+            provider.store(qre2_object)
+
+            provider.discard(qre2_object)
+            assert provider.list_content() == [qre1_object, qre2_object]
+
+            provider.discard(qre2_object)
+            provider.discard(qre2_object)
+            assert provider.list_content() == [qre1_object]
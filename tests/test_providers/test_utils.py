@@ -5,7 +5,12 @@ import unittest
 
 import pytest
 
-from starmap_client.providers.utils import get_image_name, parse_nvr
+from starmap_client.providers.utils import (
+    ParsedNVR,
+    get_image_name,
+    parse_nvr,
+    parse_nvr_cached,
+)
 
 
 class TestNVR(unittest.TestCase):
@@ -73,3 +78,27 @@ class TestNVR(unittest.TestCase):
         assert get_image_name("/foo/bar/1:net-snmp-5.3.2.2-5.el5") == "net-snmp"
         assert get_image_name("openmpi-1.10-1.10.2-2.el6") == "openmpi-1.10"
         assert get_image_name(None) == ""
+
+    def test_parse_nvr_cached(self) -> None:
+        parse_nvr_cached.cache_clear()
+
+        res = parse_nvr_cached("/foo/1:net-snmp-5.3.2.2-5.el5")
+
+        assert res == ParsedNVR(name="net-snmp", version="5.3.2.2", release="5.el5", epoch="1")
+        assert str(res) == "net-snmp-5.3.2.2-5.el5:1"
+        assert str(parse_nvr_cached("openmpi-1.10-1.10.2-2.el6")) == "openmpi-1.10-1.10.2-2.el6"
+        assert parse_nvr_cached("/foo/1:net-snmp-5.3.2.2-5.el5") is res
+        assert parse_nvr_cached.cache_info().hits == 1
+        with pytest.raises(AttributeError):
+            res.name = "foo"  # type: ignore
+
+    def test_parse_nvr_cached_invalid(self) -> None:
+        for _ in range(2):
+            with pytest.raises(RuntimeError, match="Invalid NVR: net-snmp"):
+                parse_nvr_cached("net-snmp")
+
+    def test_parse_nvr_returns_new_dict(self) -> None:
+        res = parse_nvr("net-snmp-5.3.2.2-5.el5")
+        res["name"] = "foo"
+
+        assert parse_nvr("net-snmp-5.3.2.2-5.el5")["name"] == "net-snmp"
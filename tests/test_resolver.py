@@ -0,0 +1,228 @@
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+import pytest
+
+from starmap_client import StarmapClient
+from starmap_client.models import Policy, QueryResponseContainer, Workflow
+from starmap_client.resolver import PolicyResolver
+from starmap_client.sync import policy_to_responses
+from tests.utils import make_destination, make_mapping, make_policy
+
+
+def version_mapping(account: str, version_fnmatch: Optional[str] = None) -> Dict[str, Any]:
+    """Return a mapping for the version pattern with a destination named after both."""
+    destinations = [make_destination(f"{account}-{version_fnmatch}")]
+    return make_mapping(account, destinations, version_fnmatch=version_fnmatch)
+
+
+def version_policy(name: str, workflow: str, mappings: List[Dict[str, Any]]) -> Policy:
+    """Return the policy with the given version mappings."""
+    return Policy.from_json(make_policy(name, mappings, workflow=workflow, meta={}))
+
+
+@pytest.fixture
+def policies() -> List[Policy]:
+    return [
+        version_policy(
+            "product",
+            "stratosphere",
+            [
+                version_mapping("aws-na", "1.*"),
+                version_mapping("aws-na", "2.*"),
+                version_mapping("azure-na", "2.*"),
+                version_mapping("aws-emea"),
+            ],
+        ),
+        version_policy("product", "community", [version_mapping("aws-na", "1.*")]),
+        version_policy("other", "stratosphere", [version_mapping("gcp-na")]),
+    ]
+
+
+def destinations(qr: Optional[QueryResponseContainer]) -> List[str]:
+    assert qr is not None
+    return [
+        f"{r.workflow.value}/{r.cloud}/{d.destination}"
+        for r in qr.responses
+        for m in r.all_mappings
+        for d in m.destinations
+    ]
+
+
+@pytest.mark.parametrize(
+    "params,expected",
+    [
+        (
+            {"image": "product-1.0-1.raw.xz"},
+            [
+                "stratosphere/aws/aws-na-1.*",
+                "stratosphere/aws/aws-emea-None",
+                "community/aws/aws-na-1.*",
+            ],
+        ),
+        (
+            {"image": "product-2.1-1.raw.xz", "workflow": "stratosphere"},
+            [
+                "stratosphere/aws/aws-na-2.*",
+                "stratosphere/aws/aws-emea-None",
+                "stratosphere/azure/azure-na-2.*",
+            ],
+        ),
+        (
+            {"name": "product", "version": "2.0", "cloud": "azure"},
+            ["stratosphere/azure/azure-na-2.*"],
+        ),
+        (
+            {"name": "product", "workflow": Workflow.community},
+            ["community/aws/aws-na-1.*"],
+        ),
+        (
+            {"name": "product", "workflow": "stratosphere"},
+            [
+                "stratosphere/aws/aws-na-1.*",
+                "stratosphere/aws/aws-na-2.*",
+                "stratosphere/aws/aws-emea-None",
+                "stratosphere/azure/azure-na-2.*",
+            ],
+        ),
+        ({"name": "other", "version": "3.0"}, ["stratosphere/gcp/gcp-na-None"]),
+    ],
+)
+def test_query(policies: List[Policy], params: Dict[str, Any], expected: List[str]) -> None:
+    resolver = PolicyResolver(policies)
+
+    assert destinations(resolver.query(params)) == expected
+
+
+@pytest.mark.parametrize(
+    "params",
+    [
+        {"name": "unknown"},
+        {"image": "product-3.0-1.raw.xz", "workflow": "community"},
+        {"name": "product", "version": "1.0", "cloud": "azure"},
+        {"name": "other", "workflow": "community"},
+    ],
+)
+def test_query_not_found(policies: List[Policy], params: Dict[str, Any]) -> None:
+    resolver = PolicyResolver(policies)
+
+    assert resolver.query(params) is None
+
+
+def test_query_overlapping_mappings_meta() -> None:
+    mappings = [
+        version_mapping("aws-na", "8.*"),
+        version_mapping("aws-na", "*"),
+        version_mapping("aws-na"),
+    ]
+    for i, m in enumerate(mappings):
+        m["meta"] = {"product": f"meta-{i}", "shared": "s"}
+    resolver = PolicyResolver([version_policy("product", "stratosphere", mappings)])
+
+    for params in [{"name": "product"}, {"name": "product", "version": "8.1"}]:
+        qr = resolver.query(params)
+
+        assert qr is not None
+        mapping = qr.responses[0].get_mapping_for_account("aws-na")
+        assert mapping.meta == {"shared": "s"}
+        assert [(d.destination, (d.meta or {})["product"]) for d in mapping.destinations] == [
+            ("aws-na-8.*", "meta-0"),
+            ("aws-na-*", "meta-1"),
+            ("aws-na-None", "meta-2"),
+        ]
+
+
+def test_query_invalid_nvr(policies: List[Policy]) -> None:
+    resolver = PolicyResolver(policies)
+
+    with pytest.raises(RuntimeError, match="Invalid NVR"):
+        resolver.query({"image": "product"})
+
+
+def test_query_responses_cache(policies: List[Policy]) -> None:
+    resolver = PolicyResolver(policies)
+    resolver.RESPONSES_CACHE_SIZE = 2
+
+    first = resolver.query({"name": "product", "version": "1.0", "workflow": "stratosphere"})
+    # Another version matching the same mappings reuses the converted responses
+    second = resolver.query({"name": "product", "version": "1.5", "workflow": "stratosphere"})
+    assert first is not None and second is not None
+    assert first.responses[0] is second.responses[0]
+
+    resolver.query({"name": "product", "version": "2.0"})
+    resolver.query({"name": "other"})
+    assert len(resolver._responses) == 2
+    third = resolver.query({"name": "product", "version": "1.0", "workflow": "stratosphere"})
+    assert third is not None
+    assert third.responses[0] is not first.responses[0]
+    assert third == first
+
+
+def test_list_content(policies: List[Policy]) -> None:
+    resolver = PolicyResolver(policies)
+
+    assert resolver.list_content() == [r for p in policies for r in policy_to_responses(p)]
+
+
+def test_store(policies: List[Policy]) -> None:
+    resolver = PolicyResolver(policies)
+
+    assert resolver.read_only is True
+    with pytest.raises(NotImplementedError, match="PolicyResolver is read-only"):
+        resolver.store(resolver.list_content()[0])
+
+
+def test_update(policies: List[Policy]) -> None:
+    resolver = PolicyResolver(policies[:2])
+    matcher = resolver._index[0][0][1]
+    assert resolver.query({"name": "product", "version": "2.0"}) is not None
+    assert resolver.query({"name": "other"}) is None
+
+    resolver.update([policies[0], policies[2]])
+
+    # The matcher of the kept policy is reused while the converted responses are discarded
+    assert resolver._index[0][0][1] is matcher
+    assert len(resolver._responses) == 0
+    assert destinations(resolver.query({"name": "product", "version": "1.0"})) == [
+        "stratosphere/aws/aws-na-1.*",
+        "stratosphere/aws/aws-emea-None",
+    ]
+    assert destinations(resolver.query({"name": "other"})) == ["stratosphere/gcp/gcp-na-None"]
+    assert resolver.list_content() == [
+        r for p in [policies[0], policies[2]] for r in policy_to_responses(p)
+    ]
+
+
+def test_cloud_resolver(policies: List[Policy]) -> None:
+    resolver = PolicyResolver(policies, cloud_resolver=lambda _: "cloud")
+
+    qr = resolver.query({"name": "other"})
+
+    assert qr is not None
+    assert [r.cloud for r in qr.responses] == ["cloud"]
+
+
+def test_from_client(policies: List[Policy]) -> None:
+    client = mock.MagicMock(spec=StarmapClient)
+    client.list_policies.return_value = policies
+
+    resolver = PolicyResolver.from_client(client)
+
+    client.list_policies.assert_called_once_with()
+    assert resolver.query({"name": "other"}) is not None
+
+
+def test_client_offline_queries(policies: List[Policy]) -> None:
+    session = mock.MagicMock()
+    client = StarmapClient(session=session, provider=PolicyResolver(policies))
+
+    qr = client.query_image("product-2.0-1.raw.xz", workflow="stratosphere")
+    qr_name = client.query_image_by_name("product", "2.0", workflow="stratosphere")
+
+    assert qr == qr_name
+    assert destinations(qr) == [
+        "stratosphere/aws/aws-na-2.*",
+        "stratosphere/aws/aws-emea-None",
+        "stratosphere/azure/azure-na-2.*",
+    ]
+    session.get.assert_not_called()
@@ -0,0 +1,225 @@
+import json
+from typing import Any, Iterator, List
+from unittest import mock
+
+import pytest
+from requests import HTTPError
+
+from starmap_client import StarmapClient
+from starmap_client.models import Policy, QueryResponseContainer
+from starmap_client.providers import InMemoryMapProviderV2
+from starmap_client.server import StarmapStandInServer
+
+
+def load_json(json_file: str) -> Any:
+    with open(json_file, "r") as fd:
+        data = json.load(fd)
+    return data
+
+
+@pytest.fixture
+def qrc() -> QueryResponseContainer:
+    fpath = "tests/data/query_v2/query_response_container/valid_qrc1.json"
+    return QueryResponseContainer.from_json(load_json(fpath))
+
+
+@pytest.fixture
+def policies() -> List[Policy]:
+    res = []
+    for i in range(5):
+        data = load_json("tests/data/policy/valid_pol1.json")
+        data["id"] = f"policy-{i}"
+        data["mappings"][0]["id"] = f"mapping-{i}"
+        data["mappings"][0]["destinations"][0]["id"] = f"destination-{i}"
+        res.append(Policy.from_json(data))
+    return res
+
+
+@pytest.fixture
+def app(qrc: QueryResponseContainer, policies: List[Policy]) -> StarmapStandInServer:
+    return StarmapStandInServer(InMemoryMapProviderV2(qrc), policies)
+
+
+@pytest.fixture
+def server(app: StarmapStandInServer) -> Iterator[StarmapStandInServer]:
+    with app:
+        yield app
+
+
+def test_client_end_to_end(
+    server: StarmapStandInServer, qrc: QueryResponseContainer, policies: List[Policy]
+) -> None:
+    client = StarmapClient(server.url)
+    client.POLICIES_PER_PAGE = 2
+
+    res = client.query_image_by_name("product-test", workflow="stratosphere")
+
+    assert res == QueryResponseContainer(
+        qrc.filter_by(name="product-test", workflow="stratosphere")
+    )
+    assert list(client.iter_query_image("product-test-1.0-1.raw.xz")) == qrc.filter_by(
+        name="product-test"
+    )
+    assert client.query_image("missing-1.0-1.raw.xz") is None
+    assert client.list_policies() == policies
+    assert client.get_policy("policy-3") == policies[3]
+    assert client.get_mapping("mapping-1") == policies[1].mappings[0]
+    assert client.get_destination("destination-4") == policies[4].mappings[0].destinations[0]
+    assert client.get_policy("missing") is None
+    assert server.requests == 10
+
+
+def test_policies_pagination(app: StarmapStandInServer) -> None:
+    status, body = app.handle("/api/v2/policy?page=2&per_page=2")
+
+    data = json.loads(body)
+    assert status == 200
+    assert [p["id"] for p in data["items"]] == ["policy-2", "policy-3"]
+    assert data["nav"] == {
+        "first": f"{app.url}/api/v2/policy?page=1&per_page=2",
+        "last": f"{app.url}/api/v2/policy?page=3&per_page=2",
+        "next": f"{app.url}/api/v2/policy?page=3&per_page=2",
+        "page": 2,
+        "per_page": 2,
+        "previous": f"{app.url}/api/v2/policy?page=1&per_page=2",
+        "total": 5,
+        "total_pages": 3,
+    }
+
+    status, body = app.handle("/api/v2/policy")
+
+    data = json.loads(body)
+    assert len(data["items"]) == 5
+    assert data["nav"]["next"] is None and data["nav"]["previous"] is None
+
+
+@pytest.mark.parametrize(
+    "path,status",
+    [
+        ("/api/v2/policy?page=4&per_page=2", 404),
+        ("/api/v2/policy?page=0", 400),
+        ("/api/v2/policy?page=foo", 400),
+        ("/api/v2/query", 400),
+        ("/api/v2/query?workflow=community", 400),
+        ("/api/v2/query?image=badnvr", 400),
+        ("/api/v2/unknown", 404),
+        ("/api/v1/query?name=product-test", 404),
+        ("/", 404),
+    ],
+)
+def test_invalid_requests(app: StarmapStandInServer, path: str, status: int) -> None:
+    res_status, body = app.handle(path)
+
+    assert res_status == status
+    assert "error" in json.loads(body)
+
+
+def test_client_invalid_nvr(server: StarmapStandInServer) -> None:
+    client = StarmapClient(server.url)
+
+    with pytest.raises(HTTPError, match="400 Client Error") as exc_info:
+        client.query_image("badnvr")
+
+    assert exc_info.value.response is not None
+    assert exc_info.value.response.json() == {"error": "Invalid NVR: badnvr"}
+    assert server.handle("/api/v2/query?image=product-test-1.0-1.raw.xz")[0] == 200
+
+
+def test_policies_per_page_limit(policies: List[Policy]) -> None:
+    server = StarmapStandInServer(policies=policies)
+    server.MAX_PER_PAGE = 3
+
+    data = json.loads(server.handle("/api/v2/policy?per_page=100")[1])
+
+    assert len(data["items"]) == 3
+    assert data["nav"]["total_pages"] == 2
+
+
+def test_query_without_provider() -> None:
+    server = StarmapStandInServer()
+
+    assert server.handle("/api/v2/query?name=product-test")[0] == 404
+    assert json.loads(server.handle("/api/v2/policy")[1])["items"] == []
+
+
+def test_query_cache(qrc: QueryResponseContainer) -> None:
+    provider = mock.MagicMock(api="v2")
+    provider.query.return_value = qrc
+    server = StarmapStandInServer(provider)
+    server.QUERY_CACHE_SIZE = 1
+
+    res1 = server.handle("/api/v2/query?image=product-test-1.0-1.raw.xz")
+    res2 = server.handle("/api/v2/query?image=product-test-1.0-1.raw.xz")
+    server.handle("/api/v2/query?name=other")
+    res3 = server.handle("/api/v2/query?image=product-test-1.0-1.raw.xz")
+
+    assert res1 == res2 == res3
+    assert res1[0] == 200
+    assert QueryResponseContainer.from_json(json.loads(res1[1])) == qrc
+    assert provider.query.call_count == 3
+
+
+@mock.patch("starmap_client.server.time.sleep")
+def test_latency(mock_sleep: mock.MagicMock) -> None:
+    server = StarmapStandInServer(latency=0.5, jitter=0.1, seed=1)
+
+    server.handle("/")
+    server.handle("/")
+
+    delays = [c.args[0] for c in mock_sleep.call_args_list]
+    assert len(delays) == 2
+    assert all(0.5 <= d <= 0.6 for d in delays)
+    assert delays[0] != delays[1]
+
+
+@mock.patch("starmap_client.server.time.sleep")
+def test_no_latency(mock_sleep: mock.MagicMock) -> None:
+    StarmapStandInServer().handle("/")
+
+    mock_sleep.assert_not_called()
+
+
+def test_error_injection() -> None:
+    server = StarmapStandInServer(error_rate=0.5, error_status=500, seed=1)
+
+    statuses = [server.handle("/api/v2/policy")[0] for _ in range(100)]
+
+    assert set(statuses) == {200, 500}
+    assert server.errors == statuses.count(500)
+    assert server.requests == 100
+    assert StarmapStandInServer(error_rate=1).handle("/api/v2/policy") == (
+        503,
+        b'{"error":"Injected error"}',
+    )
+
+
+def test_client_retries_injected_errors(server: StarmapStandInServer) -> None:
+    server.error_rate = 1
+    client = StarmapClient(server.url, session_params={"retries": 2, "backoff_factor": 0})
+
+    with pytest.raises(Exception, match="too many 503 error responses"):
+        client.get_policy("policy-1")
+
+    assert server.errors == 3
+
+
+def test_invalid_params() -> None:
+    with pytest.raises(ValueError, match="The server requires an APIv2 provider, got: v1"):
+        StarmapStandInServer(mock.MagicMock(api="v1"))
+    with pytest.raises(ValueError, match="The error_rate must be between 0 and 1, got: 2"):
+        StarmapStandInServer(error_rate=2)
+
+
+def test_start_stop() -> None:
+    server = StarmapStandInServer()
+    server.stop()
+
+    server.start()
+    port = server.port
+    with pytest.raises(RuntimeError, match="The server is already running"):
+        server.start()
+    server.stop()
+    server.stop()
+
+    assert port != 0
+    assert server.url == f"http://127.0.0.1:{port}"
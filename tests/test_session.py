@@ -43,6 +43,143 @@ class TestStarmapSession(TestCase):
         self.session.put("/foo", json=data)
         self._assert_requested_with(method="put", path="foo", json=data)
 
+    def test_connection_pool(self) -> None:
+        session = StarmapSession("test.starmap.com", "v2")
+        adapter = session.session.get_adapter("https://test.starmap.com")
+        assert adapter._pool_connections == 10  # type: ignore[attr-defined]
+        assert adapter._pool_maxsize == 10  # type: ignore[attr-defined]
+        assert adapter._pool_block is False  # type: ignore[attr-defined]
+
+        session = StarmapSession(
+            "test.starmap.com", "v2", pool_connections=2, pool_maxsize=20, pool_block=True
+        )
+        adapter = session.session.get_adapter("https://test.starmap.com")
+        assert adapter._pool_connections == 2  # type: ignore[attr-defined]
+        assert adapter._pool_maxsize == 20  # type: ignore[attr-defined]
+        assert adapter._pool_block is True  # type: ignore[attr-defined]
+        assert adapter.poolmanager.connection_pool_kw["maxsize"] == 20  # type: ignore
+        assert session.session.get_adapter("http://localhost:8080") is adapter
+
+    def test_backoff_factor(self) -> None:
+        assert StarmapSession("test.starmap.com", "v2").backoff_factor == 2.0
+
+        session = StarmapSession("test.starmap.com", "v2", backoff_factor=0.5)
+
+        assert session.backoff_factor == 0.5
+        adapter = session.session.get_adapter("https://test.starmap.com")
+        assert adapter.max_retries.backoff_factor == 0.5  # type: ignore[attr-defined]
+
+    def test_retries(self) -> None:
+        assert StarmapSession("test.starmap.com", "v2").retries == 3
+
+        session = StarmapSession("test.starmap.com", "v2", retries=1)
+
+        assert session.retries == 1
+        adapter = session.session.get_adapter("https://test.starmap.com")
+        assert adapter.max_retries.connect == 1  # type: ignore[attr-defined]
+
+
+class TestStarmapSessionConditionalRequests(TestCase):
+    def setUp(self) -> None:
+        self.session = StarmapSession(
+            url="test.starmap.com", api_version="v2", conditional_requests=True
+        )
+        self.mock_requests = mock.patch.object(self.session, 'session').start()
+
+    def tearDown(self) -> None:
+        mock.patch.stopall()
+
+    @staticmethod
+    def _response(status_code: int, headers: Dict[str, str], content: bytes = b"") -> Any:
+        rsp = requests.Response()
+        rsp.status_code = status_code
+        rsp.headers.update(headers)
+        rsp._content = content
+        return rsp
+
+    def _sent_headers(self, call: int) -> Any:
+        return self.mock_requests.request.call_args_list[call].kwargs["headers"]
+
+    def test_not_modified(self) -> None:
+        first = self._response(200, {"ETag": '"abc"', "Last-Modified": "today"}, b'{"foo": 1}')
+        self.mock_requests.request.side_effect = [first, self._response(304, {})]
+
+        rsp1 = self.session.get("/policy", params={"page": 1, "per_page": 10})
+        rsp2 = self.session.get("/policy", params={"per_page": 10, "page": 1})
+
+        assert rsp1 is first
+        assert rsp2.stored_response is first  # type: ignore[attr-defined]
+        assert rsp2.from_cache is True  # type: ignore[attr-defined]
+        # The stored response is left untouched for the other callers
+        assert first.from_cache is False
+        assert rsp2.json() == {"foo": 1}
+        assert rsp2.status_code == 200 and rsp2.headers is first.headers
+        assert "If-None-Match" not in self._sent_headers(0)
+        assert self._sent_headers(1)["If-None-Match"] == '"abc"'
+        assert self._sent_headers(1)["If-Modified-Since"] == "today"
+
+    def test_modified(self) -> None:
+        first = self._response(200, {"ETag": '"abc"'}, b"[]")
+        second = self._response(200, {"ETag": '"def"'}, b"[1]")
+        self.mock_requests.request.side_effect = [
+            first,
+            second,
+            self._response(304, {}),
+        ]
+
+        assert self.session.get("/query") is first
+        assert self.session.get("/query") is second
+        assert second.from_cache is False  # type: ignore[attr-defined]
+        assert self.session.get("/query").stored_response is second  # type: ignore[attr-defined]
+        assert self._sent_headers(2)["If-None-Match"] == '"def"'
+
+    def test_no_validators(self) -> None:
+        self.mock_requests.request.side_effect = [
+            self._response(200, {}, b"[]"),
+            self._response(200, {}, b"[]"),
+        ]
+
+        self.session.get("/query")
+        self.session.get("/query")
+
+        assert "If-None-Match" not in self._sent_headers(1)
+        assert "If-Modified-Since" not in self._sent_headers(1)
+
+    def test_only_get_requests(self) -> None:
+        self.mock_requests.request.return_value = self._response(200, {"ETag": '"abc"'})
+
+        self.session.post("/policy", json={})
+        self.session.post("/policy", json={})
+
+        assert "If-None-Match" not in self._sent_headers(1)
+
+    def test_stream_not_conditional(self) -> None:
+        first = self._response(200, {"ETag": '"abc"'})
+        first.raw = mock.MagicMock()
+        self.mock_requests.request.side_effect = [first, self._response(200, {"ETag": '"abc"'})]
+        first._content = False  # Not consumed yet
+
+        assert self.session.get("/query", stream=True) is first
+        self.session.get("/query", stream=True)
+
+        # The streamed body isn't loaded nor stored
+        first.raw.read.assert_not_called()
+        first.raw.stream.assert_not_called()
+        assert self.session._validated == {}
+        assert "If-None-Match" not in self._sent_headers(1)
+
+    def test_cache_size(self) -> None:
+        self.session.CONDITIONAL_CACHE_SIZE = 2
+        self.mock_requests.request.side_effect = lambda *a, **kw: self._response(
+            200, {"ETag": '"abc"'}
+        )
+
+        for i in range(3):
+            self.session.get(f"/policy/{i}")
+
+        assert len(self.session._validated) == 2
+        assert "test.starmap.com/api/v2/policy/0" not in self.session._validated
+
 
 class TestMockSession(TestCase):
     def setUp(self) -> None:
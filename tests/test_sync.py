@@ -0,0 +1,248 @@
+from copy import deepcopy
+from pathlib import Path
+from typing import Any, Dict, List
+from unittest import mock
+
+import pytest
+
+from starmap_client import StarmapClient
+from starmap_client.models import Policy, QueryResponseContainer, QueryResponseEntity
+from starmap_client.providers import InMemoryMapProviderV2, SQLiteMapProviderV2, StarmapProvider
+from starmap_client.resolver import PolicyResolver
+from starmap_client.sync import StarmapSync, SyncResult, default_cloud_resolver, policy_to_responses
+from tests.utils import make_destination, make_mapping, make_policy
+
+
+def account_policy(
+    policy_id: str, name: str, accounts: List[str], meta: Any = None, dest_meta: Any = None
+) -> Dict[str, Any]:
+    """Return a policy with a mapping to a single destination for each account."""
+    mappings = [
+        make_mapping(
+            account,
+            [
+                make_destination(
+                    f"{name}-{account}",
+                    provider="AWS" if account.startswith("aws") else None,
+                    meta=dest_meta,
+                )
+            ],
+            meta={"account": account},
+        )
+        for account in accounts
+    ]
+    return make_policy(name, mappings, id=policy_id, meta=meta)
+
+
+def test_default_cloud_resolver() -> None:
+    assert default_cloud_resolver("aws-na") == "aws"
+    assert default_cloud_resolver("azure-emea-test") == "azure"
+    assert default_cloud_resolver("gcp") == "gcp"
+
+
+def test_policy_to_responses() -> None:
+    data = account_policy(
+        "p1", "product", ["aws-na", "aws-emea", "azure-na"], {"p": "v"}, {"account": "override"}
+    )
+    policy = Policy.from_json(deepcopy(data))
+
+    res = policy_to_responses(policy)
+
+    assert [(r.name, r.cloud, r.workflow.value) for r in res] == [
+        ("product", "aws", "stratosphere"),
+        ("product", "azure", "stratosphere"),
+    ]
+    assert res[0].account_names == ["aws-na", "aws-emea"]
+    assert res[0].meta == {"p": "v"}
+    aws_na = res[0].get_mapping_for_account("aws-na")
+    assert aws_na.meta == {"p": "v", "account": "aws-na"}
+    assert aws_na.provider == "AWS"
+    assert aws_na.destinations[0].destination == "product-aws-na"
+    assert aws_na.destinations[0].meta == {"p": "v", "account": "override"}
+    assert res[1].get_mapping_for_account("azure-na").provider is None
+    # The policy must not be changed by the conversion
+    assert policy == Policy.from_json(data)
+
+
+def test_policy_to_responses_same_account() -> None:
+    data = account_policy("p1", "product", ["aws-na", "aws-na"])
+    data["mappings"][1]["destinations"][0]["destination"] = "other"
+
+    res = policy_to_responses(Policy.from_json(data), cloud_resolver=lambda _: "cloud")
+
+    assert len(res) == 1
+    assert res[0].cloud == "cloud"
+    destinations = res[0].get_mapping_for_account("aws-na").destinations
+    assert [d.destination for d in destinations] == ["product-aws-na", "other"]
+
+
+def test_policy_to_responses_same_account_meta() -> None:
+    data = account_policy("p1", "product", ["aws-na", "aws-na"], {"p": "v"})
+    data["mappings"][0]["meta"] = {"product": "RHEL8", "version": "8", "shared": "s"}
+    data["mappings"][1]["meta"] = {"product": "RHEL9", "shared": "s"}
+    data["mappings"][1]["destinations"][0]["meta"] = {"product": "override"}
+
+    res = policy_to_responses(Policy.from_json(data))
+
+    mapping = res[0].get_mapping_for_account("aws-na")
+    assert mapping.meta == {"p": "v", "shared": "s"}
+    assert [d.meta for d in mapping.destinations] == [
+        {"p": "v", "product": "RHEL8", "version": "8", "shared": "s"},
+        {"p": "v", "product": "override", "shared": "s"},
+    ]
+
+
+def test_policy_to_responses_mappings() -> None:
+    policy = Policy.from_json(account_policy("p1", "product", ["aws-na", "azure-na"]))
+
+    res = policy_to_responses(policy, mappings=policy.mappings[1:])
+
+    assert [(r.cloud, r.account_names) for r in res] == [("azure", ["azure-na"])]
+    assert policy_to_responses(policy, mappings=[]) == []
+
+
+class TestStarmapSync:
+    def setup_method(self) -> None:
+        self.client = mock.MagicMock(spec=StarmapClient)
+        self.policies = [
+            Policy.from_json(account_policy("p1", "product-1", ["aws-na", "azure-na"])),
+            Policy.from_json(account_policy("p2", "product-2", ["aws-na"])),
+        ]
+        self.client.policies = self.policies
+
+    def names(self, provider: StarmapProvider[Any, QueryResponseEntity]) -> List[str]:
+        return sorted(f"{r.name}/{r.cloud}" for r in provider.list_content())
+
+    def test_init(self) -> None:
+        sync = StarmapSync(self.client)
+        assert isinstance(sync.provider, PolicyResolver)
+        assert sync.provider.list_content() == []
+
+        provider = mock.MagicMock(api="v1")
+        with pytest.raises(ValueError, match="The sync requires an APIv2 provider, got: v1"):
+            StarmapSync(self.client, provider=provider)
+        provider = mock.MagicMock(api="v2", read_only=True)
+        with pytest.raises(ValueError, match="The sync requires a writable provider"):
+            StarmapSync(self.client, provider=provider)
+
+    def test_sync(self) -> None:
+        sync = StarmapSync(self.client)
+
+        assert sync.sync() == SyncResult(added=2, updated=0, removed=0, unchanged=0)
+        assert self.names(sync.provider) == ["product-1/aws", "product-1/azure", "product-2/aws"]
+        qr = sync.provider.query({"image": "product-2-1.0-1.raw.xz"})
+        assert qr == QueryResponseContainer(policy_to_responses(self.policies[1]))
+
+    def test_sync_changes(self) -> None:
+        sync = StarmapSync(self.client)
+        sync.sync()
+
+        # Same objects and equal objects are unchanged
+        self.client.policies = [self.policies[0], deepcopy(self.policies[1])]
+        with mock.patch("starmap_client.sync.policy_to_responses") as mock_convert:
+            assert sync.sync() == SyncResult(added=0, updated=0, removed=0, unchanged=2)
+        mock_convert.assert_not_called()
+
+        # Changed, removed and added policies
+        self.client.policies = [
+            Policy.from_json(account_policy("p1", "product-1", ["aws-na"])),
+            Policy.from_json(account_policy("p3", "product-3", ["gcp-na"])),
+        ]
+        assert sync.sync() == SyncResult(added=1, updated=1, removed=1, unchanged=0)
+        assert self.names(sync.provider) == ["product-1/aws", "product-3/gcp"]
+        assert sync.provider.query({"name": "product-2"}) is None
+
+    @pytest.mark.parametrize("writable", [False, True])
+    def test_sync_updated_query(self, writable: bool) -> None:
+        provider = InMemoryMapProviderV2(QueryResponseContainer([])) if writable else None
+        sync = StarmapSync(self.client, provider=provider)
+        sync.sync()
+
+        def destinations() -> List[str]:
+            qr = sync.provider.query({"name": "product-2"})
+            assert qr is not None
+            return [
+                d.destination for r in qr.responses for m in r.all_mappings for d in m.destinations
+            ]
+
+        assert destinations() == ["product-2-aws-na"]
+
+        data = account_policy("p2", "product-2", ["aws-na"])
+        data["mappings"][0]["destinations"][0]["destination"] = "new"
+        self.client.policies = [self.policies[0], Policy.from_json(data)]
+
+        assert sync.sync() == SyncResult(added=0, updated=1, removed=0, unchanged=1)
+        assert destinations() == ["new"]
+
+    def test_version_constraints(self, caplog: pytest.LogCaptureFixture) -> None:
+        data = account_policy("p1", "rhel", ["aws-na", "aws-na"])
+        for mapping, version in zip(data["mappings"], ["8", "9"]):
+            mapping["version_fnmatch"] = f"{version}.*"
+            mapping["destinations"][0]["destination"] = f"rhel{version}-listing"
+        self.client.policies = [Policy.from_json(data)]
+        writable = StarmapSync(
+            self.client, provider=InMemoryMapProviderV2(QueryResponseContainer([]))
+        )
+
+        def destinations(sync: StarmapSync) -> List[str]:
+            qr = sync.provider.query({"image": "rhel-9.4-1"})
+            assert qr is not None
+            return [
+                d.destination for r in qr.responses for m in r.all_mappings for d in m.destinations
+            ]
+
+        sync = StarmapSync(self.client)
+        sync.sync()
+        assert destinations(sync) == ["rhel9-listing"]
+        assert "version constraints" not in caplog.text
+
+        # The query responses don't have the version constraints
+        writable.sync()
+        assert destinations(writable) == ["rhel8-listing", "rhel9-listing"]
+        assert "returns all the mappings of the policy p1 regardless" in caplog.text
+
+    def test_policy_without_id(self) -> None:
+        data = account_policy("p1", "product-1", ["aws-na"])
+        data.pop("id")
+        self.client.policies = [Policy.from_json(data)]
+        sync = StarmapSync(self.client)
+
+        sync.sync()
+
+        assert list(sync._synced.keys()) == ["product-1:stratosphere"]
+
+    def test_sqlite_provider(self, tmp_path: Path) -> None:
+        with SQLiteMapProviderV2(str(tmp_path / "mappings.db")) as provider:
+            sync = StarmapSync(self.client, provider=provider)
+            sync.sync()
+            self.client.policies = self.policies[:1]
+
+            assert sync.sync() == SyncResult(added=0, updated=0, removed=1, unchanged=1)
+            assert self.names(provider) == ["product-1/aws", "product-1/azure"]
+
+    def test_sqlite_provider_read_only(self, tmp_path: Path) -> None:
+        db_path = str(tmp_path / "mappings.db")
+        SQLiteMapProviderV2(db_path).close()
+
+        with SQLiteMapProviderV2(db_path, read_only=True) as provider:
+            with pytest.raises(ValueError, match="The sync requires a writable provider"):
+                StarmapSync(self.client, provider=provider)
+
+    def test_provider_without_discard(self) -> None:
+        class Provider(StarmapProvider[QueryResponseContainer, QueryResponseEntity]):
+            api = "v2"
+
+            def __init__(self) -> None:
+                self.responses: List[QueryResponseEntity] = []
+
+            def query(self, params: Dict[str, Any]) -> None:
+                return None
+
+            def list_content(self) -> List[QueryResponseEntity]:
+                return self.responses
+
+            def store(self, response: QueryResponseEntity) -> None:
+                self.responses.append(response)
+
+        with pytest.raises(ValueError, match="The sync requires a provider supporting discard"):
+            StarmapSync(self.client, provider=Provider())
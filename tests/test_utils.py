@@ -1,8 +1,22 @@
-from typing import Any, Dict
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+from typing import Any, Dict, List
+from unittest import mock
 
 import pytest
 
-from starmap_client.utils import assert_is_dict, dict_merge
+from starmap_client.utils import (
+    SingleFlight,
+    assert_is_dict,
+    compile_version_pattern,
+    dict_merge,
+    iter_json_array,
+    json_dumps_bytes,
+)
+from tests.utils import waiting_followers
 
 
 def test_assert_is_dict() -> None:
@@ -15,6 +29,20 @@ def test_assert_is_dict() -> None:
             assert_is_dict(x)
 
 
+@pytest.mark.parametrize("has_orjson", [True, False])
+def test_json_dumps_bytes(has_orjson: bool) -> None:
+    if has_orjson:
+        pytest.importorskip("orjson")
+    data = {"name": "ação", "values": [1, 2.5, None, True], "nested": {"a": "b"}}
+
+    with mock.patch("starmap_client.utils._HAS_ORJSON", has_orjson):
+        res = json_dumps_bytes(data)
+
+    assert isinstance(res, bytes)
+    assert res == ('{"name":"ação","values":[1,2.5,null,true],"nested":{"a":"b"}}'.encode())
+    assert json.loads(res) == data
+
+
 @pytest.mark.parametrize(
     "a,b,expected",
     [
@@ -34,7 +62,177 @@ def test_assert_is_dict() -> None:
             {"dic1": {"bar": "foo"}, "dic2": {"key": "value"}},
             {"dic1": {"foo": "bar", "bar": "foo"}, "dic2": {"key": "value"}},
         ),
+        (
+            {"dic1": {"foo": "bar"}, "dic2": {"key": "value"}, "dic3": {"a": 1}},
+            {"dic1": None, "dic2": {}, "dic3": "value"},
+            {"dic1": {"foo": "bar"}, "dic2": {"key": "value"}, "dic3": "value"},
+        ),
+        (
+            {"a": {"b": {"c": {"d": 1, "e": 2}}, "f": 3}},
+            {"a": {"b": {"c": {"e": 4}, "g": 5}}},
+            {"a": {"b": {"c": {"d": 1, "e": 4}, "g": 5}, "f": 3}},
+        ),
     ],
 )
 def test_dict_merge(a: Dict[str, Any], b: Dict[str, Any], expected: Dict[str, Any]) -> None:
     assert dict_merge(a, b) == expected
+
+
+def test_dict_merge_does_not_modify_arguments() -> None:
+    a = {"a": {"b": {"c": 1}}, "d": {"e": 2}}
+    b = {"a": {"b": {"f": 3}}}
+    a_copy, b_copy = deepcopy(a), deepcopy(b)
+
+    res = dict_merge(a, b)
+    res["a"]["b"]["c"] = 10
+    res["d"]["e"] = 20
+
+    assert a == a_copy
+    assert b == b_copy
+
+
+def test_dict_merge_deep_nesting() -> None:
+    a: Dict[str, Any] = {}
+    b: Dict[str, Any] = {}
+    inner_a, inner_b = a, b
+    for _ in range(5000):
+        inner_a = inner_a.setdefault("x", {})
+        inner_b = inner_b.setdefault("x", {})
+    inner_a["a"] = 1
+    inner_b["b"] = 2
+
+    res = dict_merge(a, b)
+
+    for _ in range(5000):
+        res = res["x"]
+    assert res == {"a": 1, "b": 2}
+
+
+def test_compile_version_pattern() -> None:
+    fnmatch = compile_version_pattern("1.*", None)
+    regex = compile_version_pattern(None, "1\\.[0-9]")
+
+    assert fnmatch is compile_version_pattern("1.*", None)
+    assert fnmatch and fnmatch.match("1.0") and not fnmatch.match("10.0")
+    assert regex and regex.match("1.0") and not regex.match("1.x")
+    assert compile_version_pattern(None, None) is None
+
+
+def test_compile_version_pattern_invalid() -> None:
+    with pytest.raises(ValueError, match="can't be set together"):
+        compile_version_pattern("1.*", "1.*")
+    with pytest.raises(re.error):
+        compile_version_pattern(None, "1.(")
+
+
+class TestSingleFlight:
+    def setup_method(self) -> None:
+        self.flights = SingleFlight()
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.calls: List[str] = []
+
+    def func(self, value: str) -> Dict[str, str]:
+        self.calls.append(value)
+        self.started.set()
+        assert self.release.wait(5)
+        if value == "error":
+            raise RuntimeError("Failed")
+        return {"value": value}
+
+    def run_concurrently(self, value: str, callers: int = 5) -> List[Any]:
+        with waiting_followers() as wait_followers, ThreadPoolExecutor(callers) as executor:
+            leader = executor.submit(self.flights.do, value, self.func, value)
+            assert self.started.wait(5)
+            followers = [
+                executor.submit(self.flights.do, value, self.func, value)
+                for _ in range(callers - 1)
+            ]
+            # Wait for the followers to join the call in flight
+            assert wait_followers(callers - 1)
+            self.release.set()
+            return [f.exception() or f.result() for f in [leader] + followers]
+
+    def test_concurrent_calls_shared(self) -> None:
+        res = self.run_concurrently("foo")
+
+        assert self.calls == ["foo"]
+        assert all(r is res[0] for r in res)
+        assert res[0] == {"value": "foo"}
+        assert self.flights._calls == {}
+
+    def test_concurrent_calls_shared_exception(self) -> None:
+        res = self.run_concurrently("error")
+
+        assert self.calls == ["error"]
+        assert all(isinstance(r, RuntimeError) for r in res)
+        assert self.flights._calls == {}
+
+    def test_sequential_calls_not_shared(self) -> None:
+        self.release.set()
+
+        assert self.flights.do("foo", self.func, "foo") == {"value": "foo"}
+        assert self.flights.do("foo", self.func, "foo") == {"value": "foo"}
+        assert self.calls == ["foo", "foo"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 1024])
+def test_iter_json_array(chunk_size: int) -> None:
+    data = [{"a": [1, 2, {"b": "é☃"}]}, 12345, "x,]", None, [], 1.5e3, True, -0.5e-3]
+    doc = json.dumps(data, ensure_ascii=False, indent=2).encode()
+    chunks = [doc[i : i + chunk_size] for i in range(0, len(doc), chunk_size)]  # noqa: E203
+
+    assert list(iter_json_array(chunks)) == data
+
+
+def test_iter_json_array_incremental() -> None:
+    def chunks() -> Any:
+        yield "[{\"a\": 1}, "
+        yield '{"b": '
+        raise AssertionError("The first element must be yielded before reading more chunks")
+
+    assert next(iter_json_array(chunks())) == {"a": 1}
+
+
+def test_iter_json_array_large_element() -> None:
+    data = [{f"k{i}": ["v" * 10] * 3 for i in range(1000)}, 1]
+    doc = json.dumps(data).encode()
+    chunks = [doc[i : i + 16] for i in range(0, len(doc), 16)]  # noqa: E203
+    raw_decode = json.JSONDecoder.raw_decode
+
+    with mock.patch.object(
+        json.JSONDecoder, "raw_decode", autospec=True, side_effect=raw_decode
+    ) as decode:
+        assert list(iter_json_array(chunks)) == data
+
+    # The element spans thousands of chunks but it's parsed again only when its text doubles
+    assert len(chunks) > 2000
+    assert decode.call_count < 20
+
+
+@pytest.mark.parametrize("doc", ["[]", " [ ] ", "[1]"])
+def test_iter_json_array_str(doc: str) -> None:
+    assert list(iter_json_array([doc])) == json.loads(doc)
+
+
+@pytest.mark.parametrize(
+    "doc,err",
+    [
+        (b"", "Unexpected end of the JSON array"),
+        (b"[", "Unexpected end of the JSON array"),
+        (b"[1,", "Unexpected end of the JSON array"),
+        (b"{}", "Expected a JSON array, got \"{\" at position 0"),
+        (b"[1 2]", "Expected \",\" or \"]\", got \"2\" at position 3"),
+        (b"[1,]", "Expecting value"),
+        (b"[{", "Expecting property name"),
+    ],
+)
+def test_iter_json_array_invalid(doc: bytes, err: str) -> None:
+    with pytest.raises(ValueError, match=err):
+        list(iter_json_array([doc]))
+
+
+def test_iter_json_array_position() -> None:
+    # The position is in the whole document, not in the current chunk
+    with pytest.raises(ValueError, match="got \"x\" at position 12"):
+        list(iter_json_array([b"[1, ", b"22, 3", b"33 x]"]))
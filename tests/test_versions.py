@@ -0,0 +1,73 @@
+from copy import deepcopy
+from typing import Any, Dict, List
+
+import pytest
+
+from starmap_client.models import Mapping
+from starmap_client.versions import VersionMatcher
+
+PATTERNS: List[Dict[str, str]] = [
+    {"version_fnmatch": "1.*"},
+    {"version_regexmatch": r"1\.[0-9]+"},
+    {},
+    {"version_regexmatch": "(?i)RC"},
+    {"version_regexmatch": r"(1)\.\1"},
+    {"version_fnmatch": "2.*"},
+    {"version_regexmatch": "1|2"},
+    {"version_fnmatch": "1.*"},
+]
+
+
+def make_mapping(i: int, patterns: Dict[str, Any]) -> Mapping:
+    destination = {"destination": f"destination-{i}", "overwrite": False, "restrict_version": False}
+    return Mapping.from_json(
+        {"marketplace_account": f"account-{i}", "destinations": [destination], **deepcopy(patterns)}
+    )
+
+
+@pytest.fixture
+def mappings() -> List[Mapping]:
+    return [make_mapping(i, p) for i, p in enumerate(PATTERNS)]
+
+
+@pytest.mark.parametrize("version", ["1.2", "1.1", "rc1", "2.0", "3", ""])
+def test_match_equals_mappings_match(mappings: List[Mapping], version: str) -> None:
+    matcher = VersionMatcher(mappings)
+
+    res = matcher.match(version)
+
+    assert res == [m for m in mappings if m.matches_version(version)]
+    assert matcher.destinations(version) == [d for m in res for d in m.destinations]
+
+
+def test_match_groups_patterns(mappings: List[Mapping]) -> None:
+    matcher = VersionMatcher(mappings)
+
+    # The same pattern is matched once for all its mappings
+    assert len(matcher._patterns) == 6
+    assert [targets for _, targets in matcher._patterns if len(targets) > 1] == [[0, 7]]
+    assert [m.marketplace_account for m in matcher.match("1.1")] == [
+        "account-0",
+        "account-1",
+        "account-2",
+        "account-4",
+        "account-6",
+        "account-7",
+    ]
+
+
+def test_match_without_patterns() -> None:
+    mappings = [make_mapping(i, {}) for i in range(3)]
+
+    matcher = VersionMatcher(mappings)
+
+    assert matcher._patterns == []
+    assert matcher.match("1.0") == mappings
+    assert VersionMatcher([]).match("1.0") == []
+
+
+def test_match_invalid_mapping() -> None:
+    mapping = make_mapping(0, {"version_fnmatch": "1.*", "version_regexmatch": "1.*"})
+
+    with pytest.raises(ValueError, match="can't be set together"):
+        VersionMatcher([mapping])
@@ -0,0 +1,43 @@
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from unittest import mock
+
+
+def make_destination(destination: str, **kwargs: Any) -> Dict[str, Any]:
+    """Return the JSON of a destination with the required attributes and the given ones."""
+    return {"destination": destination, "overwrite": False, "restrict_version": False, **kwargs}
+
+
+def make_mapping(account: str, destinations: List[Dict[str, Any]], **kwargs: Any) -> Dict[str, Any]:
+    """Return the JSON of a mapping with the required attributes and the given ones."""
+    return {"marketplace_account": account, "destinations": destinations, **kwargs}
+
+
+def make_policy(
+    name: str, mappings: List[Dict[str, Any]], workflow: str = "stratosphere", **kwargs: Any
+) -> Dict[str, Any]:
+    """Return the JSON of a policy with the required attributes and the given ones."""
+    return {"name": name, "workflow": workflow, "mappings": mappings, **kwargs}
+
+
+@contextmanager
+def waiting_followers() -> Iterator[Callable[[int], bool]]:
+    """Count the callers waiting for the result of a call in flight of ``SingleFlight``.
+
+    It yields a function waiting until the given number of callers joined the calls in flight,
+    returning ``False`` when they don't within 5 seconds.
+    """
+    joined = threading.Semaphore(0)
+
+    class JoinedFuture(Future):  # type: ignore[type-arg]
+        def result(self, timeout: Optional[float] = None) -> Any:
+            joined.release()
+            return super().result(timeout)
+
+    def wait(count: int) -> bool:
+        return all(joined.acquire(timeout=5) for _ in range(count))
+
+    with mock.patch("starmap_client.utils.Future", JoinedFuture):
+        yield wait